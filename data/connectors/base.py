@@ -1,11 +1,38 @@
+import asyncio
+import queue
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass, field
-from typing import Any, Optional
-from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Optional, Protocol, TypeVar
+from datetime import datetime, timedelta, timezone
+import httpx
 import structlog
 
 log = structlog.get_logger()
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    log.debug("h2 not installed - connectors fall back to HTTP/1.1 keep-alive")
+    HTTP2_AVAILABLE = False
+
+T = TypeVar("T")
+
+# Given the response and its decoded body, return the next (url, params) or None when done;
+# POST-based APIs return (url, params, json_body) to page through the request body instead.
+NextPage = Callable[[httpx.Response, Any], Optional[tuple]]
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Retrying a POST is only safe when the server never acted on it: it was throttled, or
+# the connection failed before the request went out.
+NON_IDEMPOTENT_METHODS = ("POST", "PATCH")
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RESOURCES = ("customers", "orders", "events")
+
 
 @dataclass
 class SyncResult:
@@ -51,10 +78,44 @@ class EventRecord:
     event_data: dict = field(default_factory=dict)
     source: Optional[str] = None
     occurred_at: Optional[datetime] = None
+    external_id: Optional[str] = None
+
+
+@dataclass
+class SyncCheckpoint:
+    resource: str
+    # Start of the last run that finished this resource; the next run fetches changes since then.
+    high_water_mark: Optional[datetime] = None
+    # Request for the next unwritten page of an interrupted run: {"url", "params"[, "json"]}.
+    cursor: Optional[dict] = None
+    run_started_at: Optional[datetime] = None
+
+
+class Page(list):
+    """Records from one API page, plus the request that fetches the page after it."""
+
+    def __init__(self, records=(), cursor: Optional[dict] = None):
+        super().__init__(records)
+        self.cursor = cursor
+
+
+class RecordSink(Protocol):
+    def write(self, resource: str, records: list) -> int: ...
+
+
+class SyncStateStore(Protocol):
+    def load(self, connector_id: str) -> dict[str, SyncCheckpoint]: ...
+
+    def save(self, connector_id: str, checkpoint: SyncCheckpoint) -> None: ...
+
+    def mark_synced(self, connector_id: str, synced_at: datetime) -> None: ...
 
 
 class BaseConnector(ABC):
     connector_type: str = "base"
+    batch_size: int = 1000
+    # Re-read a little before the high-water mark to absorb clock skew with the vendor.
+    sync_overlap = timedelta(minutes=5)
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
         self.org_id = org_id
@@ -82,28 +143,599 @@ class BaseConnector(ABC):
     def fetch_events(self, since: Optional[datetime] = None) -> list[EventRecord]:
         return []
 
-    def sync(self, since: Optional[datetime] = None) -> SyncResult:
+    def iter_customers(self, since: Optional[datetime] = None) -> Iterator[list[CustomerRecord]]:
+        yield from _chunks(self.fetch_customers(since=since), self.batch_size)
+
+    def iter_orders(self, since: Optional[datetime] = None) -> Iterator[list[OrderRecord]]:
+        yield from _chunks(self.fetch_orders(since=since), self.batch_size)
+
+    def iter_events(self, since: Optional[datetime] = None) -> Iterator[list[EventRecord]]:
+        yield from _chunks(self.fetch_events(since=since), self.batch_size)
+
+    def iter_batches(self, since: Optional[datetime] = None) -> Iterator[tuple[str, list]]:
+        for resource, pages in (
+            ("customers", self.iter_customers),
+            ("orders", self.iter_orders),
+            ("events", self.iter_events),
+        ):
+            for batch in pages(since=since):
+                yield resource, batch
+
+    def checkpoints(
+        self, since: Optional[datetime] = None, state: Optional[SyncStateStore] = None
+    ) -> dict[str, SyncCheckpoint]:
+        saved = state.load(self.connector_id) if state is not None else {}
+        now = datetime.now(timezone.utc)
+        checkpoints = {}
+        for resource in RESOURCES:
+            checkpoint = saved.get(resource) or SyncCheckpoint(resource)
+            if checkpoint.cursor is None or since is not None:
+                # Fresh run; an explicit `since` also overrides any half-finished one.
+                checkpoint.cursor = None
+                checkpoint.run_started_at = now
+            checkpoints[resource] = checkpoint
+        return checkpoints
+
+    def resource_since(self, checkpoint: SyncCheckpoint, since: Optional[datetime] = None) -> Optional[datetime]:
+        if since is not None or checkpoint.high_water_mark is None:
+            return since
+        return checkpoint.high_water_mark - self.sync_overlap
+
+    def finish_resource(self, checkpoint: SyncCheckpoint, state: Optional[SyncStateStore] = None) -> None:
+        checkpoint.high_water_mark = checkpoint.run_started_at
+        checkpoint.cursor = None
+        if state is not None:
+            state.save(self.connector_id, checkpoint)
+
+    def sync(
+        self,
+        since: Optional[datetime] = None,
+        sink: Optional[RecordSink] = None,
+        state: Optional[SyncStateStore] = None,
+    ) -> SyncResult:
         self.log.info("Starting sync", since=since)
         result = SyncResult(success=True)
+        batches = {"customers": self.iter_customers, "orders": self.iter_orders, "events": self.iter_events}
+        try:
+            checkpoints = self.checkpoints(since, state)
+            for resource in RESOURCES:
+                checkpoint = checkpoints[resource]
+                result.metadata[resource] = 0
+                for batch in batches[resource](since=self.resource_since(checkpoint, since)):
+                    written = sink.write(resource, batch) if sink is not None else len(batch)
+                    result.records_synced += written
+                    result.metadata[resource] += written
+                self.finish_resource(checkpoint, state)
+                self.log.info("Resource synced", resource=resource, count=result.metadata[resource])
+            if state is not None:
+                state.mark_synced(self.connector_id, result.synced_at)
+
+        except Exception as e:
+            result.success = False
+            result.errors.append(str(e))
+            self.log.error("Sync failed", error=str(e))
+
+        return result
+
+
+def _chunks(records: list, size: int) -> Iterator[list]:
+    for start in range(0, len(records), size):
+        yield records[start:start + size]
+
+
+@dataclass
+class RateLimitState:
+    limit: float
+    remaining: float
+    refill_per_second: Optional[float] = None
+    retry_after: Optional[float] = None
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+def parse_ietf_rate_limit(headers: httpx.Headers) -> Optional[RateLimitState]:
+    # RateLimit-Limit / -Remaining / -Reset (IETF draft, also sent as X-RateLimit-*).
+    for prefix in ("RateLimit-", "X-RateLimit-"):
+        limit, remaining = headers.get(prefix + "Limit"), headers.get(prefix + "Remaining")
+        if limit is None or remaining is None:
+            continue
+        try:
+            limit_value = float(limit.split(",")[0].split(";")[0])
+            reset = float(headers.get(prefix + "Reset", "0").split(",")[0] or 0)
+            return RateLimitState(
+                limit=limit_value,
+                remaining=float(remaining.split(",")[0].split(";")[0]),
+                refill_per_second=limit_value / reset if reset > 0 else None,
+            )
+        except ValueError:
+            return None
+    return None
+
+
+class RateLimiter:
+    """Token bucket that re-syncs with the vendor's view of the quota after every response."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else (rate or 0.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Blocking callers start a fresh event loop per call; locks cannot cross loops.
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._paused_until > now:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if not self.rate or self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def observe(self, state: Optional[RateLimitState]) -> None:
+        if state is None:
+            return
+        self._refill(time.monotonic())
+        if state.refill_per_second:
+            self.rate = state.refill_per_second
+        self.capacity = max(state.limit, 1.0)
+        # The vendor's remaining count already includes other clients on the same quota.
+        self.tokens = min(self.capacity, state.remaining)
+        if state.retry_after:
+            self.pause(state.retry_after)
+
+
+class AsyncBaseConnector(BaseConnector):
+    """Connector whose I/O runs on one pooled httpx.AsyncClient per sync.
+
+    Subclasses implement the async ``*_pages`` generators (one list of records per
+    API page); the blocking ``fetch_*`` methods and ``sync`` drive them on an event
+    loop, fetching customers, orders and events concurrently.
+    """
+
+    # Tests and local fakes swap in an httpx.MockTransport here.
+    transport: Optional[httpx.AsyncBaseTransport] = None
+    # Starting budget until the first response reports the real quota; None is unthrottled.
+    default_requests_per_second: Optional[float] = None
+    default_request_burst: Optional[float] = None
+
+    def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
+        super().__init__(org_id, connector_id, config, credentials)
+        self.prefetch_depth = int(config.get("prefetch_depth", 2))
+        self.max_connections = int(config.get("max_connections", 10))
+        self.http2 = bool(config.get("http2", True)) and HTTP2_AVAILABLE
+        self.max_retries = int(config.get("max_retries", 5))
+        self.backoff_base = float(config.get("backoff_base_seconds", 0.5))
+        self.backoff_cap = float(config.get("backoff_cap_seconds", 60.0))
+        self.rate_limiter = RateLimiter(
+            rate=config.get("requests_per_second", self.default_requests_per_second),
+            burst=config.get("request_burst", self.default_request_burst),
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def headers(self) -> dict:
+        return {}
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._client is not None:
+            yield self._client
+            return
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        async with httpx.AsyncClient(
+            http2=self.http2, limits=limits, timeout=30, transport=self.transport
+        ) as client:
+            self._client = client
+            try:
+                yield client
+            finally:
+                self._client = None
+
+    def run(self, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        async def main() -> T:
+            async with self.session():
+                return await fn(*args, **kwargs)
+
+        return asyncio.run(main())
+
+    def rate_limit_state(self, resp: httpx.Response) -> Optional[RateLimitState]:
+        return parse_ietf_rate_limit(resp.headers)
+
+    def backoff_seconds(self, attempt: int, resp: Optional[httpx.Response] = None) -> float:
+        if resp is not None:
+            retry_after = parse_retry_after(resp.headers)
+            if retry_after is not None:
+                return retry_after
+        # Full jitter keeps concurrent page fetches from retrying in lockstep.
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def request(
+        self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs
+    ) -> httpx.Response:
+        # Read-only POSTs (report and search queries) pass idempotent=True to keep the
+        # full retry policy.
+        if idempotent is None:
+            idempotent = method.upper() not in NON_IDEMPOTENT_METHODS
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        attempt = 0
+        async with self.session() as client:
+            while True:
+                await self.rate_limiter.acquire()
+                try:
+                    resp = await client.request(method, url, headers=headers, **kwargs)
+                except httpx.TransportError as exc:
+                    if attempt >= self.max_retries or not (idempotent or isinstance(exc, UNSENT_ERRORS)):
+                        raise
+                    delay = self.backoff_seconds(attempt)
+                    self.log.warning("Request failed, retrying", url=url, error=str(exc), delay=round(delay, 2))
+                else:
+                    self.rate_limiter.observe(self.rate_limit_state(resp))
+                    if (
+                        resp.status_code not in RETRY_STATUS_CODES
+                        or attempt >= self.max_retries
+                        or not (idempotent or resp.status_code == 429)
+                    ):
+                        break
+                    delay = self.backoff_seconds(attempt, resp)
+                    if resp.status_code == 429:
+                        self.rate_limiter.pause(delay)
+                    self.log.warning(
+                        "Request throttled or failed, retrying",
+                        url=url, status=resp.status_code, attempt=attempt + 1, delay=round(delay, 2),
+                    )
+                await asyncio.sleep(delay)
+                attempt += 1
+        resp.raise_for_status()
+        return resp
+
+    async def cursor_pages(
+        self,
+        url: str,
+        next_page: NextPage,
+        params: Optional[dict] = None,
+        method: str = "GET",
+        cursor: Optional[dict] = None,
+        **kwargs,
+    ) -> AsyncIterator[tuple[Any, Optional[dict]]]:
+        # Yields each decoded page with the cursor for the page after it, and resumes from
+        # a cursor saved by an earlier, interrupted run.
+        if cursor is not None:
+            url, params = cursor["url"], cursor.get("params")
+            if cursor.get("json") is not None:
+                kwargs["json"] = cursor["json"]
+
+        async def pages() -> AsyncIterator[tuple[Any, Optional[dict]]]:
+            nonlocal url, params
+            while True:
+                resp = await self.request(method, url, params=params, **kwargs)
+                data = resp.json()
+                following = next_page(resp, data)
+                if following is None:
+                    yield data, None
+                    return
+                url, params, *body = following
+                if body:
+                    kwargs["json"] = body[0]
+                following_cursor = {"url": url, "params": params}
+                if kwargs.get("json") is not None:
+                    following_cursor["json"] = kwargs["json"]
+                yield data, following_cursor
+
+        async for page in self.prefetch(pages()):
+            yield page
+
+    async def paginate(
+        self,
+        url: str,
+        next_page: NextPage,
+        params: Optional[dict] = None,
+        method: str = "GET",
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        async for data, _ in self.cursor_pages(url, next_page, params, method, **kwargs):
+            yield data
+
+    async def prefetch(self, pages: AsyncIterator[T]) -> AsyncIterator[T]:
+        # A producer task stays up to `prefetch_depth` pages ahead of the consumer, so
+        # the next request is in flight while the current page is parsed and written.
+        if self.prefetch_depth <= 0:
+            async for page in pages:
+                yield page
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.prefetch_depth)
+
+        async def produce() -> None:
+            try:
+                async for page in pages:
+                    await queue.put((page, None))
+                await queue.put((None, StopAsyncIteration()))
+            except Exception as exc:
+                await queue.put((None, exc))
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                page, error = await queue.get()
+                if isinstance(error, StopAsyncIteration):
+                    return
+                if error is not None:
+                    raise error
+                yield page
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+    async def merge(self, sources: Iterable[AsyncIterator[T]]) -> AsyncIterator[T]:
+        # Drains several page streams concurrently into one, through a bounded queue.
+        merged: asyncio.Queue = asyncio.Queue(maxsize=max(self.prefetch_depth, 1))
+        finished = object()
+
+        async def drain(source: AsyncIterator[T]) -> None:
+            try:
+                async for item in source:
+                    await merged.put((item, None))
+                await merged.put((finished, None))
+            except Exception as exc:
+                await merged.put((None, exc))
+
+        tasks = [asyncio.create_task(drain(source)) for source in sources]
+        try:
+            pending = len(tasks)
+            while pending:
+                item, error = await merged.get()
+                if error is not None:
+                    raise error
+                if item is finished:
+                    pending -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def avalidate_credentials(self) -> bool:
+        return False
+
+    async def customer_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[CustomerRecord]]:
+        return
+        yield
+
+    async def order_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[OrderRecord]]:
+        return
+        yield
+
+    async def event_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[EventRecord]]:
+        return
+        yield
+
+    async def afetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
+        return [record async for page in self.customer_pages(since) for record in page]
+
+    async def afetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
+        return [record async for page in self.order_pages(since) for record in page]
+
+    async def afetch_events(self, since: Optional[datetime] = None) -> list[EventRecord]:
+        return [record async for page in self.event_pages(since) for record in page]
+
+    def validate_credentials(self) -> bool:
+        try:
+            return self.run(self.avalidate_credentials)
+        except Exception:
+            return False
+
+    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
+        return self.run(self.afetch_customers, since)
+
+    def fetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
+        return self.run(self.afetch_orders, since)
+
+    def fetch_events(self, since: Optional[datetime] = None) -> list[EventRecord]:
+        return self.run(self.afetch_events, since)
+
+    def resource_pages(
+        self, resource: str, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list]:
+        pages = {"customers": self.customer_pages, "orders": self.order_pages, "events": self.event_pages}
+        return pages[resource](since, cursor)
+
+    async def _resumable_pages(self, checkpoint: SyncCheckpoint, since: Optional[datetime]) -> AsyncIterator[list]:
+        resuming = checkpoint.cursor is not None
+        try:
+            async for page in self.resource_pages(checkpoint.resource, since, checkpoint.cursor):
+                resuming = False
+                yield page
+        except httpx.HTTPStatusError as exc:
+            status = exc.response.status_code
+            # Vendors expire pagination cursors; a saved one that is refused means start over.
+            if not resuming or not 400 <= status < 500 or status in (401, 403, 429):
+                raise
+            self.log.warning("Saved cursor rejected, restarting resource", resource=checkpoint.resource, status=status)
+            checkpoint.cursor = None
+            async for page in self.resource_pages(checkpoint.resource, since):
+                yield page
+
+    async def _merged_pages(
+        self, checkpoints: dict[str, SyncCheckpoint], since: Optional[datetime] = None
+    ) -> AsyncIterator[tuple[str, Optional[list], Optional[BaseException]]]:
+        # One producer per resource feeds a bounded queue; a (resource, None, error)
+        # item marks that resource as finished, with or without an error.
+        merged: asyncio.Queue = asyncio.Queue(maxsize=max(self.prefetch_depth, 1) * len(checkpoints))
+
+        async def pump(checkpoint: SyncCheckpoint) -> None:
+            try:
+                async for page in self._resumable_pages(checkpoint, self.resource_since(checkpoint, since)):
+                    if page:
+                        await merged.put((checkpoint.resource, page, None))
+            except Exception as exc:
+                await merged.put((checkpoint.resource, None, exc))
+            else:
+                await merged.put((checkpoint.resource, None, None))
+
+        producers = [asyncio.create_task(pump(checkpoint)) for checkpoint in checkpoints.values()]
+        try:
+            pending = len(producers)
+            while pending:
+                item = await merged.get()
+                if item[1] is None:
+                    pending -= 1
+                yield item
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+    async def stream(
+        self, since: Optional[datetime] = None, resources: tuple[str, ...] = RESOURCES
+    ) -> AsyncIterator[tuple[str, list]]:
+        checkpoints = {resource: SyncCheckpoint(resource) for resource in resources}
+        async with self.session():
+            async for resource, page, error in self._merged_pages(checkpoints, since):
+                if error is not None:
+                    raise error
+                if page is not None:
+                    yield resource, page
+
+    def _iterate(self, pages: Callable[[], AsyncIterator[T]]) -> Iterator[T]:
+        # Runs the async generator on a private event loop in a worker thread and hands
+        # pages over through a bounded queue, so blocking callers get the same backpressure.
+        handoff: queue.Queue = queue.Queue(maxsize=max(self.prefetch_depth, 1))
+        done = object()
+        stop = threading.Event()
+
+        def worker() -> None:
+            async def main() -> None:
+                async with self.session():
+                    async for page in pages():
+                        if stop.is_set():
+                            return
+                        await asyncio.to_thread(handoff.put, page)
+
+            try:
+                asyncio.run(main())
+                handoff.put(done)
+            except BaseException as exc:
+                handoff.put(exc)
+
+        thread = threading.Thread(target=worker, name=f"{self.connector_type}-pages", daemon=True)
+        thread.start()
         try:
-            customers = self.fetch_customers(since=since)
-            result.records_synced += len(customers)
-            self.log.info("Customers fetched", count=len(customers))
+            while True:
+                item = handoff.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            while thread.is_alive():
+                with suppress(queue.Empty):
+                    handoff.get(timeout=0.05)
+
+    def iter_customers(self, since: Optional[datetime] = None) -> Iterator[list[CustomerRecord]]:
+        return self._iterate(lambda: self.customer_pages(since))
 
-            orders = self.fetch_orders(since=since)
-            result.records_synced += len(orders)
-            self.log.info("Orders fetched", count=len(orders))
+    def iter_orders(self, since: Optional[datetime] = None) -> Iterator[list[OrderRecord]]:
+        return self._iterate(lambda: self.order_pages(since))
 
-            events = self.fetch_events(since=since)
-            result.records_synced += len(events)
+    def iter_events(self, since: Optional[datetime] = None) -> Iterator[list[EventRecord]]:
+        return self._iterate(lambda: self.event_pages(since))
+
+    def iter_batches(self, since: Optional[datetime] = None) -> Iterator[tuple[str, list]]:
+        return self._iterate(lambda: self.stream(since))
+
+    async def async_sync(
+        self,
+        since: Optional[datetime] = None,
+        sink: Optional[RecordSink] = None,
+        state: Optional[SyncStateStore] = None,
+    ) -> SyncResult:
+        self.log.info("Starting sync", since=since, http2=self.http2, prefetch_depth=self.prefetch_depth)
+        result = SyncResult(success=True)
+        result.metadata.update(dict.fromkeys(RESOURCES, 0))
+        try:
+            checkpoints = await asyncio.to_thread(self.checkpoints, since, state)
+            async with self.session():
+                async for resource, page, error in self._merged_pages(checkpoints, since):
+                    checkpoint = checkpoints[resource]
+                    if error is not None:
+                        # The checkpoint keeps the cursor of the last written page, so the next run resumes there.
+                        result.success = False
+                        result.errors.append(f"{resource}: {error}")
+                        self.log.error("Sync failed", resource=resource, error=str(error))
+                    elif page is None:
+                        await asyncio.to_thread(self.finish_resource, checkpoint, state)
+                        self.log.info("Resource synced", resource=resource, count=result.metadata[resource])
+                    else:
+                        # Writes run off the event loop so the next pages keep downloading meanwhile.
+                        written = await asyncio.to_thread(sink.write, resource, page) if sink is not None else len(page)
+                        result.records_synced += written
+                        result.metadata[resource] += written
+                        checkpoint.cursor = getattr(page, "cursor", None)
+                        if state is not None and checkpoint.cursor is not None:
+                            await asyncio.to_thread(state.save, self.connector_id, checkpoint)
+            if result.success and state is not None:
+                await asyncio.to_thread(state.mark_synced, self.connector_id, result.synced_at)
 
         except Exception as e:
+            # Checkpoint, sink and state failures end the run the same way a page error does.
             result.success = False
             result.errors.append(str(e))
             self.log.error("Sync failed", error=str(e))
 
         return result
 
+    def sync(
+        self,
+        since: Optional[datetime] = None,
+        sink: Optional[RecordSink] = None,
+        state: Optional[SyncStateStore] = None,
+    ) -> SyncResult:
+        return asyncio.run(self.async_sync(since, sink, state))
+
 
 class ConnectorRegistry:
     _registry: dict[str, type[BaseConnector]] = {}
@@ -0,0 +1,112 @@
+"""
+Connector report cache.
+Reporting APIs (GA4, Meta insights) keep revising recent days while late events are
+processed, but a day outside that window never changes. Reports are therefore fetched
+in calendar-aligned date chunks, and chunks that end before the refresh window are
+cached, on disk or in Redis, so a sync only goes back to the API for the last few days.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Protocol
+
+import structlog
+
+log = structlog.get_logger()
+
+DEFAULT_REPORT_CACHE_DIR = "data/cache/connectors"
+
+
+class ReportCache(Protocol):
+    def get(self, key: str) -> Optional[list]: ...
+
+    def set(self, key: str, rows: list) -> None: ...
+
+
+def _encode(rows: list) -> bytes:
+    return gzip.compress(json.dumps(rows, default=str).encode())
+
+
+def _decode(blob: bytes) -> list:
+    return json.loads(gzip.decompress(blob))
+
+
+class DiskReportCache:
+    def __init__(self, path: str = DEFAULT_REPORT_CACHE_DIR):
+        self.path = Path(path)
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha1(key.encode()).hexdigest()}.json.gz"
+
+    def get(self, key: str) -> Optional[list]:
+        try:
+            return _decode(self._file(key).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log.warning("Discarding unreadable report cache entry", key=key, error=str(e))
+            return None
+
+    def set(self, key: str, rows: list) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never read a half-written entry.
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_encode(rows))
+        os.replace(tmp, self._file(key))
+
+
+class RedisReportCache:
+    def __init__(self, client, prefix: str = "aima:report-cache:", ttl_seconds: int = 180 * 86400):
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[list]:
+        blob = self.client.get(self.prefix + key)
+        return _decode(blob) if blob is not None else None
+
+    def set(self, key: str, rows: list) -> None:
+        self.client.set(self.prefix + key, _encode(rows), ex=self.ttl_seconds)
+
+
+def open_report_cache(target: Optional[str] = DEFAULT_REPORT_CACHE_DIR) -> Optional[ReportCache]:
+    # A redis:// URL, a directory, or "off".
+    if not target or target == "off":
+        return None
+    if target.startswith(("redis://", "rediss://", "unix://")):
+        import redis
+
+        return RedisReportCache(redis.Redis.from_url(target))
+    return DiskReportCache(target)
+
+
+def report_key(*parts, payload: Optional[dict] = None) -> str:
+    # The request body is hashed into the key so changing a report's fields invalidates it.
+    digest = hashlib.sha1(json.dumps(payload or {}, sort_keys=True).encode()).hexdigest()[:16]
+    return ":".join([*(str(p) for p in parts), digest])
+
+
+def date_chunks(start: date, end: date, days: int) -> list[tuple[date, date]]:
+    # Boundaries fall on fixed multiples of `days`, so the same chunk (and cache key)
+    # comes back on every sync regardless of where the requested range starts.
+    days = max(days, 1)
+    chunks = []
+    cursor = start
+    while cursor <= end:
+        chunk_end = min(date.fromordinal(cursor.toordinal() + days - cursor.toordinal() % days - 1), end)
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def first_open_day(refresh_days: int, today: Optional[date] = None) -> date:
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=refresh_days)
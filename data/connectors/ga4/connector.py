@@ -1,19 +1,63 @@
 """
 Google Analytics 4 Connector for AIMA.
-Uses the GA4 Data API to pull website engagement and conversion data.
+Uses the GA4 Data API to pull website engagement and conversion data. Reports are
+paged by offset until rowCount is reached, in a fixed row order so offsets do not
+shift between pages. Date-dimensioned reports are split into calendar-aligned chunks
+fetched in parallel under a cap on in-flight report requests, and chunks GA4 will no
+longer revise are served from the report cache.
 """
 
 from __future__ import annotations
 
+import asyncio
 from typing import Optional
-from datetime import datetime, timedelta
-import httpx
-
-from data.connectors.base import BaseConnector, CustomerRecord, OrderRecord, EventRecord, ConnectorRegistry
+from datetime import date, datetime, timedelta
+
+from data.connectors.base import AsyncBaseConnector, ConnectorRegistry
+from data.connectors.cache import (
+    DEFAULT_REPORT_CACHE_DIR,
+    date_chunks,
+    first_open_day,
+    open_report_cache,
+    report_key,
+)
+
+# GA4 keeps processing events for up to ~72 hours.
+DEFAULT_REFRESH_DAYS = 3
+
+
+def _parse_rows(data: dict) -> list[dict]:
+    dimension_headers = [h["name"] for h in data.get("dimensionHeaders", [])]
+    metric_headers = [h["name"] for h in data.get("metricHeaders", [])]
+    rows = []
+    for row in data.get("rows", []):
+        entry = {}
+        for name, dim_val in zip(dimension_headers, row.get("dimensionValues", [])):
+            entry[name] = dim_val.get("value")
+        for name, met_val in zip(metric_headers, row.get("metricValues", [])):
+            try:
+                entry[name] = float(met_val.get("value", 0))
+            except ValueError:
+                entry[name] = 0.0
+        rows.append(entry)
+    return rows
+
+
+def _stable_order(payload: dict) -> dict:
+    # Offset pages are only disjoint if every page sees the same row order, so the
+    # report dimensions are appended as tie-breakers after any requested ordering.
+    order_bys = list(payload.get("orderBys", []))
+    ordered = {o["dimension"]["dimensionName"] for o in order_bys if "dimension" in o}
+    order_bys += [
+        {"dimension": {"dimensionName": d["name"]}}
+        for d in payload.get("dimensions", [])
+        if d["name"] not in ordered
+    ]
+    return {**payload, "orderBys": order_bys} if order_bys else payload
 
 
 @ConnectorRegistry.register("ga4")
-class GA4Connector(BaseConnector):
+class GA4Connector(AsyncBaseConnector):
     connector_type = "ga4"
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
@@ -21,6 +65,13 @@ class GA4Connector(BaseConnector):
         self.property_id = config.get("property_id", "")
         self.access_token = credentials.get("access_token", "")
         self.base_url = f"https://analyticsdata.googleapis.com/v1beta/properties/{self.property_id}"
+        self.report_page_size = int(config.get("report_page_size", 10_000))
+        self.report_chunk_days = int(config.get("report_chunk_days", 7))
+        self.refresh_days = int(config.get("refresh_days", DEFAULT_REFRESH_DAYS))
+        self.max_concurrent_reports = int(config.get("max_concurrent_reports", 4))
+        self.report_cache = open_report_cache(config.get("report_cache", DEFAULT_REPORT_CACHE_DIR))
+        self._report_slots: Optional[asyncio.Semaphore] = None
+        self._report_slots_loop = None
 
     @property
     def headers(self) -> dict:
@@ -29,42 +80,77 @@ class GA4Connector(BaseConnector):
             "Content-Type": "application/json",
         }
 
-    def validate_credentials(self) -> bool:
-        try:
-            payload = {
-                "dateRanges": [{"startDate": "7daysAgo", "endDate": "today"}],
-                "metrics": [{"name": "activeUsers"}],
-            }
-            with httpx.Client() as client:
-                resp = client.post(
-                    f"{self.base_url}:runReport",
-                    headers=self.headers,
-                    json=payload,
-                    timeout=10,
-                )
-                return resp.status_code == 200
-        except Exception:
-            return False
-
-    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
-        return []
-
-    def fetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
-        return []
+    async def avalidate_credentials(self) -> bool:
+        payload = {
+            "dateRanges": [{"startDate": "7daysAgo", "endDate": "today"}],
+            "metrics": [{"name": "activeUsers"}],
+        }
+        resp = await self.request("POST", f"{self.base_url}:runReport", json=payload, timeout=10, idempotent=True)
+        return resp.status_code == 200
+
+    def _report_request_slots(self) -> asyncio.Semaphore:
+        # Chunks and their offset pages share one cap, bound to the running loop.
+        loop = asyncio.get_running_loop()
+        if self._report_slots_loop is not loop:
+            self._report_slots = asyncio.Semaphore(max(self.max_concurrent_reports, 1))
+            self._report_slots_loop = loop
+        return self._report_slots
+
+    async def _report_page(self, payload: dict, offset: int) -> dict:
+        body = {**payload, "limit": self.report_page_size, "offset": offset}
+        async with self._report_request_slots():
+            resp = await self.request("POST", f"{self.base_url}:runReport", json=body, timeout=60, idempotent=True)
+        return resp.json()
+
+    async def run_report(self, payload: dict) -> list[dict]:
+        payload = _stable_order(payload)
+        first = await self._report_page(payload, 0)
+        total = int(first.get("rowCount", 0))
+        # rowCount arrives with the first page, so the remaining offsets go out together.
+        rest = await asyncio.gather(*(
+            self._report_page(payload, offset)
+            for offset in range(self.report_page_size, total, self.report_page_size)
+        ))
+        rows = _parse_rows(first)
+        for page in rest:
+            rows.extend(_parse_rows({**first, "rows": page.get("rows", [])}))
+        return rows
+
+    async def cached_report(self, name: str, payload: dict, start: date, end: date) -> list[dict]:
+        body = {**payload, "dateRanges": [{"startDate": start.isoformat(), "endDate": end.isoformat()}]}
+        closed = self.report_cache is not None and end < first_open_day(self.refresh_days)
+        key = report_key(self.connector_type, self.property_id, name, start, end, payload=payload)
+        if closed:
+            rows = await asyncio.to_thread(self.report_cache.get, key)
+            if rows is not None:
+                return rows
+        rows = await self.run_report(body)
+        if closed:
+            await asyncio.to_thread(self.report_cache.set, key, rows)
+        return rows
+
+    async def chunked_report(self, name: str, payload: dict, since: datetime, until: datetime) -> list[dict]:
+        # Only for reports with a date dimension, whose rows stay additive across chunks.
+        chunks = date_chunks(since.date(), until.date(), self.report_chunk_days)
+        results = await asyncio.gather(*(self.cached_report(name, payload, start, end) for start, end in chunks))
+        return [row for rows in results for row in rows]
 
     def fetch_engagement_metrics(
         self,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
+    ) -> dict:
+        return self.run(self.afetch_engagement_metrics, since, until)
+
+    async def afetch_engagement_metrics(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
     ) -> dict:
         since = since or (datetime.utcnow() - timedelta(days=30))
         until = until or datetime.utcnow()
 
         payload = {
-            "dateRanges": [{
-                "startDate": since.strftime("%Y-%m-%d"),
-                "endDate": until.strftime("%Y-%m-%d"),
-            }],
             "dimensions": [
                 {"name": "date"},
                 {"name": "sessionSource"},
@@ -88,35 +174,9 @@ class GA4Connector(BaseConnector):
                 {"name": "cartToViewRate"},
                 {"name": "purchaseToViewRate"},
             ],
-            "limit": 10000,
         }
 
-        with httpx.Client() as client:
-            resp = client.post(
-                f"{self.base_url}:runReport",
-                headers=self.headers,
-                json=payload,
-                timeout=60,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-        rows = []
-        dimension_headers = [h["name"] for h in data.get("dimensionHeaders", [])]
-        metric_headers = [h["name"] for h in data.get("metricHeaders", [])]
-
-        for row in data.get("rows", []):
-            entry = {}
-            for i, dim_val in enumerate(row.get("dimensionValues", [])):
-                if i < len(dimension_headers):
-                    entry[dimension_headers[i]] = dim_val.get("value")
-            for i, met_val in enumerate(row.get("metricValues", [])):
-                if i < len(metric_headers):
-                    try:
-                        entry[metric_headers[i]] = float(met_val.get("value", 0))
-                    except ValueError:
-                        entry[metric_headers[i]] = 0.0
-            rows.append(entry)
+        rows = await self.chunked_report("engagement", payload, since, until)
 
         self.log.info("GA4 engagement data fetched", rows=len(rows))
         return {"rows": rows, "row_count": len(rows), "property_id": self.property_id}
@@ -125,15 +185,20 @@ class GA4Connector(BaseConnector):
         self,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
+    ) -> list[dict]:
+        return self.run(self.afetch_page_performance, since, until)
+
+    async def afetch_page_performance(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
     ) -> list[dict]:
         since = since or (datetime.utcnow() - timedelta(days=30))
         until = until or datetime.utcnow()
 
+        # Averages and rates are not additive across date chunks, so this report covers
+        # the whole range in one request and is only paged.
         payload = {
-            "dateRanges": [{
-                "startDate": since.strftime("%Y-%m-%d"),
-                "endDate": until.strftime("%Y-%m-%d"),
-            }],
             "dimensions": [{"name": "pagePath"}, {"name": "pageTitle"}],
             "metrics": [
                 {"name": "screenPageViews"},
@@ -143,32 +208,22 @@ class GA4Connector(BaseConnector):
                 {"name": "conversions"},
             ],
             "orderBys": [{"metric": {"metricName": "screenPageViews"}, "desc": True}],
-            "limit": 200,
         }
 
-        with httpx.Client() as client:
-            resp = client.post(
-                f"{self.base_url}:runReport",
-                headers=self.headers,
-                json=payload,
-                timeout=30,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-        pages = []
-        for row in data.get("rows", []):
-            dims = [d.get("value") for d in row.get("dimensionValues", [])]
-            mets = [float(m.get("value", 0)) for m in row.get("metricValues", [])]
-            pages.append({
-                "path": dims[0] if len(dims) > 0 else "",
-                "title": dims[1] if len(dims) > 1 else "",
-                "views": int(mets[0]) if len(mets) > 0 else 0,
-                "users": int(mets[1]) if len(mets) > 1 else 0,
-                "avg_session_duration": mets[2] if len(mets) > 2 else 0.0,
-                "bounce_rate": mets[3] if len(mets) > 3 else 0.0,
-                "conversions": int(mets[4]) if len(mets) > 4 else 0,
-            })
+        rows = await self.cached_report("page_performance", payload, since.date(), until.date())
+
+        pages = [
+            {
+                "path": row.get("pagePath", ""),
+                "title": row.get("pageTitle", ""),
+                "views": int(row.get("screenPageViews", 0)),
+                "users": int(row.get("activeUsers", 0)),
+                "avg_session_duration": row.get("averageSessionDuration", 0.0),
+                "bounce_rate": row.get("bounceRate", 0.0),
+                "conversions": int(row.get("conversions", 0)),
+            }
+            for row in rows
+        ]
 
         self.log.info("GA4 page performance fetched", pages=len(pages))
         return pages
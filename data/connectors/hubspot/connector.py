@@ -1,26 +1,69 @@
 """
 HubSpot CRM Connector for AIMA.
-Syncs contacts (customers) and deals from HubSpot using the v3 API.
+Syncs contacts (customers) and deals from HubSpot using the v3 CRM search API, filtered
+on the last-modified property for incremental syncs. The object ID space is split into
+ranges scanned in parallel, each paged by keyset on hs_object_id (which also sidesteps
+the search API's 10,000-result cap). Deal-to-contact links come from the v4 batch
+associations endpoint, one call per page of deals.
 """
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import AsyncIterator, Optional
 from datetime import datetime
 import httpx
 
-from data.connectors.base import BaseConnector, CustomerRecord, OrderRecord, ConnectorRegistry
+from data.connectors.base import AsyncBaseConnector, CustomerRecord, OrderRecord, Page, ConnectorRegistry, RateLimitState
+
+CONTACT_PROPERTIES = [
+    "email", "firstname", "lastname", "phone", "country",
+    "city", "hs_lead_status", "lifecyclestage", "createdate",
+    "lastmodifieddate", "hs_email_open", "hs_email_click",
+    "hs_email_bounce", "total_revenue", "num_associated_deals",
+]
+
+DEAL_PROPERTIES = [
+    "dealname", "amount", "closedate", "dealstage",
+    "pipeline", "hubspot_owner_id", "associated_company_id",
+]
+
+SEARCH_PAGE_SIZE = 200
+
+
+def _search_body(
+    properties: list[str],
+    modified_property: str,
+    since: Optional[datetime],
+    after_id: int,
+    max_id: Optional[int] = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    descending: bool = False,
+) -> dict:
+    filters = [{"propertyName": "hs_object_id", "operator": "GT", "value": str(after_id)}]
+    if max_id is not None:
+        filters.append({"propertyName": "hs_object_id", "operator": "LTE", "value": str(max_id)})
+    if since is not None:
+        filters.append({"propertyName": modified_property, "operator": "GTE", "value": str(int(since.timestamp() * 1000))})
+    return {
+        "filterGroups": [{"filters": filters}],
+        "sorts": [{"propertyName": "hs_object_id", "direction": "DESCENDING" if descending else "ASCENDING"}],
+        "properties": properties,
+        "limit": limit,
+    }
 
 
 @ConnectorRegistry.register("hubspot")
-class HubSpotConnector(BaseConnector):
+class HubSpotConnector(AsyncBaseConnector):
     connector_type = "hubspot"
+    default_requests_per_second = 10.0
+    default_request_burst = 10.0
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
         super().__init__(org_id, connector_id, config, credentials)
         self.api_key = credentials.get("api_key", "")
         self.access_token = credentials.get("access_token", "")
         self.base_url = "https://api.hubapi.com"
+        self.search_partitions = int(config.get("search_partitions", 4))
 
     @property
     def headers(self) -> dict:
@@ -30,47 +73,109 @@ class HubSpotConnector(BaseConnector):
             "Content-Type": "application/json",
         }
 
-    def validate_credentials(self) -> bool:
+    def rate_limit_state(self, resp: httpx.Response) -> Optional[RateLimitState]:
+        headers = resp.headers
         try:
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.base_url}/crm/v3/objects/contacts",
-                    headers=self.headers,
-                    params={"limit": 1},
-                    timeout=10,
+            # The per-second window is the tighter one for a single sync; fall back to the interval.
+            if "X-HubSpot-RateLimit-Secondly" in headers:
+                limit = float(headers["X-HubSpot-RateLimit-Secondly"])
+                return RateLimitState(
+                    limit=limit,
+                    remaining=float(headers.get("X-HubSpot-RateLimit-Secondly-Remaining", limit)),
+                    refill_per_second=limit,
                 )
-                return resp.status_code == 200
-        except Exception:
-            return False
-
-    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
-        customers = []
-        after = None
-        properties = [
-            "email", "firstname", "lastname", "phone", "country",
-            "city", "hs_lead_status", "lifecyclestage", "createdate",
-            "lastmodifieddate", "hs_email_open", "hs_email_click",
-            "hs_email_bounce", "total_revenue", "num_associated_deals",
-        ]
-
-        while True:
-            params: dict = {"limit": 100, "properties": ",".join(properties)}
-            if after:
-                params["after"] = after
-            if since:
-                params["filterGroups"] = []
-
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.base_url}/crm/v3/objects/contacts",
-                    headers=self.headers,
-                    params=params,
-                    timeout=30,
+            if "X-HubSpot-RateLimit-Max" in headers:
+                limit = float(headers["X-HubSpot-RateLimit-Max"])
+                interval = float(headers.get("X-HubSpot-RateLimit-Interval-Milliseconds", 10_000)) / 1000
+                return RateLimitState(
+                    limit=limit,
+                    remaining=float(headers.get("X-HubSpot-RateLimit-Remaining", limit)),
+                    refill_per_second=limit / max(interval, 1.0),
                 )
-                resp.raise_for_status()
-                data = resp.json()
+        except ValueError:
+            return None
+        return None
+
+    async def avalidate_credentials(self) -> bool:
+        resp = await self.request(
+            "GET", f"{self.base_url}/crm/v3/objects/contacts", params={"limit": 1}, timeout=10
+        )
+        return resp.status_code == 200
+
+    async def _search_partitions(
+        self, object_type: str, properties: list[str], modified_property: str, since: Optional[datetime]
+    ) -> list[list[int]]:
+        # One probe for the highest matching ID and the match count sizes the partitions.
+        resp = await self.request(
+            "POST",
+            f"{self.base_url}/crm/v3/objects/{object_type}/search",
+            json=_search_body([], modified_property, since, 0, limit=1, descending=True),
+            idempotent=True,
+        )
+        data = resp.json()
+        if not data.get("results"):
+            return []
+        top = int(data["results"][0]["id"])
+        n = max(1, min(self.search_partitions, -(-int(data.get("total", 0)) // SEARCH_PAGE_SIZE)))
+        bounds = [top * k // n for k in range(n + 1)]
+        return [[bounds[k], bounds[k + 1]] for k in range(n)]
+
+    async def search_objects(
+        self,
+        object_type: str,
+        properties: list[str],
+        modified_property: str,
+        since: Optional[datetime] = None,
+        cursor: Optional[dict] = None,
+    ) -> AsyncIterator[tuple[list[dict], Optional[dict]]]:
+        # Yields each page of results with a cursor covering every partition's progress
+        # up to and including that page; partitions are [last_seen_id, max_id] pairs.
+        if cursor is not None:
+            partitions = [list(p) for p in cursor["partitions"]]
+        else:
+            partitions = await self._search_partitions(object_type, properties, modified_property, since)
+        url = f"{self.base_url}/crm/v3/objects/{object_type}/search"
+
+        async def scan(index: int) -> AsyncIterator[tuple[int, int, list[dict]]]:
+            after_id, max_id = partitions[index]
+            while after_id < max_id:
+                resp = await self.request(
+                    "POST", url, json=_search_body(properties, modified_property, since, after_id, max_id),
+                    idempotent=True,
+                )
+                results = resp.json().get("results", [])
+                after_id = int(results[-1]["id"]) if len(results) == SEARCH_PAGE_SIZE else max_id
+                yield index, after_id, results
+
+        async for index, after_id, results in self.merge(scan(i) for i in range(len(partitions))):
+            partitions[index][0] = after_id
+            remaining = [list(p) for p in partitions if p[0] < p[1]]
+            yield results, {"partitions": remaining} if remaining else None
+
+    async def deal_contacts(self, deal_ids: list[str]) -> dict[str, str]:
+        if not deal_ids:
+            return {}
+        resp = await self.request(
+            "POST",
+            f"{self.base_url}/crm/v4/associations/deals/contacts/batch/read",
+            json={"inputs": [{"id": deal_id} for deal_id in deal_ids]},
+            idempotent=True,
+        )
+        return {
+            str(result["from"]["id"]): str(result["to"][0]["toObjectId"])
+            for result in resp.json().get("results", [])
+            if result.get("to")
+        }
 
-            for contact in data.get("results", []):
+    async def customer_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[CustomerRecord]]:
+        count = 0
+        async for results, next_cursor in self.search_objects(
+            "contacts", CONTACT_PROPERTIES, "lastmodifieddate", since, cursor
+        ):
+            customers = []
+            for contact in results:
                 props = contact.get("properties", {})
                 customers.append(CustomerRecord(
                     external_id=contact["id"],
@@ -89,44 +194,23 @@ class HubSpotConnector(BaseConnector):
                         "email_clicks": props.get("hs_email_click"),
                     },
                 ))
-
-            paging = data.get("paging", {})
-            after = paging.get("next", {}).get("after")
-            if not after:
-                break
-
-        self.log.info("HubSpot contacts fetched", count=len(customers))
-        return customers
-
-    def fetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
-        orders = []
-        after = None
-        properties = [
-            "dealname", "amount", "closedate", "dealstage",
-            "pipeline", "hubspot_owner_id", "associated_company_id",
-        ]
-
-        while True:
-            params: dict = {"limit": 100, "properties": ",".join(properties)}
-            if after:
-                params["after"] = after
-
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.base_url}/crm/v3/objects/deals",
-                    headers=self.headers,
-                    params=params,
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-            for deal in data.get("results", []):
+            count += len(customers)
+            yield Page(customers, next_cursor)
+
+        self.log.info("HubSpot contacts fetched", count=count)
+
+    async def order_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[OrderRecord]]:
+        count = 0
+        async for results, next_cursor in self.search_objects(
+            "deals", DEAL_PROPERTIES, "hs_lastmodifieddate", since, cursor
+        ):
+            deals = [deal for deal in results if float(deal.get("properties", {}).get("amount") or 0) > 0]
+            contacts = await self.deal_contacts([deal["id"] for deal in deals])
+            orders = []
+            for deal in deals:
                 props = deal.get("properties", {})
-                amount = float(props.get("amount") or 0)
-                if amount <= 0:
-                    continue
-
                 close_date = None
                 if props.get("closedate"):
                     try:
@@ -136,8 +220,8 @@ class HubSpotConnector(BaseConnector):
 
                 orders.append(OrderRecord(
                     external_id=deal["id"],
-                    customer_external_id=None,
-                    total=amount,
+                    customer_external_id=contacts.get(deal["id"]),
+                    total=float(props["amount"]),
                     currency="USD",
                     status=props.get("dealstage", "closed"),
                     ordered_at=close_date,
@@ -146,11 +230,7 @@ class HubSpotConnector(BaseConnector):
                         "pipeline": props.get("pipeline"),
                     },
                 ))
+            count += len(orders)
+            yield Page(orders, next_cursor)
 
-            paging = data.get("paging", {})
-            after = paging.get("next", {}).get("after")
-            if not after:
-                break
-
-        self.log.info("HubSpot deals fetched", count=len(orders))
-        return orders
+        self.log.info("HubSpot deals fetched", count=count)
@@ -1,18 +1,69 @@
-from typing import Optional
+"""
+Klaviyo Connector for AIMA.
+Syncs profiles and events from the Klaviyo API. Event metric IDs are resolved to
+canonical AIMA event types through a metrics lookup cached per connector, event pages
+request only the fields the sync stores at the largest page size, and when the sync is
+limited to a set of metrics each metric filter is paged concurrently.
+"""
+
+import asyncio
+import re
+from typing import AsyncIterator, Optional
 from datetime import datetime
 import httpx
 
-from data.connectors.base import BaseConnector, CustomerRecord, EventRecord, ConnectorRegistry
+from data.connectors.base import AsyncBaseConnector, CustomerRecord, EventRecord, Page, ConnectorRegistry
+
+EVENT_PAGE_SIZE = 200
+EVENT_FIELDS = "datetime,event_properties"
+
+# Klaviyo's built-in metric names mapped to the event types the feature pipeline reads.
+CANONICAL_EVENT_TYPES = {
+    "Received Email": "email_sent",
+    "Opened Email": "email_opened",
+    "Clicked Email": "email_clicked",
+    "Bounced Email": "email_bounced",
+    "Marked Email as Spam": "email_marked_spam",
+    "Unsubscribed": "email_unsubscribed",
+    "Added to Cart": "cart_added",
+    "Started Checkout": "checkout_started",
+    "Checkout Started": "checkout_started",
+    "Placed Order": "order_placed",
+    "Ordered Product": "product_ordered",
+    "Viewed Product": "product_viewed",
+    "Active on Site": "session_started",
+    "Received SMS": "sms_sent",
+    "Clicked SMS": "sms_clicked",
+}
+
+
+def _next_link(resp: httpx.Response, data: dict) -> Optional[tuple[str, Optional[dict]]]:
+    url = data.get("links", {}).get("next")
+    return (url, None) if url else None
+
+
+def canonical_event_type(metric_name: str) -> str:
+    if metric_name in CANONICAL_EVENT_TYPES:
+        return CANONICAL_EVENT_TYPES[metric_name]
+    return re.sub(r"[^a-z0-9]+", "_", metric_name.lower()).strip("_") or "unknown"
 
 
 @ConnectorRegistry.register("klaviyo")
-class KlaviyoConnector(BaseConnector):
+class KlaviyoConnector(AsyncBaseConnector):
     connector_type = "klaviyo"
+    # Klaviyo sends IETF RateLimit-* headers, which the base limiter already reads.
+    default_requests_per_second = 10.0
+    default_request_burst = 75.0
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
         super().__init__(org_id, connector_id, config, credentials)
         self.api_key = credentials.get("api_key", "")
         self.base_url = "https://a.klaviyo.com/api"
+        # Metric names or canonical event types to sync; empty means every event.
+        self.event_metrics = list(config.get("event_metrics") or [])
+        self._metric_types: Optional[dict[str, str]] = None
+        self._metrics_lock: Optional[asyncio.Lock] = None
+        self._metrics_loop = None
 
     @property
     def headers(self) -> dict:
@@ -22,27 +73,20 @@ class KlaviyoConnector(BaseConnector):
             "Content-Type": "application/json",
         }
 
-    def validate_credentials(self) -> bool:
-        try:
-            with httpx.Client() as client:
-                resp = client.get(f"{self.base_url}/accounts/", headers=self.headers, timeout=10)
-                return resp.status_code == 200
-        except Exception:
-            return False
-
-    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
-        customers = []
-        url = f"{self.base_url}/profiles/"
+    async def avalidate_credentials(self) -> bool:
+        resp = await self.request("GET", f"{self.base_url}/accounts/", timeout=10)
+        return resp.status_code == 200
+
+    async def customer_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[CustomerRecord]]:
         params = {"page[size]": 100}
         if since:
             params["filter"] = f"greater-than(updated,{since.isoformat()})"
 
-        while url:
-            with httpx.Client() as client:
-                resp = client.get(url, headers=self.headers, params=params, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-
+        count = 0
+        async for data, next_cursor in self.cursor_pages(f"{self.base_url}/profiles/", _next_link, params=params, cursor=cursor):
+            customers = []
             for profile in data.get("data", []):
                 attrs = profile.get("attributes", {})
                 loc = attrs.get("location", {}) or {}
@@ -59,30 +103,100 @@ class KlaviyoConnector(BaseConnector):
                         "consent": attrs.get("consent", {}),
                     }
                 ))
-
-            url = data.get("links", {}).get("next")
-            params = {}
-
-        self.log.info("Klaviyo profiles fetched", count=len(customers))
-        return customers
-
-    def fetch_orders(self, since: Optional[datetime] = None) -> list:
-        return []
-
-    def fetch_events(self, since: Optional[datetime] = None) -> list[EventRecord]:
-        events = []
+            count += len(customers)
+            yield Page(customers, next_cursor)
+
+        self.log.info("Klaviyo profiles fetched", count=count)
+
+    def _metrics_lookup_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._metrics_loop is not loop:
+            self._metrics_lock, self._metrics_loop = asyncio.Lock(), loop
+        return self._metrics_lock
+
+    async def metric_types(self, refresh: bool = False) -> dict[str, str]:
+        # metric_id -> canonical event type. Loaded once per connector; an event whose
+        # metric is missing triggers one reload, for metrics created mid-sync.
+        async with self._metrics_lookup_lock():
+            if self._metric_types is None or refresh:
+                types = {}
+                params = {"fields[metric]": "name"}
+                async for data in self.paginate(f"{self.base_url}/metrics/", _next_link, params=params):
+                    for metric in data.get("data", []):
+                        name = metric.get("attributes", {}).get("name") or ""
+                        types[metric["id"]] = canonical_event_type(name) if name else metric["id"]
+                self._metric_types = types
+                self.log.info("Klaviyo metrics loaded", count=len(types))
+            return self._metric_types
+
+    async def _event_metric_ids(self) -> list[str]:
+        wanted = set(self.event_metrics)
+        if not wanted:
+            return []
+        types = await self.metric_types()
+        wanted_types = {canonical_event_type(name) for name in wanted} | wanted
+        return sorted(metric_id for metric_id, event_type in types.items() if metric_id in wanted or event_type in wanted_types)
+
+    async def _event_streams(
+        self, since: Optional[datetime], cursor: Optional[dict]
+    ) -> AsyncIterator[tuple[dict, Optional[dict]]]:
+        # Yields each page with a cursor; with metric filters the cursor maps every
+        # unfinished metric to the request for its next page (None before its first).
         url = f"{self.base_url}/events/"
-        params = {"page[size]": 100}
-        if since:
-            params["filter"] = f"greater-than(datetime,{since.isoformat()})"
-
-        while url:
-            with httpx.Client() as client:
-                resp = client.get(url, headers=self.headers, params=params, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-
-            for event in data.get("data", []):
+        params = {"page[size]": EVENT_PAGE_SIZE, "fields[event]": EVENT_FIELDS}
+        since_filter = f"greater-than(datetime,{since.isoformat()})" if since else None
+
+        if cursor is not None and "metrics" in cursor:
+            progress = dict(cursor["metrics"])
+        else:
+            metric_ids = await self._event_metric_ids()
+            if self.event_metrics and not metric_ids:
+                self.log.warning("No Klaviyo metrics match event_metrics", event_metrics=self.event_metrics)
+                return
+            if not metric_ids:
+                if since_filter:
+                    params["filter"] = since_filter
+                async for page in self.cursor_pages(url, _next_link, params=params, cursor=cursor):
+                    yield page
+                return
+            progress = {metric_id: None for metric_id in metric_ids}
+
+        async def scan(metric_id: str) -> AsyncIterator[tuple[str, dict, Optional[dict]]]:
+            metric_filter = f'equals(metric_id,"{metric_id}")'
+            filtered = {
+                **params,
+                "filter": f"and({metric_filter},{since_filter})" if since_filter else metric_filter,
+            }
+            async for data, next_cursor in self.cursor_pages(url, _next_link, params=filtered, cursor=progress[metric_id]):
+                yield metric_id, data, next_cursor
+
+        async for metric_id, data, next_cursor in self.merge(scan(m) for m in list(progress)):
+            if next_cursor is None:
+                progress.pop(metric_id, None)
+            else:
+                progress[metric_id] = next_cursor
+            yield data, {"metrics": dict(progress)} if progress else None
+
+    async def event_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[EventRecord]]:
+        types = await self.metric_types()
+        refreshed = False
+
+        count = 0
+        async for data, next_cursor in self._event_streams(since, cursor):
+            rows = data.get("data", [])
+            metric_ids = [
+                event.get("relationships", {}).get("metric", {}).get("data", {}).get("id")
+                or event.get("attributes", {}).get("metric_id")
+                for event in rows
+            ]
+            if not refreshed and any(m and m not in types for m in metric_ids):
+                types = await self.metric_types(refresh=True)
+                refreshed = True
+
+            events = []
+            for event, metric_id in zip(rows, metric_ids):
                 attrs = event.get("attributes", {})
                 profile_id = (
                     event.get("relationships", {})
@@ -92,14 +206,13 @@ class KlaviyoConnector(BaseConnector):
                 )
                 events.append(EventRecord(
                     customer_external_id=profile_id,
-                    event_type=attrs.get("metric_id", "unknown"),
-                    event_data=attrs.get("properties", {}),
+                    event_type=types.get(metric_id, metric_id or "unknown"),
+                    event_data=attrs.get("event_properties", attrs.get("properties", {})),
                     source="klaviyo",
                     occurred_at=datetime.fromisoformat(attrs["datetime"]) if attrs.get("datetime") else None,
+                    external_id=event.get("id"),
                 ))
+            count += len(events)
+            yield Page(events, next_cursor)
 
-            url = data.get("links", {}).get("next")
-            params = {}
-
-        self.log.info("Klaviyo events fetched", count=len(events))
-        return events
+        self.log.info("Klaviyo events fetched", count=count)
@@ -1,23 +1,84 @@
 """
 Meta Ads Connector for AIMA.
 Pulls campaign performance data from the Meta (Facebook/Instagram) Marketing API.
+Insights are requested per day (time_increment=1) in calendar-aligned chunks, each
+run as an async report job that is polled and then downloaded page by page. Chunks
+that end before the attribution window are served from the report cache, so a sync
+only re-reads the days whose conversions Meta can still revise.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
+import time
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import httpx
 
-from data.connectors.base import BaseConnector, CustomerRecord, OrderRecord, ConnectorRegistry
+from data.connectors.base import AsyncBaseConnector, ConnectorRegistry, RateLimitState
+from data.connectors.cache import (
+    DEFAULT_REPORT_CACHE_DIR,
+    date_chunks,
+    first_open_day,
+    open_report_cache,
+    report_key,
+)
+
+USAGE_HEADERS = ("X-Business-Use-Case-Usage", "X-Ad-Account-Usage", "X-App-Usage")
+
+INSIGHT_FIELDS = (
+    "campaign_name", "campaign_id", "adset_name", "adset_id",
+    "impressions", "reach", "clicks", "spend", "cpm", "cpc", "ctr",
+    "actions", "action_values", "conversions", "cost_per_conversion",
+    "frequency", "unique_clicks", "unique_ctr",
+)
+
+# Conversions are credited back to the day of the click for the default 7-day window.
+DEFAULT_ATTRIBUTION_DAYS = 7
+JOB_COMPLETED = "Job Completed"
+JOB_FAILED = ("Job Failed", "Job Skipped")
+
+
+def _next_paging(resp: httpx.Response, data: dict) -> Optional[tuple[str, Optional[dict]]]:
+    url = data.get("paging", {}).get("next")
+    return (url, None) if url else None
+
+
+def _parse_insight(row: dict) -> dict:
+    parsed = {
+        "date": row.get("date_start"),
+        "campaign_id": row.get("campaign_id"),
+        "campaign_name": row.get("campaign_name"),
+        "adset_name": row.get("adset_name"),
+        "impressions": int(row.get("impressions", 0)),
+        "reach": int(row.get("reach", 0)),
+        "clicks": int(row.get("clicks", 0)),
+        "spend": float(row.get("spend", 0)),
+        "cpm": float(row.get("cpm", 0)),
+        "cpc": float(row.get("cpc", 0)),
+        "ctr": float(row.get("ctr", 0)),
+        "frequency": float(row.get("frequency", 0)),
+        "conversions": 0,
+        "conversion_value": 0.0,
+    }
+    for action in row.get("actions", []):
+        if action.get("action_type") == "purchase":
+            parsed["conversions"] = int(action.get("value", 0))
+    for action_value in row.get("action_values", []):
+        if action_value.get("action_type") == "purchase":
+            parsed["conversion_value"] = float(action_value.get("value", 0))
+    return parsed
 
 
 @ConnectorRegistry.register("meta_ads")
-class MetaAdsConnector(BaseConnector):
+class MetaAdsConnector(AsyncBaseConnector):
     connector_type = "meta_ads"
 
     GRAPH_API_VERSION = "v19.0"
     BASE_URL = "https://graph.facebook.com"
+    default_requests_per_second = 10.0
+    default_request_burst = 10.0
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
         super().__init__(org_id, connector_id, config, credentials)
@@ -25,30 +86,126 @@ class MetaAdsConnector(BaseConnector):
         self.ad_account_id = config.get("ad_account_id", "")
         self.app_id = credentials.get("app_id", "")
         self.app_secret = credentials.get("app_secret", "")
+        self.async_reports = bool(config.get("async_reports", True))
+        self.report_poll_seconds = float(config.get("report_poll_seconds", 5.0))
+        self.report_max_wait_seconds = float(config.get("report_max_wait_seconds", 3600))
+        self.max_concurrent_reports = int(config.get("max_concurrent_reports", 4))
+        self.report_chunk_days = int(config.get("report_chunk_days", 7))
+        self.attribution_window_days = int(config.get("attribution_window_days", DEFAULT_ATTRIBUTION_DAYS))
+        self.report_cache = open_report_cache(config.get("report_cache", DEFAULT_REPORT_CACHE_DIR))
 
     @property
     def api_url(self) -> str:
         return f"{self.BASE_URL}/{self.GRAPH_API_VERSION}"
 
-    def validate_credentials(self) -> bool:
-        try:
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.api_url}/me",
-                    params={"access_token": self.access_token, "fields": "id,name"},
-                    timeout=10,
+    def rate_limit_state(self, resp: httpx.Response) -> Optional[RateLimitState]:
+        # Meta reports usage as percentages of rolling quotas rather than call counts, so
+        # the request rate is scaled by whatever headroom the busiest quota has left.
+        usage, regain_minutes, seen = 0.0, 0.0, False
+        for header in USAGE_HEADERS:
+            raw = resp.headers.get(header)
+            if not raw:
+                continue
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                continue
+            entries = [payload] if header != "X-Business-Use-Case-Usage" else [
+                entry for entries in payload.values() for entry in entries
+            ]
+            for entry in entries:
+                seen = True
+                for key in ("call_count", "total_cputime", "total_time", "acc_id_util_pct"):
+                    usage = max(usage, float(entry.get(key) or 0))
+                regain_minutes = max(regain_minutes, float(entry.get("estimated_time_to_regain_access") or 0))
+        if not seen:
+            return None
+        rate = self.default_requests_per_second
+        headroom = max(0.0, 100.0 - usage) / 100.0
+        return RateLimitState(
+            limit=rate,
+            remaining=rate * headroom,
+            refill_per_second=max(rate * headroom, 0.1),
+            retry_after=regain_minutes * 60 or None,
+        )
+
+    async def avalidate_credentials(self) -> bool:
+        resp = await self.request(
+            "GET",
+            f"{self.api_url}/me",
+            params={"access_token": self.access_token, "fields": "id,name"},
+            timeout=10,
+        )
+        return resp.status_code == 200
+
+    def fetch_campaign_insights(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> list[dict]:
+        return self.run(self.afetch_campaign_insights, since, until)
+
+    async def insights_report(self, params: dict) -> list[dict]:
+        url = f"{self.api_url}/act_{self.ad_account_id}/insights"
+        if not self.async_reports:
+            return [
+                _parse_insight(row)
+                async for data in self.paginate(url, _next_paging, params=params)
+                for row in data.get("data", [])
+            ]
+
+        # Not retried on a read timeout or 5xx: a replayed submit starts a duplicate run.
+        resp = await self.request("POST", url, params=params, timeout=60, idempotent=False)
+        run_id = resp.json()["report_run_id"]
+        deadline = time.monotonic() + self.report_max_wait_seconds
+        while True:
+            resp = await self.request(
+                "GET",
+                f"{self.api_url}/{run_id}",
+                params={"access_token": self.access_token, "fields": "async_status,async_percent_completion"},
+                timeout=30,
+            )
+            job = resp.json()
+            status = job.get("async_status")
+            # "Job Completed" can show up a poll before the percentage reaches 100, and
+            # reading the results at that point returns a partial set.
+            if status == JOB_COMPLETED and int(job.get("async_percent_completion", 0)) >= 100:
+                break
+            if status in JOB_FAILED:
+                raise RuntimeError(f"Meta insights report {run_id} ended with status {status!r}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Meta insights report {run_id} still {status!r} after {self.report_max_wait_seconds:.0f}s"
                 )
-                return resp.status_code == 200
-        except Exception:
-            return False
+            await asyncio.sleep(self.report_poll_seconds)
 
-    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
-        return []
+        return [
+            _parse_insight(row)
+            async for data in self.paginate(
+                f"{self.api_url}/{run_id}/insights",
+                _next_paging,
+                params={"access_token": self.access_token, "limit": 500},
+            )
+            for row in data.get("data", [])
+        ]
 
-    def fetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
-        return []
+    async def cached_insights(self, params: dict, start: date, end: date) -> list[dict]:
+        closed = self.report_cache is not None and end < first_open_day(self.attribution_window_days)
+        key = report_key(
+            self.connector_type, self.ad_account_id, "campaign_insights", start, end,
+            payload={k: v for k, v in params.items() if k != "access_token"},
+        )
+        if closed:
+            rows = await asyncio.to_thread(self.report_cache.get, key)
+            if rows is not None:
+                return rows
+        time_range = json.dumps({"since": start.isoformat(), "until": end.isoformat()})
+        rows = await self.insights_report({**params, "access_token": self.access_token, "time_range": time_range})
+        if closed:
+            await asyncio.to_thread(self.report_cache.set, key, rows)
+        return rows
 
-    def fetch_campaign_insights(
+    async def afetch_campaign_insights(
         self,
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
@@ -57,69 +214,37 @@ class MetaAdsConnector(BaseConnector):
         until = until or datetime.utcnow()
 
         params = {
-            "access_token": self.access_token,
-            "fields": ",".join([
-                "campaign_name", "campaign_id", "adset_name", "adset_id",
-                "impressions", "reach", "clicks", "spend", "cpm", "cpc", "ctr",
-                "actions", "action_values", "conversions", "cost_per_conversion",
-                "frequency", "unique_clicks", "unique_ctr",
-            ]),
-            "time_range": f'{{"since":"{since.strftime("%Y-%m-%d")}","until":"{until.strftime("%Y-%m-%d")}"}}',
+            "fields": ",".join(INSIGHT_FIELDS),
+            "time_increment": 1,
             "level": "campaign",
             "limit": 500,
         }
+        # Meta caps concurrent async jobs per ad account.
+        slots = asyncio.Semaphore(max(self.max_concurrent_reports, 1))
 
-        insights = []
-        url = f"{self.api_url}/act_{self.ad_account_id}/insights"
+        async def chunk(start: date, end: date) -> list[dict]:
+            async with slots:
+                return await self.cached_insights(params, start, end)
 
-        while url:
-            with httpx.Client() as client:
-                resp = client.get(url, params=params, timeout=30)
-                resp.raise_for_status()
-                data = resp.json()
-
-            for row in data.get("data", []):
-                parsed = {
-                    "campaign_id": row.get("campaign_id"),
-                    "campaign_name": row.get("campaign_name"),
-                    "adset_name": row.get("adset_name"),
-                    "impressions": int(row.get("impressions", 0)),
-                    "reach": int(row.get("reach", 0)),
-                    "clicks": int(row.get("clicks", 0)),
-                    "spend": float(row.get("spend", 0)),
-                    "cpm": float(row.get("cpm", 0)),
-                    "cpc": float(row.get("cpc", 0)),
-                    "ctr": float(row.get("ctr", 0)),
-                    "frequency": float(row.get("frequency", 0)),
-                    "conversions": 0,
-                    "conversion_value": 0.0,
-                }
-                for action in row.get("actions", []):
-                    if action.get("action_type") == "purchase":
-                        parsed["conversions"] = int(action.get("value", 0))
-                for action_value in row.get("action_values", []):
-                    if action_value.get("action_type") == "purchase":
-                        parsed["conversion_value"] = float(action_value.get("value", 0))
-                insights.append(parsed)
-
-            next_page = data.get("paging", {}).get("next")
-            url = next_page if next_page else None
-            params = {}
-
-        self.log.info("Meta Ads insights fetched", count=len(insights))
+        chunks = date_chunks(since.date(), until.date(), self.report_chunk_days)
+        results = await asyncio.gather(*(chunk(start, end) for start, end in chunks))
+        insights = [row for rows in results for row in rows]
+
+        self.log.info("Meta Ads insights fetched", count=len(insights), chunks=len(chunks))
         return insights
 
     def fetch_audiences(self) -> list[dict]:
+        return self.run(self.afetch_audiences)
+
+    async def afetch_audiences(self) -> list[dict]:
         params = {
             "access_token": self.access_token,
             "fields": "id,name,description,approximate_count_lower_bound,approximate_count_upper_bound,subtype",
             "limit": 200,
         }
         url = f"{self.api_url}/act_{self.ad_account_id}/customaudiences"
-        with httpx.Client() as client:
-            resp = client.get(url, params=params, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await self.request("GET", url, params=params, timeout=30)
+        data = resp.json()
         audiences = [
             {
                 "id": a.get("id"),
@@ -1,13 +1,170 @@
-from typing import Optional
+"""
+Shopify Connector for AIMA.
+Syncs customers and orders through the Admin REST API, or, in bulk mode, through a
+GraphQL bulk operation: the export runs server-side and the resulting JSONL file is
+streamed line by line into record batches, replacing thousands of paged REST calls.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import AsyncIterator, Optional
 from datetime import datetime
 import httpx
 
-from data.connectors.base import BaseConnector, CustomerRecord, OrderRecord, EventRecord, ConnectorRegistry, SyncResult
+from data.connectors.base import AsyncBaseConnector, CustomerRecord, OrderRecord, Page, ConnectorRegistry, RateLimitState
+
+_NEXT_LINK_RE = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+BULK_MODES = ("off", "backfill", "always")
+BULK_FINAL_STATUSES = {"COMPLETED", "FAILED", "CANCELED", "EXPIRED"}
+
+_BULK_RUN_MUTATION = """
+mutation run($query: String!) {
+  bulkOperationRunQuery(query: $query) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+
+_BULK_CANCEL_MUTATION = """
+mutation cancel($id: ID!) {
+  bulkOperationCancel(id: $id) {
+    bulkOperation { id status }
+    userErrors { field message }
+  }
+}
+"""
+
+_BULK_STATUS_QUERY = """
+query status($id: ID!) {
+  node(id: $id) {
+    ... on BulkOperation { id status errorCode objectCount url }
+  }
+}
+"""
+
+_BULK_CUSTOMERS_QUERY = """
+{
+  customers%(filter)s {
+    edges { node {
+      id legacyResourceId email firstName lastName phone createdAt tags numberOfOrders verifiedEmail
+      amountSpent { amount currencyCode }
+      defaultAddress { country city }
+      emailMarketingConsent { marketingState }
+    } }
+  }
+}
+"""
+
+_BULK_ORDERS_QUERY = """
+{
+  orders%(filter)s {
+    edges { node {
+      id legacyResourceId name createdAt displayFinancialStatus displayFulfillmentStatus sourceName tags
+      currencyCode
+      totalPriceSet { shopMoney { amount } }
+      totalDiscountsSet { shopMoney { amount } }
+      customer { legacyResourceId }
+      lineItems { edges { node {
+        id title quantity sku vendor
+        originalUnitPriceSet { shopMoney { amount } }
+        product { legacyResourceId }
+        variant { legacyResourceId }
+      } } }
+    } }
+  }
+}
+"""
+
+
+def _next_link(resp: httpx.Response, data: dict) -> Optional[tuple[str, Optional[dict]]]:
+    # The next-page URL already carries limit and page_info; other filters must be dropped.
+    match = _NEXT_LINK_RE.search(resp.headers.get("Link", ""))
+    return (match.group(1), None) if match else None
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def _legacy_id(node: Optional[dict]) -> Optional[str]:
+    # REST and GraphQL must produce the same external IDs, so prefer the numeric legacy ID.
+    if not node:
+        return None
+    if node.get("legacyResourceId"):
+        return str(node["legacyResourceId"])
+    return str(node["id"]).rsplit("/", 1)[-1] if node.get("id") else None
+
+
+def _money(field: Optional[dict]) -> float:
+    return float(((field or {}).get("shopMoney") or {}).get("amount") or 0)
+
+
+def _bulk_customer(node: dict) -> CustomerRecord:
+    addr = node.get("defaultAddress") or {}
+    spent = node.get("amountSpent") or {}
+    consent = node.get("emailMarketingConsent") or {}
+    return CustomerRecord(
+        external_id=_legacy_id(node),
+        email=node.get("email"),
+        first_name=node.get("firstName"),
+        last_name=node.get("lastName"),
+        phone=node.get("phone"),
+        country=addr.get("country"),
+        city=addr.get("city"),
+        created_at=_timestamp(node.get("createdAt")),
+        properties={
+            "tags": ", ".join(node.get("tags") or []),
+            "accepts_marketing": consent.get("marketingState") == "SUBSCRIBED",
+            "orders_count": int(node.get("numberOfOrders") or 0),
+            "total_spent": spent.get("amount", "0"),
+            "verified_email": node.get("verifiedEmail", False),
+            "currency": spent.get("currencyCode", "USD"),
+        },
+    )
+
+
+def _bulk_order(node: dict, line_items: list[dict]) -> OrderRecord:
+    name = (node.get("name") or "").lstrip("#")
+    return OrderRecord(
+        external_id=_legacy_id(node),
+        customer_external_id=_legacy_id(node.get("customer")),
+        total=_money(node.get("totalPriceSet")),
+        currency=node.get("currencyCode") or "USD",
+        status=(node.get("displayFinancialStatus") or "paid").lower(),
+        items=[
+            {
+                "product_id": _legacy_id(li.get("product")) or "",
+                "variant_id": _legacy_id(li.get("variant")) or "",
+                "title": li.get("title", ""),
+                "quantity": li.get("quantity", 1),
+                "price": _money(li.get("originalUnitPriceSet")),
+                "sku": li.get("sku") or "",
+                "vendor": li.get("vendor") or "",
+            }
+            for li in line_items
+        ],
+        discount_total=_money(node.get("totalDiscountsSet")),
+        channel=node.get("sourceName"),
+        ordered_at=_timestamp(node.get("createdAt")),
+        properties={
+            "order_number": int(name) if name.isdigit() else name or None,
+            "fulfillment_status": (node.get("displayFulfillmentStatus") or "").lower() or None,
+            "tags": ", ".join(node.get("tags") or []),
+        },
+    )
 
 
 @ConnectorRegistry.register("shopify")
-class ShopifyConnector(BaseConnector):
+class ShopifyConnector(AsyncBaseConnector):
     connector_type = "shopify"
+    # REST leaky bucket: 40 requests, draining at 2/s (Plus stores scale both by 10).
+    default_requests_per_second = 2.0
+    default_request_burst = 40.0
+    BUCKET_DRAIN_SECONDS = 20.0
 
     def __init__(self, org_id: str, connector_id: str, config: dict, credentials: dict):
         super().__init__(org_id, connector_id, config, credentials)
@@ -17,6 +174,13 @@ class ShopifyConnector(BaseConnector):
         self.access_token = credentials.get("access_token", "")
         self.api_version = config.get("api_version", "2024-04")
         self.base_url = f"https://{self.shop_domain}/admin/api/{self.api_version}"
+        self.bulk_mode = config.get("bulk_mode", "off")
+        if self.bulk_mode not in BULK_MODES:
+            raise ValueError(f"bulk_mode must be one of {BULK_MODES}, got {self.bulk_mode!r}")
+        self.bulk_poll_seconds = float(config.get("bulk_poll_seconds", 5.0))
+        self.bulk_max_wait_seconds = float(config.get("bulk_max_wait_seconds", 6 * 3600))
+        self._bulk_lock: Optional[asyncio.Lock] = None
+        self._bulk_loop: Optional[asyncio.AbstractEventLoop] = None
 
     @property
     def headers(self) -> dict:
@@ -25,35 +189,40 @@ class ShopifyConnector(BaseConnector):
             "Content-Type": "application/json",
         }
 
-    def validate_credentials(self) -> bool:
+    def rate_limit_state(self, resp: httpx.Response) -> Optional[RateLimitState]:
+        header = resp.headers.get("X-Shopify-Shop-Api-Call-Limit")
+        if not header:
+            return None
+        used, _, size = header.partition("/")
         try:
-            with httpx.Client() as client:
-                resp = client.get(f"{self.base_url}/shop.json", headers=self.headers, timeout=10)
-                return resp.status_code == 200
-        except Exception:
-            return False
-
-    def fetch_customers(self, since: Optional[datetime] = None) -> list[CustomerRecord]:
-        customers = []
+            used_calls, bucket = float(used), float(size)
+        except ValueError:
+            return None
+        return RateLimitState(
+            limit=bucket,
+            remaining=bucket - used_calls,
+            refill_per_second=bucket / self.BUCKET_DRAIN_SECONDS,
+        )
+
+    async def avalidate_credentials(self) -> bool:
+        resp = await self.request("GET", f"{self.base_url}/shop.json", timeout=10)
+        return resp.status_code == 200
+
+    async def customer_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[CustomerRecord]]:
+        if self._use_bulk(since, cursor):
+            async for page in self.bulk_pages("customers", since, cursor):
+                yield page
+            return
+
         params = {"limit": 250}
         if since:
             params["updated_at_min"] = since.isoformat()
 
-        page_info = None
-        while True:
-            if page_info:
-                params = {"limit": 250, "page_info": page_info}
-
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.base_url}/customers.json",
-                    headers=self.headers,
-                    params=params,
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
+        count = 0
+        async for data, next_cursor in self.cursor_pages(f"{self.base_url}/customers.json", _next_link, params=params, cursor=cursor):
+            customers = []
             for c in data.get("customers", []):
                 addr = c.get("default_address") or {}
                 customers.append(CustomerRecord(
@@ -64,7 +233,7 @@ class ShopifyConnector(BaseConnector):
                     phone=c.get("phone"),
                     country=addr.get("country"),
                     city=addr.get("city"),
-                    created_at=datetime.fromisoformat(c["created_at"].replace("Z", "+00:00")) if c.get("created_at") else None,
+                    created_at=_timestamp(c.get("created_at")),
                     properties={
                         "tags": c.get("tags", ""),
                         "accepts_marketing": c.get("accepts_marketing", False),
@@ -74,39 +243,26 @@ class ShopifyConnector(BaseConnector):
                         "currency": c.get("currency", "USD"),
                     }
                 ))
+            count += len(customers)
+            yield Page(customers, next_cursor)
 
-            link_header = resp.headers.get("Link", "")
-            if 'rel="next"' in link_header:
-                import re
-                match = re.search(r'page_info=([^&>]+)[^>]*>;\s*rel="next"', link_header)
-                page_info = match.group(1) if match else None
-            else:
-                break
+        self.log.info("Shopify customers fetched", count=count)
 
-        self.log.info("Shopify customers fetched", count=len(customers))
-        return customers
+    async def order_pages(
+        self, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list[OrderRecord]]:
+        if self._use_bulk(since, cursor):
+            async for page in self.bulk_pages("orders", since, cursor):
+                yield page
+            return
 
-    def fetch_orders(self, since: Optional[datetime] = None) -> list[OrderRecord]:
-        orders = []
         params = {"limit": 250, "status": "any"}
         if since:
             params["updated_at_min"] = since.isoformat()
 
-        page_info = None
-        while True:
-            if page_info:
-                params = {"limit": 250, "status": "any", "page_info": page_info}
-
-            with httpx.Client() as client:
-                resp = client.get(
-                    f"{self.base_url}/orders.json",
-                    headers=self.headers,
-                    params=params,
-                    timeout=30,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
+        count = 0
+        async for data, next_cursor in self.cursor_pages(f"{self.base_url}/orders.json", _next_link, params=params, cursor=cursor):
+            orders = []
             for o in data.get("orders", []):
                 items = []
                 for li in o.get("line_items", []):
@@ -129,21 +285,138 @@ class ShopifyConnector(BaseConnector):
                     items=items,
                     discount_total=float(o.get("total_discounts", 0)),
                     channel=o.get("source_name"),
-                    ordered_at=datetime.fromisoformat(o["created_at"].replace("Z", "+00:00")) if o.get("created_at") else None,
+                    ordered_at=_timestamp(o.get("created_at")),
                     properties={
                         "order_number": o.get("order_number"),
                         "fulfillment_status": o.get("fulfillment_status"),
                         "tags": o.get("tags", ""),
                     }
                 ))
+            count += len(orders)
+            yield Page(orders, next_cursor)
+
+        self.log.info("Shopify orders fetched", count=count)
+
+    def _use_bulk(self, since: Optional[datetime], cursor: Optional[dict]) -> bool:
+        if cursor is not None:
+            return "bulk_url" in cursor
+        return self.bulk_mode == "always" or (self.bulk_mode == "backfill" and since is None)
+
+    async def graphql(self, query: str, variables: Optional[dict] = None, idempotent: bool = True) -> dict:
+        # Queries are safe to retry; mutations pass idempotent=False.
+        resp = await self.request(
+            "POST",
+            f"{self.base_url}/graphql.json",
+            json={"query": query, "variables": variables or {}},
+            idempotent=idempotent,
+        )
+        body = resp.json()
+        if body.get("errors"):
+            raise RuntimeError(f"Shopify GraphQL error: {body['errors']}")
+        return body["data"]
+
+    def _bulk_operation_lock(self) -> asyncio.Lock:
+        # A shop runs one bulk query at a time; customers and orders take turns exporting
+        # and only overlap while downloading.
+        loop = asyncio.get_running_loop()
+        if self._bulk_loop is not loop:
+            self._bulk_lock, self._bulk_loop = asyncio.Lock(), loop
+        return self._bulk_lock
+
+    async def run_bulk_operation(self, query: str) -> Optional[str]:
+        async with self._bulk_operation_lock():
+            # A replayed bulkOperationRunQuery is refused as already in progress.
+            data = await self.graphql(_BULK_RUN_MUTATION, {"query": query}, idempotent=False)
+            result = data["bulkOperationRunQuery"]
+            if result.get("userErrors"):
+                raise RuntimeError(f"Shopify bulk operation rejected: {result['userErrors']}")
+            operation_id = result["bulkOperation"]["id"]
+            self.log.info("Shopify bulk operation started", operation_id=operation_id)
+
+            deadline = time.monotonic() + self.bulk_max_wait_seconds
+            while True:
+                operation = (await self.graphql(_BULK_STATUS_QUERY, {"id": operation_id}))["node"]
+                if operation["status"] in BULK_FINAL_STATUSES:
+                    break
+                if time.monotonic() >= deadline:
+                    # Cancel so the shop is free for the next export attempt.
+                    await self.graphql(_BULK_CANCEL_MUTATION, {"id": operation_id}, idempotent=False)
+                    raise TimeoutError(
+                        f"Shopify bulk operation {operation_id} still {operation['status'].lower()} "
+                        f"after {self.bulk_max_wait_seconds:.0f}s"
+                    )
+                self.log.debug(
+                    "Shopify bulk operation running",
+                    operation_id=operation_id, status=operation["status"], objects=operation.get("objectCount"),
+                )
+                await asyncio.sleep(self.bulk_poll_seconds)
+
+        if operation["status"] != "COMPLETED":
+            raise RuntimeError(
+                f"Shopify bulk operation {operation_id} {operation['status'].lower()}: {operation.get('errorCode')}"
+            )
+        self.log.info("Shopify bulk operation completed", operation_id=operation_id, objects=operation.get("objectCount"))
+        # No URL means the query matched nothing.
+        return operation.get("url")
+
+    async def bulk_lines(self, url: str) -> AsyncIterator[dict]:
+        # The export is a signed storage URL: fetched without the shop's access token.
+        async with self.session() as client:
+            async with client.stream("GET", url, timeout=None) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if line.strip():
+                        yield json.loads(line)
+
+    async def _bulk_objects(self, resource: str, url: str) -> AsyncIterator:
+        # Nested connections are flattened into child lines carrying __parentId, written
+        # right after their parent, so a parent is complete once the next parent starts.
+        parent, children = None, []
+        async for obj in self.bulk_lines(url):
+            if "__parentId" in obj:
+                if parent is not None and obj["__parentId"] == parent["id"]:
+                    children.append(obj)
+                continue
+            if parent is not None:
+                yield _bulk_order(parent, children) if resource == "orders" else _bulk_customer(parent)
+            parent, children = obj, []
+        if parent is not None:
+            yield _bulk_order(parent, children) if resource == "orders" else _bulk_customer(parent)
+
+    async def bulk_pages(
+        self, resource: str, since: Optional[datetime] = None, cursor: Optional[dict] = None
+    ) -> AsyncIterator[list]:
+        if cursor is not None:
+            # Resume by re-reading the same export and skipping what was already written.
+            emitted = False
+            try:
+                async for page in self._bulk_batches(resource, cursor["bulk_url"], cursor["skip"]):
+                    emitted = True
+                    yield page
+                return
+            except httpx.HTTPStatusError as exc:
+                # Export URLs expire after a week; run a fresh export instead.
+                if emitted:
+                    raise
+                self.log.warning("Shopify bulk export unavailable, exporting again", status=exc.response.status_code)
 
-            link_header = resp.headers.get("Link", "")
-            if 'rel="next"' in link_header:
-                import re
-                match = re.search(r'page_info=([^&>]+)[^>]*>;\s*rel="next"', link_header)
-                page_info = match.group(1) if match else None
-            else:
-                break
+        search = f'(query: "updated_at:>=\'{since.isoformat()}\'")' if since else ""
+        template = _BULK_ORDERS_QUERY if resource == "orders" else _BULK_CUSTOMERS_QUERY
+        url = await self.run_bulk_operation(template % {"filter": search})
+        if url is not None:
+            async for page in self._bulk_batches(resource, url):
+                yield page
 
-        self.log.info("Shopify orders fetched", count=len(orders))
-        return orders
+    async def _bulk_batches(self, resource: str, url: str, skip: int = 0) -> AsyncIterator[list]:
+        batch, seen = [], 0
+        async for record in self._bulk_objects(resource, url):
+            seen += 1
+            if seen <= skip:
+                continue
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield Page(batch, {"bulk_url": url, "skip": seen})
+                batch = []
+        if batch:
+            yield Page(batch, None)
+        self.log.info("Shopify bulk export read", resource=resource, count=seen - skip)
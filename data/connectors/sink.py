@@ -0,0 +1,261 @@
+"""
+Connector record sink.
+Persists the page batches a connector sync streams out into customers, orders and
+customer_events with one execute_values round trip per batch, upserting on
+(org_id, connector_id, external_id). Orders and events live in hypertables, which
+cannot carry that key as a unique index, so they upsert through an UPDATE-then-INSERT
+CTE under a per-connector advisory lock instead of ON CONFLICT. Customer external IDs
+are resolved to UUIDs once per batch; IDs not seen yet get a placeholder customer that
+the customer stream fills in later, since resources are fetched concurrently.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict
+from typing import Iterable, Optional, Sequence
+
+import structlog
+
+from data.connectors.base import CustomerRecord, EventRecord, OrderRecord
+
+log = structlog.get_logger()
+
+_CUSTOMER_UPSERT_SQL = """
+    INSERT INTO customers
+        (org_id, connector_id, external_id, email, first_name, last_name, phone,
+         country, city, properties, created_at, updated_at)
+    VALUES %s
+    ON CONFLICT (org_id, connector_id, external_id) DO UPDATE SET
+        email      = COALESCE(EXCLUDED.email, customers.email),
+        first_name = COALESCE(EXCLUDED.first_name, customers.first_name),
+        last_name  = COALESCE(EXCLUDED.last_name, customers.last_name),
+        phone      = COALESCE(EXCLUDED.phone, customers.phone),
+        country    = COALESCE(EXCLUDED.country, customers.country),
+        city       = COALESCE(EXCLUDED.city, customers.city),
+        properties = customers.properties || EXCLUDED.properties,
+        created_at = LEAST(customers.created_at, EXCLUDED.created_at),
+        updated_at = NOW()
+    RETURNING external_id, id
+"""
+_CUSTOMER_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, COALESCE(%s, NOW()), NOW())"
+
+_PLACEHOLDER_CUSTOMER_SQL = """
+    INSERT INTO customers (org_id, connector_id, external_id)
+    VALUES %s
+    ON CONFLICT (org_id, connector_id, external_id) DO UPDATE SET external_id = EXCLUDED.external_id
+    RETURNING external_id, id
+"""
+
+# ordered_at is the orders partitioning column and is left alone on update.
+_ORDER_UPSERT_SQL = """
+    WITH v (org_id, connector_id, external_id, customer_id, status, currency, subtotal, total,
+            discount_total, items, channel, properties, ordered_at) AS (VALUES %s),
+    updated AS (
+        UPDATE orders o SET
+            customer_id    = COALESCE(v.customer_id, o.customer_id),
+            status         = v.status,
+            currency       = v.currency,
+            subtotal       = v.subtotal,
+            total          = v.total,
+            discount_total = v.discount_total,
+            items          = v.items,
+            channel        = v.channel,
+            properties     = v.properties
+        FROM v
+        WHERE o.org_id = v.org_id AND o.connector_id = v.connector_id AND o.external_id = v.external_id
+        RETURNING o.external_id
+    )
+    INSERT INTO orders
+        (org_id, connector_id, external_id, customer_id, status, currency, subtotal, total,
+         discount_total, items, channel, properties, ordered_at)
+    SELECT * FROM v WHERE v.external_id NOT IN (SELECT external_id FROM updated)
+"""
+_ORDER_TEMPLATE = (
+    "(%s::uuid, %s::uuid, %s, %s::uuid, %s, %s, %s::numeric, %s::numeric, %s::numeric, "
+    "%s::jsonb, %s, %s::jsonb, COALESCE(%s::timestamptz, NOW()))"
+)
+
+_EVENT_UPSERT_SQL = """
+    WITH v (org_id, connector_id, external_id, customer_id, event_type, event_data, source, occurred_at)
+        AS (VALUES %s),
+    updated AS (
+        UPDATE customer_events e SET
+            customer_id = v.customer_id,
+            event_type  = v.event_type,
+            event_data  = v.event_data,
+            source      = v.source
+        FROM v
+        WHERE v.external_id IS NOT NULL
+          AND e.org_id = v.org_id AND e.connector_id = v.connector_id AND e.external_id = v.external_id
+        RETURNING e.external_id
+    )
+    INSERT INTO customer_events
+        (org_id, connector_id, external_id, customer_id, event_type, event_data, source, occurred_at)
+    SELECT * FROM v
+    WHERE v.external_id IS NULL OR v.external_id NOT IN (SELECT external_id FROM updated)
+"""
+_EVENT_TEMPLATE = (
+    "(%s::uuid, %s::uuid, %s, %s::uuid, %s, %s::jsonb, %s, COALESCE(%s::timestamptz, NOW()))"
+)
+
+
+def _dedupe(records: Iterable, key) -> list:
+    # A page can repeat an ID (e.g. a record updated mid-pagination); ON CONFLICT and the
+    # CTE both reject touching one row twice in a statement, so the last copy wins.
+    latest = {}
+    unkeyed = []
+    for record in records:
+        k = key(record)
+        if k is None:
+            unkeyed.append(record)
+        else:
+            latest[k] = record
+    return [*latest.values(), *unkeyed]
+
+
+class PostgresSink:
+    def __init__(self, connection, org_id: str, connector_id: str, max_cached_customers: int = 100_000):
+        self.connection = connection
+        self.org_id = str(org_id)
+        self.connector_id = str(connector_id)
+        self.max_cached_customers = max_cached_customers
+        self._customer_ids: dict[str, str] = {}
+        # IDs seen in the open transaction; cached only once it commits.
+        self._pending: list[tuple] = []
+        self.rows: dict[str, int] = defaultdict(int)
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.log = log.bind(component="PostgresSink", connector_id=self.connector_id)
+
+    def throughput(self) -> dict[str, dict]:
+        return {
+            resource: {
+                "rows": self.rows[resource],
+                "seconds": round(self.seconds[resource], 3),
+                "rows_per_second": round(self.rows[resource] / self.seconds[resource], 1) if self.seconds[resource] else None,
+            }
+            for resource in self.rows
+        }
+
+    def write(self, resource: str, records: list) -> int:
+        if not records:
+            return 0
+        writers = {"customers": self._write_customers, "orders": self._write_orders, "events": self._write_events}
+        started = time.perf_counter()
+        try:
+            with self.connection.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self.connector_id,))
+                written = writers[resource](cur, records)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        finally:
+            pending, self._pending = self._pending, []
+        self._remember(pending)
+        self.rows[resource] += written
+        self.seconds[resource] += time.perf_counter() - started
+        return written
+
+    def _remember(self, rows: Sequence[tuple]) -> None:
+        if len(self._customer_ids) + len(rows) > self.max_cached_customers:
+            self._customer_ids.clear()
+        self._customer_ids.update((external_id, str(customer_id)) for external_id, customer_id in rows)
+
+    def _resolve_customers(self, cur, external_ids: Iterable[Optional[str]]) -> dict[str, str]:
+        from psycopg2.extras import execute_values
+
+        wanted = {e for e in external_ids if e}
+        resolved = {e: self._customer_ids[e] for e in wanted if e in self._customer_ids}
+        missing = [e for e in wanted if e not in resolved]
+        if missing:
+            cur.execute(
+                """
+                SELECT external_id, id FROM customers
+                WHERE org_id = %s AND connector_id = %s AND external_id = ANY(%s)
+                """,
+                (self.org_id, self.connector_id, missing),
+            )
+            resolved.update((e, str(customer_id)) for e, customer_id in cur.fetchall())
+        unknown = [e for e in missing if e not in resolved]
+        if unknown:
+            rows = execute_values(
+                cur,
+                _PLACEHOLDER_CUSTOMER_SQL,
+                [(self.org_id, self.connector_id, e) for e in unknown],
+                page_size=len(unknown),
+                fetch=True,
+            )
+            resolved.update((e, str(customer_id)) for e, customer_id in rows)
+        self._pending.extend((e, resolved[e]) for e in missing)
+        return resolved
+
+    def _write_customers(self, cur, records: list[CustomerRecord]) -> int:
+        from psycopg2.extras import execute_values
+
+        records = _dedupe(records, lambda r: r.external_id)
+        rows = execute_values(
+            cur,
+            _CUSTOMER_UPSERT_SQL,
+            [
+                (
+                    self.org_id, self.connector_id, r.external_id, r.email, r.first_name, r.last_name,
+                    r.phone, r.country, r.city, json.dumps(r.properties, default=str), r.created_at,
+                )
+                for r in records
+            ],
+            template=_CUSTOMER_TEMPLATE,
+            page_size=len(records),
+            fetch=True,
+        )
+        self._pending.extend(rows)
+        return len(rows)
+
+    def _write_orders(self, cur, records: list[OrderRecord]) -> int:
+        from psycopg2.extras import execute_values
+
+        records = _dedupe(records, lambda r: r.external_id)
+        customers = self._resolve_customers(cur, (r.customer_external_id for r in records))
+        execute_values(
+            cur,
+            _ORDER_UPSERT_SQL,
+            [
+                (
+                    self.org_id, self.connector_id, r.external_id, customers.get(r.customer_external_id),
+                    r.status, r.currency, r.total, r.total, r.discount_total,
+                    json.dumps(r.items, default=str), r.channel, json.dumps(r.properties, default=str),
+                    r.ordered_at,
+                )
+                for r in records
+            ],
+            template=_ORDER_TEMPLATE,
+            page_size=len(records),
+        )
+        return len(records)
+
+    def _write_events(self, cur, records: list[EventRecord]) -> int:
+        from psycopg2.extras import execute_values
+
+        records = _dedupe(records, lambda r: r.external_id)
+        customers = self._resolve_customers(cur, (r.customer_external_id for r in records))
+        # customer_events.customer_id is required; events without a profile cannot be stored.
+        keep = [r for r in records if r.customer_external_id in customers]
+        if len(keep) < len(records):
+            self.log.warning("Skipping events without a customer", skipped=len(records) - len(keep))
+        if not keep:
+            return 0
+        execute_values(
+            cur,
+            _EVENT_UPSERT_SQL,
+            [
+                (
+                    self.org_id, self.connector_id, r.external_id, customers[r.customer_external_id],
+                    r.event_type, json.dumps(r.event_data, default=str), r.source, r.occurred_at,
+                )
+                for r in keep
+            ],
+            template=_EVENT_TEMPLATE,
+            page_size=len(keep),
+        )
+        return len(keep)
@@ -82,6 +82,8 @@ CREATE TABLE customer_events (
     id UUID DEFAULT uuid_generate_v4(),
     org_id UUID NOT NULL,
     customer_id UUID NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+    connector_id UUID REFERENCES connectors(id),
+    external_id VARCHAR(255),
     event_type VARCHAR(100) NOT NULL,
     event_data JSONB DEFAULT '{}',
     source VARCHAR(100),
@@ -92,6 +94,7 @@ CREATE TABLE customer_events (
 SELECT create_hypertable('customer_events', 'occurred_at', if_not_exists => TRUE);
 CREATE INDEX ON customer_events (org_id, customer_id, occurred_at DESC);
 CREATE INDEX ON customer_events (org_id, event_type, occurred_at DESC);
+CREATE INDEX ON customer_events (org_id, connector_id, external_id);
 
 CREATE TABLE orders (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -116,6 +119,7 @@ CREATE TABLE orders (
 SELECT create_hypertable('orders', 'ordered_at', if_not_exists => TRUE);
 CREATE INDEX ON orders (org_id, customer_id, ordered_at DESC);
 CREATE INDEX ON orders (org_id, ordered_at DESC);
+CREATE INDEX ON orders (org_id, connector_id, external_id);
 
 CREATE TABLE customer_features (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -186,15 +190,53 @@ CREATE TABLE churn_predictions (
     org_id UUID NOT NULL,
     customer_id UUID NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
     churn_probability_30d NUMERIC(5, 4),
+    churn_probability_60d NUMERIC(5, 4),
     churn_probability_90d NUMERIC(5, 4),
+    survival_curve REAL[],
+    predicted_days_to_churn REAL,
+    risk_level VARCHAR(20),
     predicted_ltv NUMERIC(12, 2),
     recommended_intervention VARCHAR(100),
     intervention_expected_impact JSONB,
     model_version VARCHAR(50),
-    predicted_at TIMESTAMPTZ DEFAULT NOW()
+    predicted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
 SELECT create_hypertable('churn_predictions', 'predicted_at', if_not_exists => TRUE);
+CREATE INDEX ON churn_predictions (org_id, customer_id, predicted_at DESC);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS churn_predictions_latest AS
+SELECT DISTINCT ON (customer_id)
+    org_id, customer_id,
+    churn_probability_30d, churn_probability_60d, churn_probability_90d,
+    predicted_days_to_churn, risk_level, predicted_ltv,
+    recommended_intervention, model_version, predicted_at
+FROM churn_predictions
+ORDER BY customer_id, predicted_at DESC;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_predictions_latest_customer
+    ON churn_predictions_latest (customer_id);
+
+CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_risk
+    ON churn_predictions_latest (org_id, risk_level, churn_probability_30d DESC);
+
+CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_ltv
+    ON churn_predictions_latest (org_id, predicted_ltv DESC);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS churn_risk_summary AS
+SELECT
+    org_id,
+    CASE WHEN GROUPING(risk_level) = 1 THEN 'all' ELSE COALESCE(risk_level, 'unknown') END AS risk_bucket,
+    COUNT(*) AS customers,
+    SUM(predicted_ltv) AS total_ltv,
+    AVG(predicted_ltv) AS avg_ltv,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY predicted_ltv) AS median_ltv,
+    AVG(churn_probability_30d) AS avg_churn_probability_30d
+FROM churn_predictions_latest
+GROUP BY GROUPING SETS ((org_id, risk_level), (org_id));
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_risk_summary_org_bucket
+    ON churn_risk_summary (org_id, risk_bucket);
 
 CREATE TABLE campaigns (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -268,6 +310,53 @@ SELECT create_hypertable('brand_mentions', 'mentioned_at', if_not_exists => TRUE
 CREATE INDEX ON brand_mentions (org_id, mentioned_at DESC);
 CREATE INDEX ON brand_mentions (org_id, source, mentioned_at DESC);
 
+CREATE TABLE brand_mention_sources (
+    org_id UUID NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    source_id VARCHAR(500) NOT NULL,
+    first_seen_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (org_id, source, source_id)
+);
+
+CREATE TABLE brand_sentiment_hourly (
+    org_id UUID NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    mentions INTEGER NOT NULL DEFAULT 0,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_product_quality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_customer_service_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_pricing_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_brand_trust_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_innovation_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_sustainability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_ux_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_delivery_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_brand_personality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_competitive_position_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (org_id, bucket, source)
+);
+
+CREATE TABLE segment_transition_models (
+    org_id UUID PRIMARY KEY,
+    counts BYTEA NOT NULL,
+    last_assigned_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE connector_sync_state (
+    connector_id UUID NOT NULL REFERENCES connectors(id) ON DELETE CASCADE,
+    resource VARCHAR(50) NOT NULL,
+    high_water_mark TIMESTAMPTZ,
+    cursor JSONB,
+    run_started_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (connector_id, resource)
+);
+
 CREATE TABLE attribution_touchpoints (
     id UUID DEFAULT uuid_generate_v4(),
     org_id UUID NOT NULL,
@@ -285,6 +374,8 @@ CREATE TABLE attribution_touchpoints (
 );
 
 SELECT create_hypertable('attribution_touchpoints', 'occurred_at', if_not_exists => TRUE);
+CREATE INDEX ON attribution_touchpoints (org_id, customer_id, occurred_at, id);
+CREATE INDEX ON attribution_touchpoints (org_id, occurred_at, id);
 
 CREATE TABLE alerts (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -0,0 +1,34 @@
+"""Add keyset pagination indexes on attribution_touchpoints.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "attribution_touchpoints" not in set(inspector.get_table_names()):
+        return
+
+    op.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_attribution_touchpoints_org_customer_occurred "
+        "ON attribution_touchpoints (org_id, customer_id, occurred_at, id)"
+    ))
+    op.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_attribution_touchpoints_org_occurred "
+        "ON attribution_touchpoints (org_id, occurred_at, id)"
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_attribution_touchpoints_org_occurred"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_attribution_touchpoints_org_customer_occurred"))
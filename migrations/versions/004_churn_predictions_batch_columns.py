@@ -0,0 +1,65 @@
+"""Create churn_predictions with the columns written by the batch scorer.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+
+    if "churn_predictions" not in existing_tables:
+        op.create_table(
+            "churn_predictions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), server_default=sa.text("gen_random_uuid()")),
+            sa.Column("org_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("customer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("customers.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("churn_probability_30d", sa.Numeric(5, 4), nullable=True),
+            sa.Column("churn_probability_60d", sa.Numeric(5, 4), nullable=True),
+            sa.Column("churn_probability_90d", sa.Numeric(5, 4), nullable=True),
+            sa.Column("survival_curve", postgresql.ARRAY(sa.REAL), nullable=True),
+            sa.Column("predicted_days_to_churn", sa.REAL, nullable=True),
+            sa.Column("risk_level", sa.String(20), nullable=True),
+            sa.Column("predicted_ltv", sa.Numeric(12, 2), nullable=True),
+            sa.Column("recommended_intervention", sa.String(100), nullable=True),
+            sa.Column("intervention_expected_impact", postgresql.JSONB, nullable=True),
+            sa.Column("model_version", sa.String(50), nullable=True),
+            sa.Column("predicted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        )
+    else:
+        for column, ddl_type in (
+            ("churn_probability_60d", "NUMERIC(5, 4)"),
+            ("survival_curve", "REAL[]"),
+            ("predicted_days_to_churn", "REAL"),
+            ("risk_level", "VARCHAR(20)"),
+        ):
+            op.execute(sa.text(f"ALTER TABLE churn_predictions ADD COLUMN IF NOT EXISTS {column} {ddl_type}"))
+
+    op.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_churn_predictions_org_customer_predicted "
+        "ON churn_predictions (org_id, customer_id, predicted_at DESC)"
+    ))
+
+    op.execute(sa.text("SAVEPOINT sp_ht_churn_predictions"))
+    try:
+        op.execute(sa.text("SELECT create_hypertable('churn_predictions', 'predicted_at', if_not_exists => TRUE, migrate_data => TRUE)"))
+        op.execute(sa.text("RELEASE SAVEPOINT sp_ht_churn_predictions"))
+    except Exception:
+        op.execute(sa.text("ROLLBACK TO SAVEPOINT sp_ht_churn_predictions"))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_churn_predictions_org_customer_predicted"))
+    for column in ("risk_level", "predicted_days_to_churn", "survival_curve", "churn_probability_60d"):
+        op.execute(sa.text(f"ALTER TABLE churn_predictions DROP COLUMN IF EXISTS {column}"))
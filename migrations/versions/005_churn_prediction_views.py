@@ -0,0 +1,77 @@
+"""Add churn_predictions_latest and churn_risk_summary materialized views.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS churn_predictions_latest AS
+        SELECT DISTINCT ON (customer_id)
+            org_id, customer_id,
+            churn_probability_30d, churn_probability_60d, churn_probability_90d,
+            predicted_days_to_churn, risk_level, predicted_ltv,
+            recommended_intervention, model_version, predicted_at
+        FROM churn_predictions
+        ORDER BY customer_id, predicted_at DESC
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_predictions_latest_customer
+            ON churn_predictions_latest (customer_id)
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_risk
+            ON churn_predictions_latest (org_id, risk_level, churn_probability_30d DESC)
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_ltv
+            ON churn_predictions_latest (org_id, predicted_ltv DESC)
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS churn_risk_summary AS
+        SELECT
+            org_id,
+            CASE WHEN GROUPING(risk_level) = 1 THEN 'all' ELSE COALESCE(risk_level, 'unknown') END AS risk_bucket,
+            COUNT(*) AS customers,
+            SUM(predicted_ltv) AS total_ltv,
+            AVG(predicted_ltv) AS avg_ltv,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY predicted_ltv) AS median_ltv,
+            AVG(churn_probability_30d) AS avg_churn_probability_30d
+        FROM churn_predictions_latest
+        GROUP BY GROUPING SETS ((org_id, risk_level), (org_id))
+        """
+    ))
+
+    op.execute(sa.text(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_risk_summary_org_bucket
+            ON churn_risk_summary (org_id, risk_bucket)
+        """
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP MATERIALIZED VIEW IF EXISTS churn_risk_summary"))
+    op.execute(sa.text("DROP MATERIALIZED VIEW IF EXISTS churn_predictions_latest"))
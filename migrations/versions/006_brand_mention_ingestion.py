@@ -0,0 +1,56 @@
+"""Add brand_mentions columns written by mention ingestion and the source_id ledger.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+MENTION_COLUMNS = (
+    ("source_id", "VARCHAR(500)"),
+    ("content", "TEXT"),
+    ("url", "VARCHAR(2000)"),
+    ("sentiment_overall", "NUMERIC(5, 4)"),
+    ("sentiment_product_quality", "NUMERIC(5, 4)"),
+    ("sentiment_customer_service", "NUMERIC(5, 4)"),
+    ("sentiment_pricing", "NUMERIC(5, 4)"),
+    ("sentiment_brand_trust", "NUMERIC(5, 4)"),
+    ("sentiment_innovation", "NUMERIC(5, 4)"),
+    ("sentiment_sustainability", "NUMERIC(5, 4)"),
+    ("sentiment_ux", "NUMERIC(5, 4)"),
+    ("sentiment_delivery", "NUMERIC(5, 4)"),
+    ("sentiment_brand_personality", "NUMERIC(5, 4)"),
+    ("sentiment_competitive_position", "NUMERIC(5, 4)"),
+    ("is_competitor", "BOOLEAN DEFAULT false"),
+    ("mentioned_at", "TIMESTAMPTZ DEFAULT NOW()"),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "brand_mentions" in set(inspector.get_table_names()):
+        for column, ddl_type in MENTION_COLUMNS:
+            op.execute(sa.text(f"ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS {column} {ddl_type}"))
+
+    op.execute(sa.text(
+        """
+        CREATE TABLE IF NOT EXISTS brand_mention_sources (
+            org_id UUID NOT NULL,
+            source VARCHAR(100) NOT NULL,
+            source_id VARCHAR(500) NOT NULL,
+            first_seen_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (org_id, source, source_id)
+        )
+        """
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS brand_mention_sources"))
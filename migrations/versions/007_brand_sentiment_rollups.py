@@ -0,0 +1,85 @@
+"""Add hourly brand sentiment rollups and backfill them from brand_mentions.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+DIMENSION_COLUMNS = (
+    "sentiment_product_quality",
+    "sentiment_customer_service",
+    "sentiment_pricing",
+    "sentiment_brand_trust",
+    "sentiment_innovation",
+    "sentiment_sustainability",
+    "sentiment_ux",
+    "sentiment_delivery",
+    "sentiment_brand_personality",
+    "sentiment_competitive_position",
+)
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        """
+        CREATE TABLE IF NOT EXISTS brand_sentiment_hourly (
+            org_id UUID NOT NULL,
+            bucket TIMESTAMPTZ NOT NULL,
+            source VARCHAR(100) NOT NULL,
+            mentions INTEGER NOT NULL DEFAULT 0,
+            positive INTEGER NOT NULL DEFAULT 0,
+            negative INTEGER NOT NULL DEFAULT 0,
+            scored INTEGER NOT NULL DEFAULT 0,
+            sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_product_quality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_customer_service_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_pricing_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_brand_trust_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_innovation_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_sustainability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_ux_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_delivery_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_brand_personality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            sentiment_competitive_position_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+            PRIMARY KEY (org_id, bucket, source)
+        )
+        """
+    ))
+
+    bind = op.get_bind()
+    if "brand_mentions" not in set(sa.inspect(bind).get_table_names()):
+        return
+    sums = ", ".join(f"{c}_sum" for c in DIMENSION_COLUMNS)
+    aggregates = ", ".join(f"COALESCE(SUM({c}), 0)" for c in DIMENSION_COLUMNS)
+    op.execute(sa.text(
+        f"""
+        INSERT INTO brand_sentiment_hourly (
+            org_id, bucket, source, mentions, positive, negative, scored, sentiment_sum, {sums}
+        )
+        SELECT
+            org_id,
+            date_trunc('hour', mentioned_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            COALESCE(source, 'unknown'),
+            COUNT(*),
+            COUNT(*) FILTER (WHERE sentiment_overall > 0.1),
+            COUNT(*) FILTER (WHERE sentiment_overall < -0.1),
+            COUNT(sentiment_overall),
+            COALESCE(SUM(sentiment_overall), 0),
+            {aggregates}
+        FROM brand_mentions
+        WHERE mentioned_at IS NOT NULL
+        GROUP BY 1, 2, 3
+        ON CONFLICT (org_id, bucket, source) DO NOTHING
+        """
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS brand_sentiment_hourly"))
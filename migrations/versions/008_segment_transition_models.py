@@ -0,0 +1,30 @@
+"""Add per-org segment transition count matrices for drift scoring.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        """
+        CREATE TABLE IF NOT EXISTS segment_transition_models (
+            org_id UUID PRIMARY KEY,
+            counts BYTEA NOT NULL,
+            last_assigned_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ DEFAULT NOW()
+        )
+        """
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS segment_transition_models"))
@@ -0,0 +1,33 @@
+"""Add per-resource connector sync checkpoints for incremental, resumable syncs.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        """
+        CREATE TABLE IF NOT EXISTS connector_sync_state (
+            connector_id UUID NOT NULL REFERENCES connectors(id) ON DELETE CASCADE,
+            resource VARCHAR(50) NOT NULL,
+            high_water_mark TIMESTAMPTZ,
+            cursor JSONB,
+            run_started_at TIMESTAMPTZ,
+            updated_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (connector_id, resource)
+        )
+        """
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS connector_sync_state"))
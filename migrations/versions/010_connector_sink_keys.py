@@ -0,0 +1,55 @@
+"""Add connector upsert keys to customers, orders and customer_events.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for column in (
+        "connector_id UUID REFERENCES connectors(id)",
+        "items JSONB DEFAULT '[]'",
+        "discount_total NUMERIC(12, 2) DEFAULT 0",
+        "properties JSONB DEFAULT '{}'",
+    ):
+        op.execute(sa.text(f"ALTER TABLE orders ADD COLUMN IF NOT EXISTS {column}"))
+    for column in (
+        "connector_id UUID REFERENCES connectors(id)",
+        "external_id VARCHAR(255)",
+        "event_data JSONB DEFAULT '{}'",
+        "source VARCHAR(100)",
+        "occurred_at TIMESTAMPTZ NOT NULL DEFAULT NOW()",
+    ):
+        op.execute(sa.text(f"ALTER TABLE customer_events ADD COLUMN IF NOT EXISTS {column}"))
+
+    op.execute(sa.text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_customers_org_connector_external "
+        "ON customers (org_id, connector_id, external_id)"
+    ))
+    # Orders and events are hypertables; unique indexes there must include the time
+    # column, so the connector sink looks rows up through these plain indexes instead.
+    op.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_orders_org_connector_external "
+        "ON orders (org_id, connector_id, external_id)"
+    ))
+    op.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_customer_events_org_connector_external "
+        "ON customer_events (org_id, connector_id, external_id)"
+    ))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_customer_events_org_connector_external"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_orders_org_connector_external"))
+    op.execute(sa.text("DROP INDEX IF EXISTS uq_customers_org_connector_external"))
+    op.execute(sa.text("ALTER TABLE customer_events DROP COLUMN IF EXISTS external_id"))
+    op.execute(sa.text("ALTER TABLE customer_events DROP COLUMN IF EXISTS connector_id"))
+    op.execute(sa.text("ALTER TABLE orders DROP COLUMN IF EXISTS connector_id"))
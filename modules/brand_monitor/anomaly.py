@@ -0,0 +1,217 @@
+"""
+Brand Sentiment Anomaly Detection - Module 4.
+Streaming detector over the hourly sentiment rollups written at ingest. Keeps an EWMA
+level and variance plus an hour-of-week seasonal baseline per (org, source, dimension);
+each ingest batch touches only the keys it carries, and the still-open hour is scored
+against its baseline as it fills, so a negative spike raises an Alert within one
+ingest cycle rather than after the next batch job.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional, Sequence
+import structlog
+
+from modules.brand_monitor.ingest import DIMENSION_COLUMNS, ROLLUP_COLUMNS
+
+log = structlog.get_logger()
+
+ALERT_TYPE = "sentiment_spike"
+OVERALL = "overall"
+HOURS_PER_WEEK = 168
+
+
+def hour_of_week(bucket: datetime) -> int:
+    return bucket.weekday() * 24 + bucket.hour
+
+
+@dataclass
+class Baseline:
+    level: float = 0.0
+    variance: float = 0.0
+    hours: int = 0
+    seasonal: dict[int, float] = field(default_factory=dict)
+    # Running totals for the hour currently being filled.
+    bucket: Optional[datetime] = None
+    numerator: float = 0.0
+    denominator: float = 0.0
+    mentions: int = 0
+    alerted: bool = False
+
+    def expected(self, slot: int) -> float:
+        return self.seasonal.get(slot, self.level)
+
+
+@dataclass
+class SentimentAlert:
+    org_id: str
+    source: str
+    dimension: str
+    bucket: datetime
+    severity: str
+    value: float
+    expected: float
+    z_score: float
+    mentions: int
+
+    @property
+    def title(self) -> str:
+        target = "" if self.dimension == OVERALL else f" ({self.dimension.replace('_', ' ')})"
+        return f"Negative sentiment spike on {self.source}{target}"
+
+    @property
+    def message(self) -> str:
+        if self.dimension == OVERALL:
+            observed = f"{self.value:.0%} of mentions negative vs {self.expected:.0%} expected"
+        else:
+            observed = f"average sentiment {-self.value:+.2f} vs {-self.expected:+.2f} expected"
+        return f"{observed} across {self.mentions} mentions in the hour from {self.bucket:%Y-%m-%d %H:00}"
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "dimension": self.dimension,
+            "bucket": self.bucket.isoformat(),
+            "value": round(self.value, 4),
+            "expected": round(self.expected, 4),
+            "z_score": round(self.z_score, 2),
+            "mentions": self.mentions,
+        }
+
+
+class SentimentAnomalyDetector:
+    def __init__(
+        self,
+        alpha: float = 0.1,
+        seasonal_alpha: float = 0.3,
+        z_threshold: float = 3.0,
+        min_mentions: int = 10,
+        min_history_hours: int = 24,
+        min_std: float = 0.05,
+    ):
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.z_threshold = z_threshold
+        self.min_mentions = min_mentions
+        self.min_history_hours = min_history_hours
+        self.min_std = min_std
+        self._baselines: dict[tuple[str, str, str], Baseline] = {}
+        self.log = log.bind(component="SentimentAnomalyDetector")
+
+    def __len__(self) -> int:
+        return len(self._baselines)
+
+    @staticmethod
+    def _metrics(row: dict) -> Iterable[tuple[str, float, float]]:
+        # Higher is worse: the negative share overall, and negated mean polarity per dimension.
+        yield OVERALL, row["negative"], row["mentions"]
+        for dim, column in DIMENSION_COLUMNS.items():
+            yield dim, -row[f"{column}_sum"], row["scored"]
+
+    def observe(self, rollups: Sequence[tuple], emit: bool = True) -> list[SentimentAlert]:
+        alerts = []
+        for org_id, bucket, source, *values in rollups:
+            row = dict(zip(ROLLUP_COLUMNS, values))
+            for dim, numerator, denominator in self._metrics(row):
+                state = self._baselines.setdefault((str(org_id), source, dim), Baseline())
+                if state.bucket is not None and bucket < state.bucket:
+                    continue  # late data for an hour already folded into the baseline
+                if state.bucket != bucket:
+                    self._close(state)
+                    state.bucket = bucket
+                    state.numerator = state.denominator = 0.0
+                    state.mentions = 0
+                    state.alerted = False
+                state.numerator += numerator
+                state.denominator += denominator
+                state.mentions += row["mentions"]
+                alert = self._check(str(org_id), source, dim, state)
+                if alert is not None and emit:
+                    alerts.append(alert)
+        for alert in alerts:
+            self.log.warning("Sentiment anomaly", org_id=alert.org_id, severity=alert.severity, **alert.to_dict())
+        return alerts
+
+    def _close(self, state: Baseline) -> None:
+        if state.bucket is None or state.denominator <= 0:
+            return
+        value = state.numerator / state.denominator
+        slot = hour_of_week(state.bucket)
+        if state.hours == 0:
+            state.level = value
+        else:
+            residual = value - state.expected(slot)
+            state.variance = (1 - self.alpha) * (state.variance + self.alpha * residual ** 2)
+            state.level += self.alpha * (value - state.level)
+        seasonal = state.seasonal.get(slot)
+        state.seasonal[slot] = value if seasonal is None else seasonal + self.seasonal_alpha * (value - seasonal)
+        state.hours += 1
+
+    def _check(self, org_id: str, source: str, dim: str, state: Baseline) -> Optional[SentimentAlert]:
+        if (
+            state.alerted
+            or state.hours < self.min_history_hours
+            or state.mentions < self.min_mentions
+            or state.denominator <= 0
+        ):
+            return None
+        value = state.numerator / state.denominator
+        expected = state.expected(hour_of_week(state.bucket))
+        z = (value - expected) / max(math.sqrt(state.variance), self.min_std)
+        if z < self.z_threshold:
+            return None
+        state.alerted = True
+        if z >= 2 * self.z_threshold:
+            severity = "critical"
+        elif z >= 1.5 * self.z_threshold:
+            severity = "high"
+        else:
+            severity = "medium"
+        return SentimentAlert(org_id, source, dim, state.bucket, severity, value, expected, z, state.mentions)
+
+
+def load_history(connection, detector: SentimentAnomalyDetector, days: int = 28) -> int:
+    with connection.cursor() as cur:
+        cur.execute(
+            f"""
+            SELECT org_id::text, bucket, source, {", ".join(ROLLUP_COLUMNS)}
+            FROM brand_sentiment_hourly
+            WHERE bucket >= NOW() - make_interval(days => %(days)s)
+            ORDER BY bucket
+            """,
+            {"days": days},
+        )
+        rows = cur.fetchall()
+    connection.commit()
+    detector.observe(rows, emit=False)
+    return len(rows)
+
+
+def write_alerts(cursor, alerts: Sequence[SentimentAlert]) -> None:
+    from psycopg2.extras import execute_values
+
+    # Mentions are not tied to organizations by a foreign key, alerts are; skip unknown orgs
+    # instead of failing the ingest transaction.
+    cursor.execute(
+        "SELECT id::text FROM organizations WHERE id = ANY(%s::uuid[])",
+        (sorted({a.org_id for a in alerts}),),
+    )
+    known = {row[0] for row in cursor.fetchall()}
+    rows = [
+        (a.org_id, ALERT_TYPE, a.severity, a.title, a.message, json.dumps(a.to_dict()))
+        for a in alerts
+        if a.org_id in known
+    ]
+    if not rows:
+        return
+    # Plain literals are coerced to the column types on insert, so severity needs no
+    # cast to the enum, whose name differs between the SQL and ORM-created schemas.
+    execute_values(
+        cursor,
+        "INSERT INTO alerts (org_id, alert_type, severity, title, message, data) VALUES %s",
+        rows,
+    )
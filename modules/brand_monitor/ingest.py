@@ -0,0 +1,477 @@
+"""
+Brand Mention Ingestion - Module 4.
+Streams new mentions from the events topic (or a JSONL file standing in for it),
+drops duplicates by source_id, scores them with the ABSA model in micro-batches and
+bulk-writes the scored rows together with their hourly sentiment rollups. Source
+offsets are committed only after the batch they cover is written, so delivery is
+at-least-once and replays are absorbed by the source_id dedupe.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Protocol, Sequence
+import structlog
+
+from modules.brand_monitor.models.absa import ABSAModel, SentimentResult
+
+if TYPE_CHECKING:
+    from modules.brand_monitor.anomaly import SentimentAnomalyDetector
+
+log = structlog.get_logger()
+
+MENTION_EVENT_TYPE = "brand_mention"
+LABEL_THRESHOLD = 0.1
+
+# ABSA dimension -> brand_mentions column
+DIMENSION_COLUMNS = {
+    "product_quality": "sentiment_product_quality",
+    "customer_service": "sentiment_customer_service",
+    "pricing_value": "sentiment_pricing",
+    "brand_trust": "sentiment_brand_trust",
+    "innovation": "sentiment_innovation",
+    "sustainability_ethics": "sentiment_sustainability",
+    "user_experience": "sentiment_ux",
+    "delivery_logistics": "sentiment_delivery",
+    "brand_personality": "sentiment_brand_personality",
+    "competitive_position": "sentiment_competitive_position",
+}
+
+# brand_mentions column widths; None means unbounded (TEXT).
+FIELD_LIMITS = {"content": None, "source": 100, "source_id": 500, "author": 255, "url": 2000}
+
+
+ROLLUP_COLUMNS = [
+    "mentions", "positive", "negative", "scored", "sentiment_sum",
+    *(f"{column}_sum" for column in DIMENSION_COLUMNS.values()),
+]
+
+_ROLLUP_UPSERT_SQL = f"""
+    INSERT INTO brand_sentiment_hourly (org_id, bucket, source, {", ".join(ROLLUP_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (org_id, bucket, source) DO UPDATE SET
+    {", ".join(f"{c} = brand_sentiment_hourly.{c} + EXCLUDED.{c}" for c in ROLLUP_COLUMNS)}
+"""
+
+# date_trunc on a timestamptz truncates in the session TimeZone, so buckets are cut
+# on the UTC wall clock explicitly to match the hours hourly_rollups writes.
+_ROLLUP_REBUILD_SQL = f"""
+    INSERT INTO brand_sentiment_hourly (org_id, bucket, source, {", ".join(ROLLUP_COLUMNS)})
+    SELECT
+        org_id,
+        date_trunc('hour', mentioned_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+        COALESCE(source, 'unknown'),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE sentiment_overall > {LABEL_THRESHOLD}),
+        COUNT(*) FILTER (WHERE sentiment_overall < -{LABEL_THRESHOLD}),
+        COUNT(sentiment_overall),
+        COALESCE(SUM(sentiment_overall), 0),
+        {", ".join(f"COALESCE(SUM({c}), 0)" for c in DIMENSION_COLUMNS.values())}
+    FROM brand_mentions
+    WHERE mentioned_at >= %(since)s
+    GROUP BY 1, 2, 3
+"""
+
+
+def to_polarity(probability: float) -> float:
+    # ABSA scores are P(positive) in [0, 1]; brand_mentions stores polarity in [-1, 1].
+    return round(2 * probability - 1, 4)
+
+
+def hourly_rollups(scored: Sequence[tuple[Mention, SentimentResult]]) -> list[tuple]:
+    buckets: dict[tuple, list[float]] = {}
+    for mention, result in scored:
+        bucket = mention.mentioned_at.replace(minute=0, second=0, microsecond=0)
+        acc = buckets.setdefault((mention.org_id, bucket, mention.source), [0] * len(ROLLUP_COLUMNS))
+        overall = to_polarity(result.overall)
+        acc[0] += 1
+        acc[1] += overall > LABEL_THRESHOLD
+        acc[2] += overall < -LABEL_THRESHOLD
+        acc[3] += 1
+        acc[4] += overall
+        for i, dim in enumerate(DIMENSION_COLUMNS, start=5):
+            acc[i] += to_polarity(result.dimensions[dim])
+    return [(*key, *acc) for key, acc in buckets.items()]
+
+
+def rebuild_sentiment_rollups(connection, since: datetime) -> None:
+    """Recompute hourly rollups from brand_mentions for every hour from `since` on."""
+    since = since.replace(minute=0, second=0, microsecond=0)
+    with connection.cursor() as cur:
+        cur.execute("DELETE FROM brand_sentiment_hourly WHERE bucket >= %(since)s", {"since": since})
+        cur.execute(_ROLLUP_REBUILD_SQL, {"since": since})
+    connection.commit()
+
+
+@dataclass(frozen=True)
+class Mention:
+    org_id: str
+    source: str
+    source_id: str
+    content: str
+    mentioned_at: datetime
+    author: Optional[str] = None
+    url: Optional[str] = None
+    is_competitor: bool = False
+
+    @property
+    def key(self) -> tuple[str, str, str]:
+        return (self.org_id, self.source, self.source_id)
+
+    @classmethod
+    def from_event(cls, event: dict) -> Optional[Mention]:
+        if not isinstance(event, dict) or event.get("event_type") != MENTION_EVENT_TYPE:
+            return None
+        data = event.get("data") or event
+        if not isinstance(data, dict):
+            return None
+        fields = {
+            "content": data.get("content") or data.get("text"),
+            "source": data.get("source") or "unknown",
+            "source_id": data.get("source_id") or data.get("id"),
+            "author": data.get("author"),
+            "url": data.get("url"),
+        }
+        # A value the model or the INSERT would choke on fails the whole batch before
+        # its offset is committed, so it is rejected here instead.
+        for name, limit in FIELD_LIMITS.items():
+            value = fields[name]
+            if value is not None and (not isinstance(value, str) or (limit is not None and len(value) > limit)):
+                return None
+        org_id = event.get("org_id") or data.get("org_id")
+        if not (fields["content"] and org_id and fields["source_id"]):
+            return None
+        try:
+            org_id = uuid.UUID(str(org_id))
+        except ValueError:
+            return None
+        mentioned_at = data.get("mentioned_at") or event.get("occurred_at")
+        try:
+            mentioned_at = datetime.fromisoformat(mentioned_at) if mentioned_at else datetime.now(timezone.utc)
+        except (TypeError, ValueError):
+            return None
+        # Naive and aware timestamps cannot be compared when a batch is flushed, and
+        # hourly buckets must match date_trunc('hour') in UTC.
+        if mentioned_at.tzinfo is None:
+            mentioned_at = mentioned_at.replace(tzinfo=timezone.utc)
+        mentioned_at = mentioned_at.astimezone(timezone.utc)
+        return cls(
+            org_id=str(org_id),
+            source=fields["source"],
+            source_id=fields["source_id"],
+            content=fields["content"],
+            mentioned_at=mentioned_at,
+            author=fields["author"],
+            url=fields["url"],
+            is_competitor=bool(data.get("is_competitor", False)),
+        )
+
+
+class MentionSource(Protocol):
+    def poll(self, max_records: int, timeout_ms: int) -> list[dict]: ...
+
+    def commit(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _decode_record(raw: Optional[bytes]) -> dict:
+    # An undecodable payload becomes an empty record that the pipeline counts as
+    # rejected, so the offset still moves past it instead of failing every restart.
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError:
+        log.warning("Rejecting undecodable mention record", size=len(raw))
+        return {}
+
+
+class KafkaMentionSource:
+    def __init__(self, topic: str, bootstrap_servers: str, group_id: str):
+        from kafka import KafkaConsumer
+
+        self.consumer = KafkaConsumer(
+            topic,
+            bootstrap_servers=bootstrap_servers.split(","),
+            group_id=group_id,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            value_deserializer=_decode_record,
+        )
+
+    def poll(self, max_records: int, timeout_ms: int) -> list[dict]:
+        batches = self.consumer.poll(timeout_ms=timeout_ms, max_records=max_records)
+        return [record.value for records in batches.values() for record in records]
+
+    def commit(self) -> None:
+        self.consumer.commit()
+
+    def close(self) -> None:
+        self.consumer.close(autocommit=False)
+
+
+class FileMentionSource:
+    """JSONL stand-in for the events topic; the committed byte offset lives next to the file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.offset_path = self.path.with_name(self.path.name + ".offset")
+        self.committed = int(self.offset_path.read_text()) if self.offset_path.exists() else 0
+        self._position = self.committed
+
+    def poll(self, max_records: int, timeout_ms: int) -> list[dict]:
+        if not self.path.exists():
+            time.sleep(timeout_ms / 1000)
+            return []
+        records = []
+        with self.path.open("rb") as f:
+            f.seek(self._position)
+            while len(records) < max_records:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break
+                self._position = f.tell()
+                if line.strip():
+                    records.append(_decode_record(line))
+        if not records:
+            time.sleep(timeout_ms / 1000)
+        return records
+
+    def commit(self) -> None:
+        tmp = self.offset_path.with_suffix(".tmp")
+        tmp.write_text(str(self._position))
+        tmp.replace(self.offset_path)
+        self.committed = self._position
+
+    def close(self) -> None:
+        pass
+
+
+def open_mention_source(
+    kind: str,
+    path: Optional[str | Path] = None,
+    topic: Optional[str] = None,
+    bootstrap_servers: Optional[str] = None,
+    group_id: Optional[str] = None,
+) -> MentionSource:
+    if kind == "file":
+        return FileMentionSource(path)
+    if kind == "kafka":
+        return KafkaMentionSource(topic, bootstrap_servers, group_id)
+    raise ValueError(f"Unknown mention source: {kind}")
+
+
+class MentionWriter(Protocol):
+    def write(self, mentions: Sequence[Mention], results: Sequence[SentimentResult]) -> int: ...
+
+
+class PostgresMentionWriter:
+    def __init__(self, connection, detector: Optional[SentimentAnomalyDetector] = None):
+        self.connection = connection
+        self.detector = detector
+        self.alerts = 0
+
+    def write(self, mentions: Sequence[Mention], results: Sequence[SentimentResult]) -> int:
+        try:
+            inserted = self._write(mentions, results)
+        except Exception:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+        return inserted
+
+    def _write(self, mentions: Sequence[Mention], results: Sequence[SentimentResult]) -> int:
+        from psycopg2.extras import execute_values
+
+        with self.connection.cursor() as cur:
+            # The key ledger is not partitioned, so it can enforce source_id uniqueness
+            # across processes and replays; only first-seen mentions are inserted.
+            claimed = execute_values(
+                cur,
+                """
+                INSERT INTO brand_mention_sources (org_id, source, source_id)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+                RETURNING org_id::text, source, source_id
+                """,
+                [m.key for m in mentions],
+                fetch=True,
+            )
+            new_keys = set(map(tuple, claimed))
+            scored = [(m, r) for m, r in zip(mentions, results) if m.key in new_keys]
+            rows = [
+                (
+                    m.org_id, m.source, m.source_id, m.author, m.content, m.url,
+                    to_polarity(r.overall),
+                    *(to_polarity(r.dimensions[dim]) for dim in DIMENSION_COLUMNS),
+                    m.is_competitor, m.mentioned_at,
+                )
+                for m, r in scored
+            ]
+            if rows:
+                execute_values(
+                    cur,
+                    f"""
+                    INSERT INTO brand_mentions (
+                        org_id, source, source_id, author, content, url,
+                        sentiment_overall, {", ".join(DIMENSION_COLUMNS.values())},
+                        is_competitor, mentioned_at
+                    ) VALUES %s
+                    """,
+                    rows,
+                    page_size=1000,
+                )
+                # Same transaction as the mention rows, so rollups never drift from them.
+                rollups = hourly_rollups(scored)
+                execute_values(cur, _ROLLUP_UPSERT_SQL, rollups)
+                if self.detector is not None:
+                    from modules.brand_monitor.anomaly import write_alerts
+
+                    alerts = self.detector.observe(rollups)
+                    if alerts:
+                        write_alerts(cur, alerts)
+                        self.alerts += len(alerts)
+        return len(rows)
+
+
+class SeenKeys:
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._keys: OrderedDict[tuple, None] = OrderedDict()
+
+    def __contains__(self, key: tuple) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def add_many(self, keys: Sequence[tuple]) -> None:
+        for key in keys:
+            self._keys[key] = None
+            self._keys.move_to_end(key)
+        while len(self._keys) > self.max_entries:
+            self._keys.popitem(last=False)
+
+
+@dataclass
+class IngestStats:
+    polled: int = 0
+    mentions: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    written: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+    max_lag_seconds: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "polled": self.polled,
+            "mentions": self.mentions,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "written": self.written,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "max_lag_seconds": round(self.max_lag_seconds, 1) if self.max_lag_seconds is not None else None,
+        }
+
+
+class MentionPipeline:
+    def __init__(
+        self,
+        source: MentionSource,
+        writer: MentionWriter,
+        model: ABSAModel,
+        batch_size: int = 256,
+        max_wait_seconds: float = 2.0,
+        poll_timeout_ms: int = 500,
+        seen: Optional[SeenKeys] = None,
+    ):
+        self.source = source
+        self.writer = writer
+        self.model = model
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.poll_timeout_ms = poll_timeout_ms
+        self.seen = seen or SeenKeys()
+        self.log = log.bind(component="MentionPipeline")
+
+    def run(
+        self,
+        max_seconds: Optional[float] = None,
+        idle_timeout_seconds: Optional[float] = None,
+    ) -> IngestStats:
+        stats = IngestStats()
+        start = time.monotonic()
+        buffer: dict[tuple, Mention] = {}
+        pending = 0
+        first_buffered = last_record = start
+
+        while True:
+            now = time.monotonic()
+            if max_seconds is not None and now - start >= max_seconds:
+                break
+            if idle_timeout_seconds is not None and now - last_record >= idle_timeout_seconds:
+                break
+
+            # Backpressure: never pull more than one batch ahead of the writer.
+            records = self.source.poll(
+                max_records=self.batch_size - len(buffer), timeout_ms=self.poll_timeout_ms
+            )
+            now = time.monotonic()
+            if records:
+                last_record = now
+                stats.polled += len(records)
+                pending += len(records)
+            for record in records:
+                mention = Mention.from_event(record)
+                if mention is None:
+                    # Other event types are expected on the topic; an empty or malformed
+                    # mention is not, and is dropped rather than blocking the offset.
+                    if not isinstance(record, dict) or not record or record.get("event_type") == MENTION_EVENT_TYPE:
+                        stats.rejected += 1
+                        self.log.warning("Rejecting malformed mention record", record=str(record)[:200])
+                    continue
+                stats.mentions += 1
+                if mention.key in buffer or mention.key in self.seen:
+                    stats.duplicates += 1
+                    continue
+                if not buffer:
+                    first_buffered = now
+                buffer[mention.key] = mention
+
+            if len(buffer) >= self.batch_size or (
+                pending and now - first_buffered >= self.max_wait_seconds
+            ):
+                self._flush(list(buffer.values()), stats)
+                buffer.clear()
+                pending = 0
+
+        if pending:
+            self._flush(list(buffer.values()), stats)
+        stats.elapsed_seconds = time.monotonic() - start
+        self.log.info("Mention ingestion finished", **stats.to_dict())
+        return stats
+
+    def _flush(self, mentions: list[Mention], stats: IngestStats) -> None:
+        if mentions:
+            results = self.model.analyze_batch(
+                [m.content for m in mentions], [m.source for m in mentions]
+            )
+            stats.written += self.writer.write(mentions, results)
+            stats.batches += 1
+            oldest = min(m.mentioned_at for m in mentions)
+            if oldest.tzinfo is not None:
+                lag = (datetime.now(timezone.utc) - oldest).total_seconds()
+                stats.max_lag_seconds = max(lag, stats.max_lag_seconds or 0.0)
+            self.seen.add_many([m.key for m in mentions])
+        # Offsets move only once everything polled so far is durably written.
+        self.source.commit()
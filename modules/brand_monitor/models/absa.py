@@ -6,11 +6,15 @@ from raw review/social media text.
 
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
-from typing import Optional
+from itertools import islice
+from typing import Iterable, Iterator, Optional
 import numpy as np
 import structlog
 
+from modules.brand_monitor.models.keywords import KEYWORD_MATCHER
+
 log = structlog.get_logger()
 
 BRAND_DIMENSIONS = [
@@ -42,9 +46,21 @@ class SentimentResult:
 
 
 class ABSAModel:
-    def __init__(self, model_path: Optional[str] = None, device: str = "cpu"):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        device: str = "cpu",
+        batch_size: int = 32,
+        max_length: int = 512,
+        num_threads: Optional[int] = None,
+        window_batches: int = 32,
+    ):
         self.model_path = model_path
         self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.num_threads = num_threads or min(os.cpu_count() or 1, 8)
+        self.window_batches = window_batches
         self._model = None
         self._tokenizer = None
         self.log = log.bind(component="ABSAModel")
@@ -53,6 +69,7 @@ class ABSAModel:
         try:
             from transformers import AutoTokenizer, AutoModelForSequenceClassification
             import torch
+            torch.set_num_threads(self.num_threads)
             model_name = self.model_path or "microsoft/deberta-v3-base"
             self._tokenizer = AutoTokenizer.from_pretrained(model_name)
             self._model = AutoModelForSequenceClassification.from_pretrained(
@@ -61,72 +78,66 @@ class ABSAModel:
             )
             self._model.to(self.device)
             self._model.eval()
-            self.log.info("ABSA model loaded", model=model_name)
+            self.log.info("ABSA model loaded", model=model_name, num_threads=self.num_threads)
         except ImportError:
             self.log.warning("transformers not installed - using keyword-based fallback")
 
     def analyze(self, text: str, source: Optional[str] = None) -> SentimentResult:
-        if self._model is not None:
-            return self._neural_analyze(text, source)
-        return self._keyword_analyze(text, source)
+        return next(self.stream_analyze([text], [source]))
 
     def analyze_batch(self, texts: list[str], sources: Optional[list[str]] = None) -> list[SentimentResult]:
-        sources = sources or [None] * len(texts)
-        return [self.analyze(t, s) for t, s in zip(texts, sources)]
-
-    def _neural_analyze(self, text: str, source: Optional[str]) -> SentimentResult:
+        return list(self.stream_analyze(texts, sources))
+
+    def stream_analyze(
+        self,
+        texts: Iterable[str],
+        sources: Optional[Iterable[Optional[str]]] = None,
+    ) -> Iterator[SentimentResult]:
+        pairs = zip(texts, sources) if sources is not None else ((t, None) for t in texts)
+        analyze = self._neural_analyze if self._model is not None else self._keyword_analyze
+
+        # Sort within a bounded window so results stream out in input order
+        # while each bucket still pads only to its own longest text.
+        window_size = self.batch_size * self.window_batches
+        while window := list(islice(pairs, window_size)):
+            yield from analyze([t for t, _ in window], [s for _, s in window])
+
+    def _neural_analyze(self, texts: list[str], sources: list[Optional[str]]) -> list[SentimentResult]:
         import torch
-        inputs = self._tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True,
-        ).to(self.device)
-        with torch.no_grad():
-            outputs = self._model(**inputs)
-            scores = torch.sigmoid(outputs.logits).squeeze(0).cpu().numpy()
-
-        dimensions = {dim: float(score) for dim, score in zip(BRAND_DIMENSIONS, scores)}
-        overall = float(np.mean(scores))
-        return SentimentResult(text=text, overall=overall, dimensions=dimensions, source=source)
-
-    def _keyword_analyze(self, text: str, source: Optional[str]) -> SentimentResult:
-        text_lower = text.lower()
-
-        positive_keywords = {
-            "product_quality": ["amazing", "excellent", "great product", "love", "perfect", "high quality", "well made"],
-            "customer_service": ["helpful", "responsive", "quick reply", "great support", "resolved", "fantastic team"],
-            "pricing_value": ["worth it", "good value", "fair price", "affordable", "great deal", "reasonable"],
-            "brand_trust": ["reliable", "trustworthy", "always delivers", "consistent", "dependable"],
-            "innovation": ["innovative", "cutting edge", "new features", "ahead", "modern", "pioneering"],
-            "sustainability_ethics": ["eco-friendly", "sustainable", "ethical", "green", "responsible"],
-            "user_experience": ["easy to use", "intuitive", "smooth", "seamless", "clean design"],
-            "delivery_logistics": ["fast delivery", "quick shipping", "arrived early", "well packaged"],
-            "brand_personality": ["love the brand", "authentic", "relatable", "genuine", "fun"],
-            "competitive_position": ["best in class", "better than", "leading", "top choice"],
-        }
-        negative_keywords = {
-            "product_quality": ["poor quality", "broke", "defective", "cheap", "disappointing", "terrible"],
-            "customer_service": ["rude", "unhelpful", "slow response", "ignored", "no support", "useless"],
-            "pricing_value": ["expensive", "overpriced", "not worth", "too costly", "rip off"],
-            "brand_trust": ["untrustworthy", "scam", "misleading", "false", "dishonest"],
-            "innovation": ["outdated", "old fashioned", "behind", "no updates"],
-            "sustainability_ethics": ["wasteful", "unethical", "harmful", "pollution"],
-            "user_experience": ["confusing", "complicated", "hard to use", "buggy", "crashes"],
-            "delivery_logistics": ["late", "delayed", "damaged", "wrong item", "lost"],
-            "brand_personality": ["boring", "corporate", "fake", "impersonal"],
-            "competitive_position": ["worse than", "inferior", "losing ground"],
-        }
-
-        dimensions = {}
-        for dim in BRAND_DIMENSIONS:
-            pos = sum(1 for kw in positive_keywords.get(dim, []) if kw in text_lower)
-            neg = sum(1 for kw in negative_keywords.get(dim, []) if kw in text_lower)
-            if pos + neg == 0:
-                dimensions[dim] = 0.5
-            else:
-                dimensions[dim] = round(pos / (pos + neg), 4)
-
-        overall = round(float(np.mean(list(dimensions.values()))), 4)
-        return SentimentResult(text=text, overall=overall, dimensions=dimensions, source=source)
+        encodings = self._tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+        order = np.argsort([len(ids) for ids in encodings], kind="stable")
+        scores = np.zeros((len(texts), len(BRAND_DIMENSIONS)), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                idx = order[start : start + self.batch_size]
+                inputs = self._tokenizer.pad(
+                    {"input_ids": [encodings[i] for i in idx]},
+                    padding="longest",
+                    return_tensors="pt",
+                ).to(self.device)
+                logits = self._model(**inputs).logits
+                scores[idx] = torch.sigmoid(logits).cpu().numpy()
+
+        return [
+            SentimentResult(
+                text=text,
+                overall=float(np.mean(row)),
+                dimensions={dim: float(score) for dim, score in zip(BRAND_DIMENSIONS, row)},
+                source=source,
+            )
+            for text, source, row in zip(texts, sources, scores)
+        ]
+
+    def _keyword_analyze(self, texts: list[str], sources: list[Optional[str]]) -> list[SentimentResult]:
+        scores = KEYWORD_MATCHER.score_batch(texts).round(4)
+        columns = [KEYWORD_MATCHER.dimensions.index(dim) for dim in BRAND_DIMENSIONS]
+        return [
+            SentimentResult(
+                text=text,
+                overall=round(float(np.mean(row)), 4),
+                dimensions={dim: float(row[col]) for dim, col in zip(BRAND_DIMENSIONS, columns)},
+                source=source,
+            )
+            for text, source, row in zip(texts, sources, scores)
+        ]
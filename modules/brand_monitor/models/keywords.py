@@ -0,0 +1,175 @@
+"""
+Brand keyword matcher - Module 4.
+Aho-Corasick automaton over the positive/negative brand-dimension keyword lists.
+Built once at import and shared by the ABSA keyword fallback and /brand/analyze;
+one pass over a text finds every keyword for all 10 dimensions. Uses the C automaton
+from pyahocorasick when installed, otherwise an equivalent pure-Python one.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Hashable, Iterator, NamedTuple, Sequence
+import numpy as np
+import structlog
+
+log = structlog.get_logger()
+
+POSITIVE_KEYWORDS = {
+    "product_quality": ["amazing", "excellent", "great product", "love", "perfect", "high quality", "well made"],
+    "customer_service": ["helpful", "responsive", "quick reply", "great support", "resolved", "fantastic team"],
+    "pricing_value": ["worth it", "good value", "fair price", "affordable", "great deal", "reasonable"],
+    "brand_trust": ["reliable", "trustworthy", "always delivers", "consistent", "dependable"],
+    "innovation": ["innovative", "cutting edge", "new features", "ahead", "modern", "pioneering"],
+    "sustainability_ethics": ["eco-friendly", "sustainable", "ethical", "green", "responsible"],
+    "user_experience": ["easy to use", "intuitive", "smooth", "seamless", "clean design"],
+    "delivery_logistics": ["fast delivery", "quick shipping", "arrived early", "well packaged"],
+    "brand_personality": ["love the brand", "authentic", "relatable", "genuine", "fun"],
+    "competitive_position": ["best in class", "better than", "leading", "top choice"],
+}
+
+NEGATIVE_KEYWORDS = {
+    "product_quality": ["poor quality", "broke", "defective", "cheap", "disappointing", "terrible"],
+    "customer_service": ["rude", "unhelpful", "slow response", "ignored", "no support", "useless"],
+    "pricing_value": ["expensive", "overpriced", "not worth", "too costly", "rip off"],
+    "brand_trust": ["untrustworthy", "scam", "misleading", "false", "dishonest"],
+    "innovation": ["outdated", "old fashioned", "behind", "no updates"],
+    "sustainability_ethics": ["wasteful", "unethical", "harmful", "pollution"],
+    "user_experience": ["confusing", "complicated", "hard to use", "buggy", "crashes"],
+    "delivery_logistics": ["late", "delayed", "damaged", "wrong item", "lost"],
+    "brand_personality": ["boring", "corporate", "fake", "impersonal"],
+    "competitive_position": ["worse than", "inferior", "losing ground"],
+}
+
+NEUTRAL_SCORE = 0.5
+
+# Alphanumeric runs and single punctuation marks; matching whole tokens gives word
+# boundaries for free and steps the automaton once per word instead of per character.
+_TOKEN_RE = re.compile(r"[^\W_]+|[^\s]")
+
+
+class KeywordMatch(NamedTuple):
+    keyword: str
+    dimension: str
+    polarity: str
+
+
+class KeywordMatcher:
+    def __init__(
+        self,
+        positive: dict[str, list[str]],
+        negative: dict[str, list[str]],
+        word_boundaries: bool = True,
+    ):
+        self.dimensions = list(dict.fromkeys([*positive, *negative]))
+        self.word_boundaries = word_boundaries
+        self.keywords: list[str] = []
+        self._labels: list[tuple[str, str]] = []
+        columns = []
+        for polarity, table in (("positive", positive), ("negative", negative)):
+            offset = 0 if polarity == "positive" else len(self.dimensions)
+            for dim, words in table.items():
+                for word in words:
+                    self.keywords.append(word.lower())
+                    self._labels.append((dim, polarity))
+                    columns.append(offset + self.dimensions.index(dim))
+
+        # keyword -> [positive counts | negative counts] per dimension
+        self._weights = np.zeros((len(self.keywords), 2 * len(self.dimensions)), dtype=np.float32)
+        self._weights[np.arange(len(self.keywords)), columns] = 1.0
+        self._delta, self._outputs = self._build([self._symbols(k) for k in self.keywords])
+        self._native = self._build_native(self.keywords)
+
+    @staticmethod
+    def _build_native(keywords: list[str]):
+        try:
+            import ahocorasick
+        except ImportError:
+            log.debug("pyahocorasick not installed - using pure-Python keyword automaton")
+            return None
+        automaton = ahocorasick.Automaton()
+        for pid, keyword in enumerate(keywords):
+            automaton.add_word(keyword, (pid, len(keyword)))
+        automaton.make_automaton()
+        return automaton
+
+    def _symbols(self, text: str) -> Sequence[Hashable]:
+        text = text.lower()
+        return _TOKEN_RE.findall(text) if self.word_boundaries else text
+
+    @staticmethod
+    def _build(patterns: list[Sequence[Hashable]]) -> tuple[list[dict], list[tuple[int, ...]]]:
+        goto: list[dict] = [{}]
+        outputs: list[list[int]] = [[]]
+        for pid, pattern in enumerate(patterns):
+            node = 0
+            for symbol in pattern:
+                if symbol not in goto[node]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[node][symbol] = len(goto) - 1
+                node = goto[node][symbol]
+            outputs[node].append(pid)
+
+        # Breadth-first failure links, folded into a full transition table so the
+        # scan is a single dict lookup per symbol.
+        fail = [0] * len(goto)
+        delta: list[dict] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            outputs[node].extend(outputs[fail[node]])
+            delta[node] = {**delta[fail[node]], **goto[node]}
+            for symbol, child in goto[node].items():
+                fail[child] = delta[fail[node]].get(symbol, 0)
+                queue.append(child)
+        return delta, [tuple(o) for o in outputs]
+
+    def _hits(self, text: str) -> Iterator[int]:
+        if self._native is not None:
+            text = text.lower()
+            for end, (pid, length) in self._native.iter(text):
+                start = end - length + 1
+                if self.word_boundaries and (
+                    (start > 0 and text[start - 1].isalnum())
+                    or (end + 1 < len(text) and text[end + 1].isalnum())
+                ):
+                    continue
+                yield pid
+            return
+
+        delta, outputs = self._delta, self._outputs
+        node = 0
+        for symbol in self._symbols(text):
+            node = delta[node].get(symbol, 0)
+            yield from outputs[node]
+
+    def find(self, text: str) -> list[KeywordMatch]:
+        return [KeywordMatch(self.keywords[pid], *self._labels[pid]) for pid in self._hits(text)]
+
+    def hit_matrix(self, texts: list[str]) -> np.ndarray:
+        rows: list[int] = []
+        cols: list[int] = []
+        for row, text in enumerate(texts):
+            for pid in self._hits(text):
+                rows.append(row)
+                cols.append(pid)
+        hits = np.zeros((len(texts), len(self.keywords)), dtype=np.float32)
+        hits[rows, cols] = 1.0
+        return hits
+
+    def score_batch(self, texts: list[str]) -> np.ndarray:
+        # Each distinct keyword counts once per text, as the substring scan did.
+        counts = self.hit_matrix(texts) @ self._weights
+        n = len(self.dimensions)
+        pos, neg = counts[:, :n], counts[:, n:]
+        total = pos + neg
+        return np.where(total > 0, pos / np.maximum(total, 1.0), NEUTRAL_SCORE)
+
+    def score(self, text: str) -> dict[str, float]:
+        return dict(zip(self.dimensions, self.score_batch([text])[0].tolist()))
+
+
+KEYWORD_MATCHER = KeywordMatcher(POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS)
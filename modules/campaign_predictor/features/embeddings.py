@@ -0,0 +1,212 @@
+"""
+Text embeddings for the Campaign DNA encoder.
+
+Subject lines, preview text and bodies are embedded by a local sentence encoder in
+length-sorted micro-batches. Vectors are cached under a hash of (encoder, text) in an
+LRU store that persists to disk, so the same copy is only ever encoded once across
+variants, requests and restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import structlog
+
+log = structlog.get_logger()
+
+TEXT_EMBEDDING_DIM = 768
+DEFAULT_ENCODER = "sentence-transformers/all-mpnet-base-v2"
+HASHING_ENCODER = "hashing-bow"
+
+
+def content_hash(text: str, encoder: str) -> str:
+    return hashlib.sha256(f"{encoder}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        max_entries: int = 50_000,
+        path: Optional[str | Path] = None,
+        persist_interval_seconds: float = 60.0,
+    ):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.persist_interval_seconds = persist_interval_seconds
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_saved = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def load(self) -> None:
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys, vectors = data["keys"], data["vectors"]
+        except (OSError, KeyError, ValueError) as exc:
+            log.warning("Embedding cache unreadable, starting empty", path=str(self.path), error=str(exc))
+            return
+        with self._lock:
+            for key, vector in zip(keys[-self.max_entries :], vectors[-self.max_entries :]):
+                self._entries[str(key)] = vector
+        log.info("Embedding cache loaded", path=str(self.path), entries=len(self._entries))
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            keys = np.array(list(self._entries.keys()))
+            vectors = (
+                np.stack(list(self._entries.values()))
+                if self._entries
+                else np.empty((0, TEXT_EMBEDDING_DIM), dtype=np.float32)
+            )
+            self._dirty = False
+            self._last_saved = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=keys, vectors=vectors)
+        os.replace(tmp_path, self.path)
+
+    def maybe_save(self) -> None:
+        if self._dirty and time.monotonic() - self._last_saved >= self.persist_interval_seconds:
+            self.save()
+
+
+class TextEmbedder:
+    def __init__(
+        self,
+        model_name: str = DEFAULT_ENCODER,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 32,
+        max_length: int = 256,
+        device: str = "cpu",
+    ):
+        self.model_name = model_name
+        self.cache = cache or EmbeddingCache()
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.device = device
+        self._model = None
+        self._tokenizer = None
+        self.encoder_id = HASHING_ENCODER
+        self.log = log.bind(component="TextEmbedder")
+
+    def load(self) -> None:
+        if self.model_name == HASHING_ENCODER:
+            return
+        try:
+            from transformers import AutoModel, AutoTokenizer
+        except ImportError:
+            self.log.warning("transformers not installed - using hashed bag-of-words embeddings")
+            return
+
+        try:
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModel.from_pretrained(self.model_name)
+        except OSError as exc:
+            self.log.warning("Sentence encoder unavailable - using hashed bag-of-words embeddings", error=str(exc))
+            return
+        if model.config.hidden_size != TEXT_EMBEDDING_DIM:
+            raise ValueError(
+                f"{self.model_name} produces {model.config.hidden_size}-d embeddings, "
+                f"expected {TEXT_EMBEDDING_DIM}"
+            )
+        model.to(self.device)
+        model.eval()
+        self._tokenizer, self._model = tokenizer, model
+        self.encoder_id = self.model_name
+        self.log.info("Sentence encoder loaded", model=self.model_name)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, TEXT_EMBEDDING_DIM), dtype=np.float32)
+
+        keys = [content_hash(t, self.encoder_id) for t in texts]
+        found = self.cache.get_many(list(dict.fromkeys(keys)))
+
+        missing = {k: t for k, t in zip(keys, texts) if k not in found}
+        if missing:
+            vectors = self._encode(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(computed)
+            found.update(computed)
+            self.cache.maybe_save()
+
+        return np.stack([found[k] for k in keys])
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        if self._model is None:
+            return np.stack([self._hash_encode(t) for t in texts])
+
+        import torch
+
+        # Length-sorted micro-batches keep padding (and wasted attention) to a minimum.
+        order = np.argsort([len(t) for t in texts])
+        out = np.empty((len(texts), TEXT_EMBEDDING_DIM), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                idx = order[start : start + self.batch_size]
+                inputs = self._tokenizer(
+                    [texts[i] for i in idx],
+                    return_tensors="pt",
+                    truncation=True,
+                    max_length=self.max_length,
+                    padding=True,
+                ).to(self.device)
+                hidden = self._model(**inputs).last_hidden_state
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, dim=-1)
+                out[idx] = pooled.cpu().numpy()
+        return out
+
+    @staticmethod
+    def _hash_encode(text: str) -> np.ndarray:
+        vector = np.zeros(TEXT_EMBEDDING_DIM, dtype=np.float32)
+        for token in text.lower().split():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % TEXT_EMBEDDING_DIM
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
@@ -0,0 +1,149 @@
+"""
+Campaign variant features for Module 2.
+Encodes the structured half of the Campaign DNA: channel, offer, send timing,
+audience size and surface statistics of the subject line, preview text and body.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import asdict, dataclass
+from typing import Optional
+import numpy as np
+
+CHANNELS = ["email", "sms", "push", "meta_ads", "google_ads", "tiktok_ads", "linkedin_ads", "display"]
+OFFER_TYPES = [
+    "none", "percentage_discount", "fixed_discount", "free_shipping", "free_gift", "bogo", "early_access",
+]
+URGENCY_TERMS = ["now", "today", "limited", "last chance", "hurry", "expires", "ends", "only", "final"]
+CTA_TERMS = ["shop", "buy", "get", "claim", "start", "discover", "learn more", "book", "order"]
+
+N_STRUCTURED_FEATURES = 50
+
+_TEXT_FIELDS = ("subject_line", "body", "preview_text", "channel", "offer_type")
+_NUMERIC_FIELDS = {"offer_value": float, "send_hour": int, "send_day_of_week": int, "segment_size": int, "budget": float}
+
+_PERSONALIZATION = re.compile(r"\{\{?\s*\w*name\w*\s*\}?\}", re.IGNORECASE)
+_LINK = re.compile(r"https?://|www\.", re.IGNORECASE)
+_SENTENCE_SPLIT = re.compile(r"[.!?]+")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _has_emoji(text: str) -> bool:
+    return any(ord(ch) >= 0x1F300 or 0x2600 <= ord(ch) <= 0x27BF for ch in text)
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def _jaccard(a: str, b: str) -> float:
+    wa, wb = _words(a), _words(b)
+    if not wa or not wb:
+        return 0.0
+    return len(wa & wb) / len(wa | wb)
+
+
+def _count_terms(text: str, terms: list[str]) -> int:
+    lower = text.lower()
+    return sum(1 for term in terms if term in lower)
+
+
+@dataclass(frozen=True)
+class CampaignVariant:
+    subject_line: str
+    body: str = ""
+    preview_text: str = ""
+    channel: str = "email"
+    offer_type: Optional[str] = None
+    offer_value: float = 0.0
+    send_hour: int = 10
+    send_day_of_week: int = 2
+    segment_size: int = 1000
+    budget: float = 0.0
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> CampaignVariant:
+        # Validated here so a bad variant is rejected up front instead of failing
+        # to_structured inside a shared scoring batch.
+        if not isinstance(payload, dict):
+            raise ValueError("variant must be an object")
+        fields = cls.__dataclass_fields__
+        values = {k: v for k, v in payload.items() if k in fields and v is not None}
+        if not values.get("subject_line"):
+            raise ValueError("subject_line is required")
+        for name in _TEXT_FIELDS:
+            if name in values and not isinstance(values[name], str):
+                raise ValueError(f"{name} must be a string")
+        for name, cast in _NUMERIC_FIELDS.items():
+            if name not in values:
+                continue
+            try:
+                value = cast(values[name])
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number") from None
+            if isinstance(values[name], bool) or not math.isfinite(value):
+                raise ValueError(f"{name} must be a number")
+            values[name] = value
+        return cls(**values)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_structured(self) -> np.ndarray:
+        subject, preview, body = self.subject_line or "", self.preview_text or "", self.body or ""
+        hour = self.send_hour % 24
+        day = self.send_day_of_week % 7
+        offer_type = self.offer_type or "none"
+
+        subject_letters = [ch for ch in subject if ch.isalpha()]
+        sentences = [s for s in _SENTENCE_SPLIT.split(body) if s.strip()]
+        body_words = len(body.split())
+
+        features = [
+            *(float(self.channel == c) for c in CHANNELS),
+            *(float(offer_type == o) for o in OFFER_TYPES),
+            math.sin(2 * math.pi * hour / 24),
+            math.cos(2 * math.pi * hour / 24),
+            math.sin(2 * math.pi * day / 7),
+            math.cos(2 * math.pi * day / 7),
+            float(day >= 5),
+            float(9 <= hour < 17),
+            float(17 <= hour < 23),
+            min(float(self.offer_value) / 100.0, 1.0),
+            float(offer_type != "none"),
+            math.log1p(max(self.segment_size, 0)) / math.log1p(1e6),
+            math.log1p(max(self.budget, 0)) / math.log1p(1e6),
+            min(len(subject) / 100.0, 1.0),
+            min(len(subject.split()) / 20.0, 1.0),
+            float("?" in subject),
+            float("!" in subject),
+            float(any(ch.isdigit() for ch in subject)),
+            float(_has_emoji(subject)),
+            sum(ch.isupper() for ch in subject_letters) / max(len(subject_letters), 1),
+            float(bool(_PERSONALIZATION.search(subject))),
+            min(_count_terms(subject, URGENCY_TERMS) / 3.0, 1.0),
+            float("[" in subject or "(" in subject),
+            min(len(preview) / 150.0, 1.0),
+            min(len(preview.split()) / 30.0, 1.0),
+            float(any(ch.isdigit() for ch in preview)),
+            float(bool(preview)),
+            min(len(body) / 2000.0, 1.0),
+            min(body_words / 300.0, 1.0),
+            min(len(sentences) / 20.0, 1.0),
+            min(body_words / max(len(sentences), 1) / 30.0, 1.0),
+            min(len(_LINK.findall(body)) / 5.0, 1.0),
+            min(_count_terms(body, CTA_TERMS) / 3.0, 1.0),
+            _jaccard(subject, preview),
+            _jaccard(subject, body),
+            float(bool(_PERSONALIZATION.search(body))),
+            float(_has_emoji(body)),
+        ]
+        return np.asarray(features, dtype=np.float32)
+
+
+def structured_matrix(variants: list[CampaignVariant]) -> np.ndarray:
+    if not variants:
+        return np.empty((0, N_STRUCTURED_FEATURES), dtype=np.float32)
+    return np.stack([v.to_structured() for v in variants])
@@ -0,0 +1,66 @@
+"""
+Campaign prediction outputs shared by the torch model and the ONNX runtime path.
+Kept free of torch so batched scoring can run on onnxruntime alone.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+
+PREDICTION_TARGETS = ["open_rate", "click_rate", "conversion_rate", "revenue", "roi"]
+CONFIDENCE_MARGIN = 0.05
+
+
+@dataclass
+class CampaignPrediction:
+    open_rate: float
+    click_rate: float
+    conversion_rate: float
+    predicted_revenue: float
+    predicted_roi: float
+    confidence_lower: dict
+    confidence_upper: dict
+    top_suggestions: list[dict] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "open_rate": round(self.open_rate, 4),
+            "click_rate": round(self.click_rate, 4),
+            "conversion_rate": round(self.conversion_rate, 4),
+            "predicted_revenue": round(self.predicted_revenue, 2),
+            "predicted_roi": round(self.predicted_roi, 4),
+            "confidence_lower": {k: round(v, 4) for k, v in self.confidence_lower.items()},
+            "confidence_upper": {k: round(v, 4) for k, v in self.confidence_upper.items()},
+            "top_suggestions": self.top_suggestions,
+        }
+
+
+def prediction_from_outputs(
+    outputs: dict[str, np.ndarray],
+    idx: int,
+    top_suggestions: Optional[list[dict]] = None,
+    margin: float = CONFIDENCE_MARGIN,
+) -> CampaignPrediction:
+    open_rate = float(outputs["open_rate"][idx])
+    click_rate = float(outputs["click_rate"][idx])
+    conv_rate = float(outputs["conversion_rate"][idx])
+    return CampaignPrediction(
+        open_rate=open_rate,
+        click_rate=click_rate,
+        conversion_rate=conv_rate,
+        predicted_revenue=float(outputs["revenue"][idx]),
+        predicted_roi=float(outputs["roi"][idx]),
+        confidence_lower={
+            "open_rate": max(0, open_rate - margin),
+            "click_rate": max(0, click_rate - margin / 2),
+            "conversion_rate": max(0, conv_rate - margin / 4),
+        },
+        confidence_upper={
+            "open_rate": min(1, open_rate + margin),
+            "click_rate": min(1, click_rate + margin / 2),
+            "conversion_rate": min(1, conv_rate + margin / 4),
+        },
+        top_suggestions=top_suggestions or [],
+    )
@@ -7,26 +7,18 @@ simultaneously from the Campaign DNA (multi-modal encoded campaign representatio
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
 import torch
 import torch.nn as nn
 import numpy as np
 import structlog
 
-log = structlog.get_logger()
-
+from modules.campaign_predictor.models.prediction import (
+    PREDICTION_TARGETS,
+    CampaignPrediction,
+    prediction_from_outputs,
+)
 
-@dataclass
-class CampaignPrediction:
-    open_rate: float
-    click_rate: float
-    conversion_rate: float
-    predicted_revenue: float
-    predicted_roi: float
-    confidence_lower: dict
-    confidence_upper: dict
-    top_suggestions: list[dict]
+log = structlog.get_logger()
 
 
 class TextEncoder(nn.Module):
@@ -112,38 +104,25 @@ class MultiTaskPerformancePredictor(nn.Module):
         text_embedding: np.ndarray,
         structured_features: np.ndarray,
     ) -> CampaignPrediction:
+        outputs = self.predict_batch(text_embedding.reshape(1, -1), structured_features.reshape(1, -1))
+        return prediction_from_outputs(outputs, 0)
+
+    def predict_batch(
+        self,
+        text_embeddings: np.ndarray,
+        structured_features: np.ndarray,
+        batch_size: int = 1024,
+    ) -> dict[str, np.ndarray]:
         self.eval()
-        with torch.no_grad():
-            te = torch.from_numpy(text_embedding).float().unsqueeze(0)
-            sf = torch.from_numpy(structured_features).float().unsqueeze(0)
-            outputs = self.forward(te, sf)
-
-        open_rate = float(outputs["open_rate"].item())
-        click_rate = float(outputs["click_rate"].item())
-        conv_rate = float(outputs["conversion_rate"].item())
-        revenue = float(outputs["revenue"].item())
-        roi = float(outputs["roi"].item())
-
-        margin = 0.05
-        return CampaignPrediction(
-            open_rate=open_rate,
-            click_rate=click_rate,
-            conversion_rate=conv_rate,
-            predicted_revenue=revenue,
-            predicted_roi=roi,
-            confidence_lower={
-                "open_rate": max(0, open_rate - margin),
-                "click_rate": max(0, click_rate - margin / 2),
-                "conversion_rate": max(0, conv_rate - margin / 4),
-            },
-            confidence_upper={
-                "open_rate": min(1, open_rate + margin),
-                "click_rate": min(1, click_rate + margin / 2),
-                "conversion_rate": min(1, conv_rate + margin / 4),
-            },
-            top_suggestions=[
-                {"change": "Add urgency to subject line", "expected_open_rate_lift": 0.052},
-                {"change": "Send on Wednesday 9am instead", "expected_conversion_lift": 0.004},
-                {"change": "Reduce discount depth, add free shipping", "expected_revenue_lift": 120},
-            ],
-        )
+        text_embeddings = np.ascontiguousarray(text_embeddings, dtype=np.float32)
+        structured_features = np.ascontiguousarray(structured_features, dtype=np.float32)
+        chunks: dict[str, list[np.ndarray]] = {name: [] for name in PREDICTION_TARGETS}
+        with torch.inference_mode():
+            for start in range(0, len(text_embeddings), batch_size):
+                outputs = self.forward(
+                    torch.from_numpy(text_embeddings[start : start + batch_size]),
+                    torch.from_numpy(structured_features[start : start + batch_size]),
+                )
+                for name in PREDICTION_TARGETS:
+                    chunks[name].append(outputs[name].numpy())
+        return {name: np.concatenate(parts) for name, parts in chunks.items()}
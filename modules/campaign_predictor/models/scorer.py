@@ -0,0 +1,100 @@
+"""
+Campaign Variant Scorer - Module 2.
+
+Scores many candidate variants (subject lines, preview text, offers, send times) in a
+single batched forward pass of the MultiTaskPerformancePredictor. Text is embedded once
+per unique string through the shared embedding cache, so a variant set that differs
+only in subject line re-encodes nothing but the subject lines.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Optional, Protocol
+import numpy as np
+import structlog
+
+from modules.campaign_predictor.features.embeddings import TEXT_EMBEDDING_DIM, TextEmbedder
+from modules.campaign_predictor.features.variant import CampaignVariant, structured_matrix
+from modules.campaign_predictor.models.prediction import CampaignPrediction, prediction_from_outputs
+
+log = structlog.get_logger()
+
+CAMPAIGN_MODEL_FILE = "campaign_predictor_best.pt"
+CAMPAIGN_ONNX_FILE = "campaign_predictor.onnx"
+
+TEXT_WEIGHTS = {"subject_line": 0.5, "preview_text": 0.2, "body": 0.3}
+
+
+class BatchPredictor(Protocol):
+    def predict_batch(
+        self, text_embeddings: np.ndarray, structured_features: np.ndarray, batch_size: int = ...
+    ) -> dict[str, np.ndarray]: ...
+
+
+def load_campaign_model(model_dir: str | Path, backend: str = "onnx") -> Optional[BatchPredictor]:
+    model_dir = Path(model_dir)
+    if backend == "onnx":
+        from modules.serving.runtime import OnnxCampaignPredictor, load_onnx_model
+
+        onnx_model = load_onnx_model(model_dir / CAMPAIGN_ONNX_FILE)
+        if onnx_model is not None:
+            log.info("Campaign model loaded", backend="onnx", path=str(onnx_model.path))
+            return OnnxCampaignPredictor(onnx_model)
+
+    path = model_dir / CAMPAIGN_MODEL_FILE
+    if not path.exists():
+        return None
+
+    import torch
+    from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+
+    model = MultiTaskPerformancePredictor()
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    model.eval()
+    log.info("Campaign model loaded", backend="torch", path=str(path))
+    return model
+
+
+class CampaignScorer:
+    def __init__(self, model: BatchPredictor, embedder: TextEmbedder, batch_size: int = 1024):
+        self.model = model
+        self.embedder = embedder
+        self.batch_size = batch_size
+        self.log = log.bind(component="CampaignScorer")
+
+    def text_embeddings(self, variants: list[CampaignVariant]) -> np.ndarray:
+        texts = {
+            text
+            for v in variants
+            for text in (getattr(v, field) for field in TEXT_WEIGHTS)
+            if text
+        }
+        unique = list(texts)
+        vectors = dict(zip(unique, self.embedder.embed(unique)))
+
+        combined = np.zeros((len(variants), TEXT_EMBEDDING_DIM), dtype=np.float32)
+        for i, variant in enumerate(variants):
+            total = 0.0
+            for field, weight in TEXT_WEIGHTS.items():
+                text = getattr(variant, field)
+                if text:
+                    combined[i] += weight * vectors[text]
+                    total += weight
+            if total:
+                combined[i] /= total
+        return combined
+
+    def predict_outputs(self, variants: list[CampaignVariant]) -> dict[str, np.ndarray]:
+        return self.model.predict_batch(
+            self.text_embeddings(variants),
+            structured_matrix(variants),
+            batch_size=self.batch_size,
+        )
+
+    def score(self, variants: list[CampaignVariant]) -> list[CampaignPrediction]:
+        if not variants:
+            return []
+        outputs = self.predict_outputs(variants)
+        self.log.info("Variants scored", n_variants=len(variants), cache_entries=len(self.embedder.cache))
+        return [prediction_from_outputs(outputs, i) for i in range(len(variants))]
@@ -6,34 +6,14 @@ WHETHER a customer will churn, but WHEN - the full probability distribution over
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
 import torch
 import torch.nn as nn
 import numpy as np
 import structlog
 
-log = structlog.get_logger()
-
-
-@dataclass
-class ChurnPrediction:
-    customer_id: str
-    churn_probability_30d: float
-    churn_probability_60d: float
-    churn_probability_90d: float
-    survival_curve: list[float]
-    predicted_days_to_churn: Optional[float]
-    risk_level: str
-    recommended_intervention: str
-
-    @property
-    def is_high_risk(self) -> bool:
-        return self.churn_probability_30d >= 0.6
+from modules.clv_churn.models.survival import ChurnPrediction, ChurnScores, summarize_hazard
 
-    @property
-    def is_medium_risk(self) -> bool:
-        return 0.3 <= self.churn_probability_30d < 0.6
+log = structlog.get_logger()
 
 
 class DeepChurnModel(nn.Module):
@@ -69,38 +49,20 @@ class DeepChurnModel(nn.Module):
         customer_id: str,
         days_per_bin: int = 30,
     ) -> ChurnPrediction:
-        self.eval()
-        with torch.no_grad():
-            x = torch.from_numpy(feature_vector).float().unsqueeze(0)
-            hazard = self.forward(x).squeeze(0).numpy()
-
-        survival = np.cumprod(1 - hazard)
-        survival_list = survival.tolist()
+        scores = self.score_batch(feature_vector.reshape(1, -1), days_per_bin=days_per_bin)
+        return scores.prediction(0, customer_id)
 
-        churn_30d = 1 - survival[0]
-        churn_60d = 1 - survival[min(1, len(survival) - 1)]
-        churn_90d = 1 - survival[min(2, len(survival) - 1)]
-
-        median_bin = np.searchsorted(1 - survival, 0.5)
-        predicted_days = float(median_bin * days_per_bin) if median_bin < len(survival) else None
-
-        if churn_30d >= 0.6:
-            risk = "high"
-            intervention = "immediate_personal_outreach"
-        elif churn_30d >= 0.3:
-            risk = "medium"
-            intervention = "personalized_win_back_offer"
-        else:
-            risk = "low"
-            intervention = "standard_nurture_sequence"
-
-        return ChurnPrediction(
-            customer_id=customer_id,
-            churn_probability_30d=round(float(churn_30d), 4),
-            churn_probability_60d=round(float(churn_60d), 4),
-            churn_probability_90d=round(float(churn_90d), 4),
-            survival_curve=survival_list,
-            predicted_days_to_churn=predicted_days,
-            risk_level=risk,
-            recommended_intervention=intervention,
-        )
+    def score_batch(
+        self,
+        features: np.ndarray,
+        days_per_bin: int = 30,
+        batch_size: int = 8192,
+    ) -> ChurnScores:
+        self.eval()
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        hazard = np.empty((len(features), self.n_time_bins), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(features), batch_size):
+                chunk = torch.from_numpy(features[start : start + batch_size])
+                hazard[start : start + batch_size] = self.forward(chunk).numpy()
+        return summarize_hazard(hazard, days_per_bin=days_per_bin)
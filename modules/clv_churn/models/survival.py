@@ -0,0 +1,93 @@
+"""
+Survival post-processing for the churn model.
+
+Turns per-bin hazard outputs into churn probabilities, risk levels and interventions.
+Kept free of torch so the ONNX runtime path can score without importing it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+
+@dataclass
+class ChurnPrediction:
+    customer_id: str
+    churn_probability_30d: float
+    churn_probability_60d: float
+    churn_probability_90d: float
+    survival_curve: list[float]
+    predicted_days_to_churn: Optional[float]
+    risk_level: str
+    recommended_intervention: str
+
+    @property
+    def is_high_risk(self) -> bool:
+        return self.churn_probability_30d >= 0.6
+
+    @property
+    def is_medium_risk(self) -> bool:
+        return 0.3 <= self.churn_probability_30d < 0.6
+
+
+@dataclass
+class ChurnScores:
+    survival: np.ndarray
+    churn_probability_30d: np.ndarray
+    churn_probability_60d: np.ndarray
+    churn_probability_90d: np.ndarray
+    predicted_days_to_churn: np.ndarray
+    expected_lifetime_days: np.ndarray
+    risk_level: np.ndarray
+    recommended_intervention: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.survival)
+
+    def prediction(self, idx: int, customer_id: str) -> ChurnPrediction:
+        days = self.predicted_days_to_churn[idx]
+        return ChurnPrediction(
+            customer_id=customer_id,
+            churn_probability_30d=round(float(self.churn_probability_30d[idx]), 4),
+            churn_probability_60d=round(float(self.churn_probability_60d[idx]), 4),
+            churn_probability_90d=round(float(self.churn_probability_90d[idx]), 4),
+            survival_curve=self.survival[idx].tolist(),
+            predicted_days_to_churn=None if np.isnan(days) else float(days),
+            risk_level=str(self.risk_level[idx]),
+            recommended_intervention=str(self.recommended_intervention[idx]),
+        )
+
+
+def summarize_hazard(hazard: np.ndarray, days_per_bin: int = 30) -> ChurnScores:
+    survival = np.cumprod(1 - hazard, axis=1)
+    cdf = 1 - survival
+    last = survival.shape[1] - 1
+
+    churn_30d = cdf[:, 0]
+    churn_60d = cdf[:, min(1, last)]
+    churn_90d = cdf[:, min(2, last)]
+
+    median_bin = (cdf < 0.5).sum(axis=1)
+    predicted_days = np.where(median_bin <= last, median_bin * float(days_per_bin), np.nan)
+
+    high = churn_30d >= 0.6
+    medium = churn_30d >= 0.3
+    risk = np.select([high, medium], ["high", "medium"], default="low")
+    intervention = np.select(
+        [high, medium],
+        ["immediate_personal_outreach", "personalized_win_back_offer"],
+        default="standard_nurture_sequence",
+    )
+
+    return ChurnScores(
+        survival=survival,
+        churn_probability_30d=churn_30d,
+        churn_probability_60d=churn_60d,
+        churn_probability_90d=churn_90d,
+        predicted_days_to_churn=predicted_days,
+        expected_lifetime_days=survival.sum(axis=1) * days_per_bin,
+        risk_level=risk,
+        recommended_intervention=intervention,
+    )
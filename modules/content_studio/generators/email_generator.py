@@ -79,17 +79,59 @@ class EmailGenerator:
         if self.llm_client:
             return self._llm_subject_lines(brief, brand_voice, n_variants, offer_type, offer_value)
 
+        return self.subject_line_candidates(brief, offer_type, offer_value)[:n_variants]
+
+    def subject_line_candidates(
+        self,
+        brief: str,
+        offer_type: Optional[str] = None,
+        offer_value: Optional[float] = None,
+    ) -> list[dict]:
+        topic = brief[:40]
         templates = [
-            {"type": "urgency", "text": f"Don't miss out - {brief[:40]}"},
-            {"type": "curiosity", "text": f"Here's something special just for you"},
-            {"type": "direct", "text": f"Your exclusive offer is waiting"},
+            {"type": "urgency", "text": f"Don't miss out - {topic}"},
+            {"type": "curiosity", "text": "Here's something special just for you"},
+            {"type": "direct", "text": "Your exclusive offer is waiting"},
+            {"type": "personal", "text": "{{first_name}}, this one's for you"},
+            {"type": "question", "text": f"Ready for {topic.lower()}?"},
+            {"type": "benefit", "text": f"{topic} - made for you"},
+            {"type": "scarcity", "text": "Only a few left - see what's still in stock"},
+            {"type": "social_proof", "text": "See why customers keep coming back"},
+            {"type": "news", "text": f"Just in: {topic}"},
+            {"type": "reminder", "text": "A quick reminder before this ends"},
         ]
         if offer_type == "percentage_discount" and offer_value:
-            templates[0]["text"] = f"Save {int(offer_value)}% today only"
-            templates[1]["text"] = f"Your {int(offer_value)}% off is ready"
-            templates[2]["text"] = f"Limited time: {int(offer_value)}% off for you"
-
-        return templates[:n_variants]
+            pct = int(offer_value)
+            templates[0]["text"] = f"Save {pct}% today only"
+            templates[1]["text"] = f"Your {pct}% off is ready"
+            templates[2]["text"] = f"Limited time: {pct}% off for you"
+            templates.extend([
+                {"type": "personal", "text": f"{{{{first_name}}}}, take {pct}% off your next order"},
+                {"type": "question", "text": f"Want {pct}% off?"},
+                {"type": "scarcity", "text": f"Last chance: {pct}% off ends tonight"},
+            ])
+        elif offer_type == "free_shipping":
+            templates.extend([
+                {"type": "direct", "text": "Free shipping on everything, today only"},
+                {"type": "benefit", "text": f"{topic} - shipped free"},
+            ])
+        elif offer_type == "free_gift":
+            templates.extend([
+                {"type": "direct", "text": "A free gift with your next order"},
+                {"type": "curiosity", "text": "We've picked out a gift for you"},
+            ])
+        return templates
+
+    def preview_text_candidates(self, brief: str, offer_type: Optional[str] = None) -> list[str]:
+        candidates = [
+            self._generate_preview_text(brief=brief, subject=""),
+            "Open to see what we picked for you",
+            "Everything you need to know inside",
+            "Hand-picked for you this week",
+        ]
+        if offer_type:
+            candidates.append("Your offer is inside - don't wait")
+        return candidates
 
     def _llm_subject_lines(self, brief, brand_voice, n, offer_type, offer_value) -> list[dict]:
         prompt = f"""Generate {n} email subject line variants.
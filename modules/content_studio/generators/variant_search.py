@@ -0,0 +1,295 @@
+"""
+Variant Search Engine - Module 3.
+Generate-then-rank for campaign content: expands subject line, preview text, offer and
+send-time options, scores candidates with the Module 2 campaign predictor in batched
+passes, and prunes the combinatorial space with beam search under a latency budget.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+import structlog
+
+from modules.campaign_predictor.features.variant import CampaignVariant
+from modules.campaign_predictor.models.prediction import (
+    PREDICTION_TARGETS,
+    CampaignPrediction,
+    prediction_from_outputs,
+)
+from modules.campaign_predictor.models.scorer import CampaignScorer
+from modules.content_studio.generators.email_generator import EmailGenerator
+
+log = structlog.get_logger()
+
+SEARCH_DIMENSIONS = ("subject_line", "preview_text", "offer", "send_slot")
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DEFAULT_SEND_SLOTS = [(day, hour) for day in (1, 2, 3, 5) for hour in (9, 12, 18)]
+DEFAULT_OFFERS = [(None, 0.0), ("percentage_discount", 10.0), ("percentage_discount", 20.0), ("free_shipping", 0.0)]
+
+
+@dataclass
+class SearchSpace:
+    subject_lines: list[str]
+    body: str = ""
+    preview_texts: list[str] = field(default_factory=lambda: [""])
+    offers: list[tuple[Optional[str], float]] = field(default_factory=lambda: list(DEFAULT_OFFERS))
+    send_slots: list[tuple[int, int]] = field(default_factory=lambda: list(DEFAULT_SEND_SLOTS))
+    channel: str = "email"
+    segment_size: int = 1000
+    budget: float = 0.0
+
+    def options(self) -> list[list]:
+        return [self.subject_lines, self.preview_texts, self.offers, self.send_slots]
+
+    @property
+    def size(self) -> int:
+        return int(np.prod([len(o) for o in self.options()]))
+
+    def build(self, choice: tuple[int, ...]) -> CampaignVariant:
+        subject, preview, (offer_type, offer_value), (day, hour) = (
+            opts[i] for opts, i in zip(self.options(), choice)
+        )
+        return CampaignVariant(
+            subject_line=subject,
+            body=self.body,
+            preview_text=preview,
+            channel=self.channel,
+            offer_type=offer_type,
+            offer_value=offer_value or 0.0,
+            send_hour=hour,
+            send_day_of_week=day,
+            segment_size=self.segment_size,
+            budget=self.budget,
+        )
+
+
+@dataclass
+class RankedVariant:
+    variant: CampaignVariant
+    prediction: CampaignPrediction
+    lift: dict[str, float]
+    objective_lift_pct: float
+
+    def to_dict(self) -> dict:
+        return {
+            **self.variant.to_dict(),
+            "prediction": self.prediction.to_dict(),
+            "lift": {k: round(v, 4) for k, v in self.lift.items()},
+            "objective_lift_pct": round(self.objective_lift_pct, 4),
+        }
+
+
+@dataclass
+class SearchResult:
+    objective: str
+    baseline: RankedVariant
+    top: list[RankedVariant]
+    n_candidates: int
+    n_scored: int
+    memo_hits: int
+    elapsed_ms: float
+    exhaustive: bool
+    budget_exhausted: bool
+
+    def to_dict(self) -> dict:
+        return {
+            "objective": self.objective,
+            "baseline": self.baseline.to_dict(),
+            "top_variants": [r.to_dict() for r in self.top],
+            "search": {
+                "candidates": self.n_candidates,
+                "scored": self.n_scored,
+                "memo_hits": self.memo_hits,
+                "elapsed_ms": round(self.elapsed_ms, 1),
+                "exhaustive": self.exhaustive,
+                "budget_exhausted": self.budget_exhausted,
+            },
+        }
+
+
+def describe_change(baseline: CampaignVariant, variant: CampaignVariant) -> str:
+    changes = []
+    if variant.subject_line != baseline.subject_line:
+        changes.append(f'Use subject line "{variant.subject_line}"')
+    if variant.preview_text != baseline.preview_text:
+        changes.append(f'Use preview text "{variant.preview_text}"')
+    if (variant.offer_type, variant.offer_value) != (baseline.offer_type, baseline.offer_value):
+        if not variant.offer_type:
+            changes.append("Send without an offer")
+        elif variant.offer_type == "percentage_discount":
+            changes.append(f"Offer {int(variant.offer_value)}% off")
+        else:
+            changes.append(f"Offer {variant.offer_type.replace('_', ' ')}")
+    if (variant.send_day_of_week, variant.send_hour) != (baseline.send_day_of_week, baseline.send_hour):
+        changes.append(f"Send {DAY_NAMES[variant.send_day_of_week % 7]} {variant.send_hour:02d}:00")
+    return "; ".join(changes) or "Keep the current variant"
+
+
+class VariantSearchEngine:
+    def __init__(
+        self,
+        scorer: CampaignScorer,
+        beam_width: int = 8,
+        exhaustive_limit: int = 2048,
+        chunk_size: int = 512,
+        memo_size: int = 100_000,
+    ):
+        self.scorer = scorer
+        self.beam_width = beam_width
+        self.exhaustive_limit = exhaustive_limit
+        self.chunk_size = chunk_size
+        self.memo_size = memo_size
+        self._memo: OrderedDict[CampaignVariant, np.ndarray] = OrderedDict()
+        # Searches run in threadpool workers and share the memo; the lock covers memo
+        # access only, never a scoring pass.
+        self._memo_lock = threading.Lock()
+        self.log = log.bind(component="VariantSearchEngine")
+
+    def expand(
+        self,
+        brief: str,
+        body: str = "",
+        offer_type: Optional[str] = None,
+        offer_value: Optional[float] = None,
+        generator: Optional[EmailGenerator] = None,
+        **space_kwargs,
+    ) -> SearchSpace:
+        generator = generator or EmailGenerator()
+        subjects = [c["text"] for c in generator.subject_line_candidates(brief, offer_type, offer_value)]
+        offers = list(DEFAULT_OFFERS)
+        if offer_type and (offer_type, float(offer_value or 0)) not in offers:
+            offers.insert(0, (offer_type, float(offer_value or 0)))
+        return SearchSpace(
+            subject_lines=list(dict.fromkeys(subjects)),
+            body=body,
+            preview_texts=generator.preview_text_candidates(brief, offer_type),
+            offers=offers,
+            **space_kwargs,
+        )
+
+    def search(
+        self,
+        space: SearchSpace,
+        objective: str = "revenue",
+        top_k: int = 5,
+        latency_budget_ms: float = 250.0,
+        baseline: Optional[CampaignVariant] = None,
+    ) -> SearchResult:
+        if objective not in PREDICTION_TARGETS:
+            raise ValueError(f"objective must be one of {PREDICTION_TARGETS}")
+        start = time.perf_counter()
+        deadline = start + latency_budget_ms / 1000.0
+        obj_idx = PREDICTION_TARGETS.index(objective)
+
+        baseline = baseline or space.build((0,) * len(SEARCH_DIMENSIONS))
+        scored, memo_hits, exhausted = self._score([baseline], deadline=None)
+
+        exhaustive = space.size <= self.exhaustive_limit
+        if exhaustive:
+            choices = list(np.ndindex(*[len(o) for o in space.options()]))
+            batch, hits, exhausted = self._score([space.build(c) for c in choices], deadline)
+            scored.update(batch)
+            memo_hits += hits
+        else:
+            beam = [(0,) * len(SEARCH_DIMENSIONS)]
+            for dim, options in enumerate(space.options()):
+                candidates = list(dict.fromkeys(
+                    state[:dim] + (i,) + state[dim + 1 :] for state in beam for i in range(len(options))
+                ))
+                variants = {c: space.build(c) for c in candidates}
+                batch, hits, exhausted = self._score(list(variants.values()), deadline)
+                scored.update(batch)
+                memo_hits += hits
+                ranked = sorted(
+                    (c for c in candidates if variants[c] in batch),
+                    key=lambda c: batch[variants[c]][obj_idx],
+                    reverse=True,
+                )
+                beam = ranked[: self.beam_width] or beam
+                if exhausted:
+                    break
+
+        base_row = scored[baseline]
+        ordered = sorted(
+            (v for v in scored if v != baseline),
+            key=lambda v: scored[v][obj_idx],
+            reverse=True,
+        )[:top_k]
+        top = [self._rank(v, scored[v], base_row, obj_idx) for v in ordered]
+        base = self._rank(baseline, base_row, base_row, obj_idx)
+        base.prediction.top_suggestions = [
+            {
+                "change": describe_change(baseline, r.variant),
+                f"expected_{objective}_lift": round(r.lift[objective], 4),
+            }
+            for r in top
+            if r.lift[objective] > 0
+        ]
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.log.info(
+            "Variant search complete",
+            candidates=space.size,
+            scored=len(scored),
+            memo_hits=memo_hits,
+            elapsed_ms=round(elapsed_ms, 1),
+            exhaustive=exhaustive,
+        )
+        return SearchResult(
+            objective=objective,
+            baseline=base,
+            top=top,
+            n_candidates=space.size,
+            n_scored=len(scored),
+            memo_hits=memo_hits,
+            elapsed_ms=elapsed_ms,
+            exhaustive=exhaustive,
+            budget_exhausted=exhausted,
+        )
+
+    def _score(
+        self,
+        variants: list[CampaignVariant],
+        deadline: Optional[float],
+    ) -> tuple[dict[CampaignVariant, np.ndarray], int, bool]:
+        rows: dict[CampaignVariant, np.ndarray] = {}
+        misses = []
+        with self._memo_lock:
+            for v in dict.fromkeys(variants):
+                row = self._memo.get(v)
+                if row is None:
+                    misses.append(v)
+                else:
+                    self._memo.move_to_end(v)
+                    rows[v] = row
+        hits = len(rows)
+
+        for start in range(0, len(misses), self.chunk_size):
+            if deadline is not None and time.perf_counter() >= deadline:
+                return rows, hits, True
+            chunk = misses[start : start + self.chunk_size]
+            outputs = self.scorer.predict_outputs(chunk)
+            matrix = np.stack([outputs[t] for t in PREDICTION_TARGETS], axis=1)
+            with self._memo_lock:
+                for v, row in zip(chunk, matrix):
+                    rows[v] = row
+                    self._memo[v] = row
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return rows, hits, False
+
+    @staticmethod
+    def _rank(variant: CampaignVariant, row: np.ndarray, base_row: np.ndarray, obj_idx: int) -> RankedVariant:
+        outputs = {t: row[i : i + 1] for i, t in enumerate(PREDICTION_TARGETS)}
+        base = float(base_row[obj_idx])
+        return RankedVariant(
+            variant=variant,
+            prediction=prediction_from_outputs(outputs, 0),
+            lift={t: float(row[i] - base_row[i]) for i, t in enumerate(PREDICTION_TARGETS)},
+            objective_lift_pct=(float(row[obj_idx]) - base) / abs(base) if base else 0.0,
+        )
@@ -3,16 +3,25 @@ Segment Drift Detector - Module 1.
 Monitors each customer's segment membership over time and detects early
 downward movement (e.g., Champion → At-Risk) before churn occurs.
 Uses statistical process control + learned transition probabilities.
+Membership history is processed column-wise: one lexsort over (customer, time), a
+shifted array for the previous segment and a segment×segment lookup matrix to
+classify every transition at once.
 """
 
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 import numpy as np
 import structlog
 
+from modules.customer_intelligence.clustering.engine import SEGMENT_NAMING_RULES
+
+if TYPE_CHECKING:
+    from modules.customer_intelligence.clustering.transitions import SegmentTransitionModel
+
 log = structlog.get_logger()
 
 
@@ -25,6 +34,8 @@ class DriftEvent:
     health_score_before: float
     health_score_after: float
     detected_at: datetime
+    surprise: Optional[float] = None
+    churn_risk_delta: Optional[float] = None
 
 
 DOWNWARD_TRANSITIONS = {
@@ -54,57 +65,260 @@ CRITICAL_TRANSITIONS = {
 }
 
 
+SEGMENT_NAMES = [rule["name"] for rule in SEGMENT_NAMING_RULES] + ["General Customers", "Unknown"]
+SEGMENT_INDEX = {name: code for code, name in enumerate(SEGMENT_NAMES)}
+UNKNOWN_SEGMENT = SEGMENT_INDEX["Unknown"]
+
+DIRECTIONS = ("neutral_or_upward", "downward", "critical")
+NEUTRAL, DOWNWARD, CRITICAL = range(len(DIRECTIONS))
+
+ALERT_TYPE = "segment_drift"
+ALERT_SEVERITY = {DOWNWARD: "medium", CRITICAL: "high"}
+
+
+def _transition_matrix() -> np.ndarray:
+    matrix = np.full((len(SEGMENT_NAMES), len(SEGMENT_NAMES)), NEUTRAL, dtype=np.int8)
+    for direction, transitions in ((DOWNWARD, DOWNWARD_TRANSITIONS), (CRITICAL, CRITICAL_TRANSITIONS)):
+        for from_seg, to_seg in transitions:
+            matrix[SEGMENT_INDEX[from_seg], SEGMENT_INDEX[to_seg]] = direction
+    return matrix
+
+
+TRANSITION_MATRIX = _transition_matrix()
+
+
+def encode_segments(names: Sequence[str]) -> np.ndarray:
+    # Decode each distinct name once; histories repeat a dozen names millions of times.
+    uniques, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    lookup = np.array([SEGMENT_INDEX.get(name, UNKNOWN_SEGMENT) for name in uniques], dtype=np.int16)
+    return lookup[inverse].reshape(-1)
+
+
+def _timestamps(values) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype.kind == "M":
+        return values.astype("datetime64[us]")
+    # numpy has no timezone-aware datetime64, so aware values are normalised to UTC.
+    return np.array(
+        [
+            v.astimezone(timezone.utc).replace(tzinfo=None)
+            if isinstance(v, datetime) and v.tzinfo is not None else v
+            for v in values
+        ],
+        dtype="datetime64[us]",
+    )
+
+
+@dataclass
+class DriftBatch:
+    rows: np.ndarray
+    customer_ids: np.ndarray
+    from_codes: np.ndarray
+    to_codes: np.ndarray
+    directions: np.ndarray
+    health_before: np.ndarray
+    health_after: np.ndarray
+    assigned_at: np.ndarray
+    surprise: Optional[np.ndarray] = None
+    risk_delta: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+    def to_events(self, detected_at: Optional[datetime] = None) -> list[DriftEvent]:
+        detected_at = detected_at or datetime.now(timezone.utc)
+        surprise = self.surprise.tolist() if self.surprise is not None else [None] * len(self)
+        risk_delta = self.risk_delta.tolist() if self.risk_delta is not None else [None] * len(self)
+        return [
+            DriftEvent(
+                customer_id=customer_id,
+                from_segment=SEGMENT_NAMES[from_code],
+                to_segment=SEGMENT_NAMES[to_code],
+                drift_direction=DIRECTIONS[direction],
+                health_score_before=before,
+                health_score_after=after,
+                detected_at=detected_at,
+                surprise=s,
+                churn_risk_delta=r,
+            )
+            for customer_id, from_code, to_code, direction, before, after, s, r in zip(
+                self.customer_ids.tolist(),
+                self.from_codes.tolist(),
+                self.to_codes.tolist(),
+                self.directions.tolist(),
+                self.health_before.tolist(),
+                self.health_after.tolist(),
+                surprise,
+                risk_delta,
+            )
+        ]
+
+
 class SegmentDriftDetector:
-    def __init__(self, health_score_threshold: float = 10.0):
+    def __init__(
+        self,
+        health_score_threshold: float = 10.0,
+        transition_model: Optional[SegmentTransitionModel] = None,
+        downward_risk_delta: float = 0.1,
+        critical_risk_delta: float = 0.25,
+    ):
         self.health_score_threshold = health_score_threshold
+        self.transition_model = transition_model
+        self.downward_risk_delta = downward_risk_delta
+        self.critical_risk_delta = critical_risk_delta
 
-    def detect_drift(
+    def detect_columnar(
         self,
-        membership_history: list[dict],
-    ) -> list[DriftEvent]:
-        drift_events = []
+        customer_ids: np.ndarray,
+        assigned_at: np.ndarray,
+        segment_codes: np.ndarray,
+        health: np.ndarray,
+    ) -> DriftBatch:
+        customer_ids = np.asarray(customer_ids)
+        assigned_at = _timestamps(assigned_at)
+        segment_codes = np.asarray(segment_codes, dtype=np.intp)
+        health = np.asarray(health, dtype=np.float64)
 
-        if len(membership_history) < 2:
-            return drift_events
-
-        membership_history = sorted(membership_history, key=lambda x: x["assigned_at"])
+        keys = customer_ids
+        if keys.dtype == object:
+            keys = np.unique(keys, return_inverse=True)[1].reshape(-1)
+        order = np.lexsort((assigned_at, keys))
+        keys, codes = keys[order], segment_codes[order]
 
-        for i in range(1, len(membership_history)):
-            prev = membership_history[i - 1]
-            curr = membership_history[i]
+        directions = self._directions(codes[:-1], codes[1:])
+        # Row i is a drift if it continues row i-1's customer and the move is downward.
+        after = np.flatnonzero((keys[1:] == keys[:-1]) & (directions != NEUTRAL)) + 1
+        before = after - 1
+        model = self.transition_model
+        return DriftBatch(
+            rows=order[after],
+            customer_ids=customer_ids[order[after]],
+            from_codes=codes[before],
+            to_codes=codes[after],
+            directions=directions[before],
+            health_before=health[order[before]],
+            health_after=health[order[after]],
+            assigned_at=assigned_at[order[after]],
+            surprise=model.surprise(codes[before], codes[after]) if model is not None else None,
+            risk_delta=model.risk_delta(codes[before], codes[after]) if model is not None else None,
+        )
 
-            from_seg = prev.get("segment_name", "Unknown")
-            to_seg = curr.get("segment_name", "Unknown")
-
-            if from_seg == to_seg:
-                continue
+    def score_transitions(
+        self,
+        customer_ids: np.ndarray,
+        from_codes: np.ndarray,
+        to_codes: np.ndarray,
+        health_before: np.ndarray,
+        health_after: np.ndarray,
+        assigned_at: np.ndarray,
+    ) -> DriftBatch:
+        from_codes = np.asarray(from_codes, dtype=np.intp)
+        to_codes = np.asarray(to_codes, dtype=np.intp)
+        directions = self._directions(from_codes, to_codes)
+        rows = np.flatnonzero(directions != NEUTRAL)
+        model = self.transition_model
+        return DriftBatch(
+            rows=rows,
+            customer_ids=np.asarray(customer_ids)[rows],
+            from_codes=from_codes[rows],
+            to_codes=to_codes[rows],
+            directions=directions[rows],
+            health_before=np.asarray(health_before, dtype=np.float64)[rows],
+            health_after=np.asarray(health_after, dtype=np.float64)[rows],
+            assigned_at=_timestamps(assigned_at)[rows],
+            surprise=model.surprise(from_codes[rows], to_codes[rows]) if model is not None else None,
+            risk_delta=model.risk_delta(from_codes[rows], to_codes[rows]) if model is not None else None,
+        )
 
-            direction = self._classify_transition(from_seg, to_seg)
+    def _directions(self, from_codes: np.ndarray, to_codes: np.ndarray) -> np.ndarray:
+        directions = TRANSITION_MATRIX[from_codes, to_codes]
+        if self.transition_model is None:
+            return directions
+        # Learned downstream churn risk can escalate a move, never soften a hard-coded one.
+        delta = self.transition_model.risk_delta(from_codes, to_codes)
+        learned = np.where(
+            delta >= self.critical_risk_delta, CRITICAL,
+            np.where(delta >= self.downward_risk_delta, DOWNWARD, NEUTRAL),
+        ).astype(np.int8)
+        learned[from_codes == to_codes] = NEUTRAL
+        return np.maximum(directions, learned)
 
-            if direction in ("downward", "critical"):
-                drift_events.append(DriftEvent(
-                    customer_id=curr["customer_id"],
-                    from_segment=from_seg,
-                    to_segment=to_seg,
-                    drift_direction=direction,
-                    health_score_before=prev.get("health_score", 0),
-                    health_score_after=curr.get("health_score", 0),
-                    detected_at=datetime.now(timezone.utc),
-                ))
+    def detect_drift(
+        self,
+        membership_history: list[dict],
+    ) -> list[DriftEvent]:
+        if len(membership_history) < 2:
+            return []
+        # A single history belongs to one customer, so every row shares one sort key.
+        batch = self._detect_records(membership_history, np.zeros(len(membership_history), dtype=np.int64))
+        batch.customer_ids = np.array([membership_history[i]["customer_id"] for i in batch.rows], dtype=object)
+        return batch.to_events()
 
-        return drift_events
+    def _detect_records(self, records: list[dict], customer_ids: np.ndarray) -> DriftBatch:
+        return self.detect_columnar(
+            customer_ids,
+            [r["assigned_at"] for r in records],
+            encode_segments([r.get("segment_name", "Unknown") for r in records]),
+            [r.get("health_score", 0) for r in records],
+        )
 
     def _classify_transition(self, from_seg: str, to_seg: str) -> str:
-        if (from_seg, to_seg) in CRITICAL_TRANSITIONS:
-            return "critical"
-        if (from_seg, to_seg) in DOWNWARD_TRANSITIONS:
-            return "downward"
-        return "neutral_or_upward"
+        codes = encode_segments([from_seg, to_seg])
+        return DIRECTIONS[int(self._directions(codes[:1], codes[1:])[0])]
 
     def batch_detect(self, all_histories: dict[str, list[dict]]) -> list[DriftEvent]:
-        all_events = []
-        for customer_id, history in all_histories.items():
-            events = self.detect_drift(history)
-            all_events.extend(events)
-        log.info("Drift detection complete", total_drift_events=len(all_events))
-        return all_events
+        records = [record for history in all_histories.values() for record in history]
+        customer_ids = np.array(
+            [cid for cid, history in all_histories.items() for _ in history], dtype=object
+        )
+        events = self._detect_records(records, customer_ids).to_events() if records else []
+        log.info("Drift detection complete", total_drift_events=len(events))
+        return events
+
+
+def write_drift_alerts(cursor, org_id: str, batch: DriftBatch) -> int:
+    from psycopg2.extras import execute_values
+
+    if not len(batch):
+        return 0
+    assigned_at = [str(t) for t in batch.assigned_at.astype("datetime64[us]")]
+    # The lookback window can overlap the previous run, so transitions that already
+    # raised an alert are matched on (customer, assignment time) and skipped.
+    cursor.execute(
+        """
+        SELECT data->>'customer_id', data->>'assigned_at' FROM alerts
+        WHERE org_id = %s AND alert_type = %s AND data->>'assigned_at' >= %s
+        """,
+        (org_id, ALERT_TYPE, min(assigned_at)),
+    )
+    seen = set(cursor.fetchall())
+    rows = []
+    for event, direction, at in zip(batch.to_events(), batch.directions.tolist(), assigned_at):
+        customer_id = str(event.customer_id)
+        if (customer_id, at) in seen:
+            continue
+        data = {
+            "customer_id": customer_id,
+            "from_segment": event.from_segment,
+            "to_segment": event.to_segment,
+            "drift_direction": event.drift_direction,
+            "health_score_before": round(event.health_score_before, 2),
+            "health_score_after": round(event.health_score_after, 2),
+            "surprise": None if event.surprise is None else round(event.surprise, 4),
+            "churn_risk_delta": None if event.churn_risk_delta is None else round(event.churn_risk_delta, 4),
+            "assigned_at": at,
+        }
+        rows.append((
+            org_id,
+            ALERT_TYPE,
+            ALERT_SEVERITY[direction],
+            f"Customer moved from {event.from_segment} to {event.to_segment}",
+            f"Customer {customer_id} health score {event.health_score_before:.0f} -> {event.health_score_after:.0f}",
+            json.dumps(data),
+        ))
+    if rows:
+        execute_values(
+            cursor,
+            "INSERT INTO alerts (org_id, alert_type, severity, title, message, data) VALUES %s",
+            rows,
+        )
+    return len(rows)
@@ -0,0 +1,162 @@
+"""
+Segment Transition Model - Module 1.
+Per-org Markov chain over segment membership. Transition counts accumulate
+incrementally from customer_segment_memberships (each row carries its previous
+segment) and are smoothed with a symmetric Dirichlet prior. "Lost" is treated as
+absorbing to estimate how likely a customer in each segment is to end up lost within
+a few more moves; a transition is scored by its surprise (-log p) and by how much
+it raises that downstream churn risk. Counts are stored as a compact int32 blob
+per org and cached in-process for the drift task.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+import numpy as np
+import structlog
+
+from modules.customer_intelligence.clustering.drift_detector import (
+    SEGMENT_INDEX,
+    SEGMENT_NAMES,
+    encode_segments,
+)
+
+log = structlog.get_logger()
+
+ABSORBING_SEGMENT = SEGMENT_INDEX["Lost"]
+
+
+class SegmentTransitionModel:
+    def __init__(self, counts: Optional[np.ndarray] = None, prior: float = 1.0, horizon: int = 6):
+        n = len(SEGMENT_NAMES)
+        self.counts = np.zeros((n, n), dtype=np.int32) if counts is None else counts.astype(np.int32)
+        self.prior = prior
+        self.horizon = horizon
+        self._churn_risk: Optional[np.ndarray] = None
+
+    @property
+    def n_transitions(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, from_codes: np.ndarray, to_codes: np.ndarray) -> None:
+        np.add.at(self.counts, (np.asarray(from_codes, dtype=np.intp), np.asarray(to_codes, dtype=np.intp)), 1)
+        self._churn_risk = None
+
+    def update_names(self, from_segments: list[str], to_segments: list[str]) -> None:
+        self.update(encode_segments(from_segments), encode_segments(to_segments))
+
+    @property
+    def probabilities(self) -> np.ndarray:
+        smoothed = self.counts + self.prior
+        return smoothed / smoothed.sum(axis=1, keepdims=True)
+
+    @property
+    def churn_risk(self) -> np.ndarray:
+        # P(reach Lost within `horizon` moves) from each segment, with Lost absorbing.
+        if self._churn_risk is None:
+            chain = self.probabilities
+            chain[ABSORBING_SEGMENT] = 0.0
+            chain[ABSORBING_SEGMENT, ABSORBING_SEGMENT] = 1.0
+            self._churn_risk = np.linalg.matrix_power(chain, self.horizon)[:, ABSORBING_SEGMENT]
+        return self._churn_risk
+
+    def surprise(self, from_codes: np.ndarray, to_codes: np.ndarray) -> np.ndarray:
+        return -np.log(self.probabilities[from_codes, to_codes])
+
+    def risk_delta(self, from_codes: np.ndarray, to_codes: np.ndarray) -> np.ndarray:
+        risk = self.churn_risk
+        return risk[to_codes] - risk[from_codes]
+
+    def table(self) -> dict[str, dict[str, float]]:
+        probabilities = self.probabilities
+        return {
+            name: {to: round(float(p), 4) for to, p in zip(SEGMENT_NAMES, row)}
+            for name, row in zip(SEGMENT_NAMES, probabilities)
+        }
+
+    def to_bytes(self) -> bytes:
+        return self.counts.astype("<i4").tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, **kwargs) -> SegmentTransitionModel:
+        n = len(SEGMENT_NAMES)
+        counts = np.frombuffer(blob, dtype="<i4")
+        if counts.size != n * n:
+            # The segment vocabulary changed; start over rather than misalign rows.
+            log.warning("Discarding transition counts with stale shape", size=counts.size)
+            return cls(**kwargs)
+        return cls(counts.reshape(n, n).copy(), **kwargs)
+
+
+class TransitionModelStore:
+    def __init__(self, max_cached_orgs: int = 256):
+        self.max_cached_orgs = max_cached_orgs
+        self._cache: OrderedDict[str, tuple[Optional[datetime], SegmentTransitionModel]] = OrderedDict()
+
+    def get(self, connection, org_id: str) -> SegmentTransitionModel:
+        org_id = str(org_id)
+        if org_id in self._cache:
+            self._cache.move_to_end(org_id)
+            watermark, model = self._cache[org_id]
+        else:
+            watermark, model = self._load(connection, org_id)
+
+        new_watermark = self._apply_new_transitions(connection, org_id, model, watermark)
+        if new_watermark != watermark:
+            self._save(connection, org_id, model, new_watermark)
+
+        self._cache[org_id] = (new_watermark, model)
+        while len(self._cache) > self.max_cached_orgs:
+            self._cache.popitem(last=False)
+        return model
+
+    def _load(self, connection, org_id: str) -> tuple[Optional[datetime], SegmentTransitionModel]:
+        with connection.cursor() as cur:
+            cur.execute(
+                "SELECT counts, last_assigned_at FROM segment_transition_models WHERE org_id = %s",
+                (org_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None, SegmentTransitionModel()
+        return row[1], SegmentTransitionModel.from_bytes(bytes(row[0]))
+
+    def _apply_new_transitions(
+        self, connection, org_id: str, model: SegmentTransitionModel, watermark: Optional[datetime]
+    ) -> Optional[datetime]:
+        with connection.cursor() as cur:
+            cur.execute(
+                """
+                SELECT prev.name, cur.name, m.assigned_at
+                FROM customer_segment_memberships m
+                JOIN customer_segments cur ON cur.id = m.segment_id
+                JOIN customer_segments prev ON prev.id = m.previous_segment_id
+                WHERE m.org_id = %(org_id)s
+                  AND (%(watermark)s::timestamptz IS NULL OR m.assigned_at > %(watermark)s)
+                """,
+                {"org_id": org_id, "watermark": watermark},
+            )
+            rows = cur.fetchall()
+        if not rows:
+            return watermark
+        from_segments, to_segments, assigned_at = zip(*rows)
+        model.update_names(list(from_segments), list(to_segments))
+        log.info("Transition model updated", org_id=org_id, new_transitions=len(rows))
+        return max(assigned_at)
+
+    def _save(self, connection, org_id: str, model: SegmentTransitionModel, watermark: Optional[datetime]) -> None:
+        with connection.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO segment_transition_models (org_id, counts, last_assigned_at, updated_at)
+                VALUES (%s, %s, %s, NOW())
+                ON CONFLICT (org_id) DO UPDATE SET
+                    counts = EXCLUDED.counts,
+                    last_assigned_at = EXCLUDED.last_assigned_at,
+                    updated_at = NOW()
+                """,
+                (org_id, model.to_bytes(), watermark),
+            )
+        connection.commit()
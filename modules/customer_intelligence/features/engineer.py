@@ -15,6 +15,22 @@ import structlog
 
 log = structlog.get_logger()
 
+NUMERIC_FEATURE_FIELDS = [
+    "recency_days", "frequency", "monetary_value", "avg_order_value",
+    "max_order_value", "min_order_value", "order_value_std",
+    "total_items_purchased", "avg_items_per_order",
+    "unique_products_count", "unique_categories_count",
+    "purchase_tenure_days", "avg_days_between_purchases",
+    "purchase_acceleration", "category_diversity_score",
+    "brand_loyalty_score", "price_sensitivity_score",
+    "new_product_adoption_rate", "email_open_rate", "email_click_rate",
+    "email_conversion_rate", "cart_abandonment_rate",
+    "website_visit_frequency", "avg_session_duration_seconds",
+    "bounce_rate", "preferred_day_of_week", "preferred_hour_of_day",
+    "q1_purchase_share", "q2_purchase_share", "q3_purchase_share",
+    "q4_purchase_share", "recency_trend_90d", "customer_health_score",
+]
+
 
 @dataclass
 class CustomerFeatureVector:
@@ -67,23 +83,8 @@ class CustomerFeatureVector:
         return {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
 
     def to_numeric_array(self) -> np.ndarray:
-        numeric_fields = [
-            "recency_days", "frequency", "monetary_value", "avg_order_value",
-            "max_order_value", "min_order_value", "order_value_std",
-            "total_items_purchased", "avg_items_per_order",
-            "unique_products_count", "unique_categories_count",
-            "purchase_tenure_days", "avg_days_between_purchases",
-            "purchase_acceleration", "category_diversity_score",
-            "brand_loyalty_score", "price_sensitivity_score",
-            "new_product_adoption_rate", "email_open_rate", "email_click_rate",
-            "email_conversion_rate", "cart_abandonment_rate",
-            "website_visit_frequency", "avg_session_duration_seconds",
-            "bounce_rate", "preferred_day_of_week", "preferred_hour_of_day",
-            "q1_purchase_share", "q2_purchase_share", "q3_purchase_share",
-            "q4_purchase_share", "recency_trend_90d", "customer_health_score",
-        ]
         values = []
-        for f in numeric_fields:
+        for f in NUMERIC_FEATURE_FIELDS:
             v = getattr(self, f, None)
             values.append(float(v) if v is not None else 0.0)
         return np.array(values, dtype=np.float32)
@@ -153,6 +153,17 @@ class TemporalBehavioralTransformer(nn.Module):
             fingerprint = self.forward(et, nf)
             return fingerprint.squeeze(0).numpy()
 
+    def get_fingerprints(self, sequences: list[dict], batch_size: int = 256) -> np.ndarray:
+        self.eval()
+        order = sorted(range(len(sequences)), key=lambda i: len(sequences[i]["event_types"]))
+        fingerprints = np.zeros((len(sequences), self.config.output_dim), dtype=np.float32)
+        with torch.no_grad():
+            for start in range(0, len(order), batch_size):
+                idx = order[start : start + batch_size]
+                et, nf, mask = self._prepare_batch([sequences[i] for i in idx])
+                fingerprints[idx] = self.forward(et, nf, mask).numpy()
+        return fingerprints
+
     def count_parameters(self) -> int:
         return sum(p.numel() for p in self.parameters() if p.requires_grad)
 
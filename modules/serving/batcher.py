@@ -0,0 +1,178 @@
+"""
+Async micro-batcher - coalesces concurrent single-item inference calls into batches.
+
+Requests are queued per model and flushed when max_batch_size items are waiting or the
+oldest has waited max_wait_ms. The batched call runs on a dedicated thread pool so the
+event loop keeps serving requests while a forward pass holds the CPU.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable, Generic, Optional, Sequence, TypeVar
+import numpy as np
+import structlog
+from prometheus_client import Gauge, Histogram
+
+log = structlog.get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+QUEUE_DEPTH = Gauge(
+    "aima_inference_queue_depth",
+    "Inference requests waiting for a micro-batch",
+    ["model"],
+)
+BATCH_SIZE = Histogram(
+    "aima_inference_batch_size",
+    "Items per micro-batched forward pass",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+BATCH_SECONDS = Histogram(
+    "aima_inference_batch_seconds",
+    "Wall time of a micro-batched forward pass",
+    ["model"],
+)
+
+
+def split_outputs(outputs: dict[str, np.ndarray]) -> list[dict[str, np.ndarray]]:
+    n = len(next(iter(outputs.values())))
+    return [{name: values[i] for name, values in outputs.items()} for i in range(n)]
+
+
+def stack_outputs(rows: Sequence[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    return {name: np.stack([row[name] for row in rows]) for name in rows[0]}
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[list[T]], Sequence[R]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._depth = QUEUE_DEPTH.labels(model=name)
+        self._batch_size = BATCH_SIZE.labels(model=name)
+        self._batch_seconds = BATCH_SECONDS.labels(model=name)
+        self.log = log.bind(component="MicroBatcher", model=name)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.running and self._loop is loop:
+            return
+        if self._queue is not None:
+            # The previous loop's task is gone; nothing will ever read what it left queued.
+            self._drain(RuntimeError(f"{self.name} batcher restarted"))
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._run(), name=f"micro-batcher-{self.name}")
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._drain(RuntimeError(f"{self.name} batcher stopped"))
+        self._task = None
+
+    def _drain(self, exc: BaseException) -> None:
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            self._depth.dec()
+            loop = future.get_loop()
+            # A future from a closed loop has no waiter left; one from another live loop
+            # must be resolved on that loop's thread.
+            if future.done() or loop.is_closed():
+                continue
+            if loop is self._loop and loop is asyncio.get_running_loop():
+                future.set_exception(exc)
+            else:
+                loop.call_soon_threadsafe(lambda f=future: f.done() or f.set_exception(exc))
+
+    async def submit(self, item: T) -> R:
+        self.start()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        self._depth.inc()
+        return await future
+
+    async def submit_many(self, items: Sequence[T]) -> list[R]:
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    def _fail(self, batch: list[tuple[T, asyncio.Future]], exc: BaseException) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def _run(self) -> None:
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = self._loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Items already taken off the queue are not drained by stop().
+                self._depth.dec(len(batch))
+                self._fail(batch, RuntimeError(f"{self.name} batcher stopped"))
+                raise
+            self._depth.dec(len(batch))
+
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        self._batch_size.observe(len(items))
+        start = time.perf_counter()
+        try:
+            results = await self._loop.run_in_executor(self.executor, self.fn, items)
+            results = list(results)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError(f"{self.name} batcher stopped"))
+            raise
+        except Exception as exc:
+            self.log.error("Micro-batch failed", batch_size=len(items), error=str(exc))
+            self._fail(batch, exc)
+            return
+        finally:
+            self._batch_seconds.observe(time.perf_counter() - start)
+
+        if len(results) != len(batch):
+            # Results are matched to callers by position, so a short or long result list
+            # cannot be trusted for any of them; unresolved futures would hang forever.
+            self.log.error("Micro-batch result count mismatch", batch_size=len(batch), results=len(results))
+            self._fail(batch, RuntimeError(f"{self.name} batch returned {len(results)} results for {len(batch)} items"))
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,207 @@
+"""
+Model export - TorchScript and ONNX artifacts for the inference path.
+
+Training scripts call export_model() once the best checkpoint is in place. The API and
+Celery workers then load the .onnx artifact through modules.serving.runtime, which only
+needs onnxruntime and numpy, so scoring no longer pays torch's import time and memory.
+TorchScript artifacts are written alongside for consumers that still run on torch.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import torch
+import torch.nn as nn
+import structlog
+
+from modules.attribution.models.neural_mmm import NeuralMMMModel
+from modules.campaign_predictor.models.prediction import PREDICTION_TARGETS
+from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+from modules.clv_churn.models.churn_predictor import DeepChurnModel
+from modules.customer_intelligence.models.transformer import TemporalBehavioralTransformer
+
+log = structlog.get_logger()
+
+EXPORT_FORMATS = ("onnx", "torchscript")
+ONNX_OPSET = 18
+PARITY_ATOL = 1e-4
+
+
+@dataclass
+class ExportSpec:
+    name: str
+    module: nn.Module
+    example_inputs: tuple[torch.Tensor, ...]
+    input_names: list[str]
+    output_names: list[str]
+    dynamic_shapes: tuple[dict, ...] = field(default_factory=tuple)
+
+
+class CampaignPredictorOutputs(nn.Module):
+    """Flattens the predictor's dict output into a tuple so exporters can name each head."""
+
+    def __init__(self, model: MultiTaskPerformancePredictor):
+        super().__init__()
+        self.model = model
+
+    def forward(self, text_emb: torch.Tensor, structured: torch.Tensor) -> tuple[torch.Tensor, ...]:
+        outputs = self.model(text_emb, structured)
+        return tuple(outputs[name] for name in PREDICTION_TARGETS)
+
+
+def _batch_dim() -> torch.export.Dim:
+    return torch.export.Dim("batch", min=1, max=1_000_000)
+
+
+def tbt_spec(model: TemporalBehavioralTransformer, seq_len: int = 32) -> ExportSpec:
+    config = model.config
+    batch = _batch_dim()
+    seq = torch.export.Dim("seq", min=2, max=config.max_seq_len)
+    return ExportSpec(
+        name="tbt_model",
+        module=model,
+        example_inputs=(
+            torch.randint(0, config.n_event_types, (2, seq_len)),
+            torch.randn(2, seq_len, config.n_numerical_features),
+            torch.zeros(2, seq_len, dtype=torch.bool),
+        ),
+        input_names=["event_types", "numerical_features", "padding_mask"],
+        output_names=["fingerprint"],
+        dynamic_shapes=({0: batch, 1: seq}, {0: batch, 1: seq}, {0: batch, 1: seq}),
+    )
+
+
+def churn_spec(model: DeepChurnModel) -> ExportSpec:
+    n_features = model.shared_net[0].in_features
+    return ExportSpec(
+        name="churn_predictor",
+        module=model,
+        example_inputs=(torch.randn(2, n_features),),
+        input_names=["features"],
+        output_names=["hazard"],
+        dynamic_shapes=({0: _batch_dim()},),
+    )
+
+
+def campaign_spec(model: MultiTaskPerformancePredictor) -> ExportSpec:
+    text_dim = model.dna_encoder.text_encoder.linear[0].in_features
+    n_structured = model.dna_encoder.structured_encoder.net[0].in_features
+    batch = _batch_dim()
+    return ExportSpec(
+        name="campaign_predictor",
+        module=CampaignPredictorOutputs(model),
+        example_inputs=(torch.randn(2, text_dim), torch.randn(2, n_structured)),
+        input_names=["text_emb", "structured"],
+        output_names=list(PREDICTION_TARGETS),
+        dynamic_shapes=({0: batch}, {0: batch}),
+    )
+
+
+def mmm_spec(model: NeuralMMMModel, n_time_steps: int = 52) -> ExportSpec:
+    # Adstock unrolls a Python loop over time steps, so the window length is fixed at export.
+    n_controls = model.control_net.in_features
+    batch = _batch_dim()
+    return ExportSpec(
+        name="neural_mmm",
+        module=model,
+        example_inputs=(
+            torch.rand(2, n_time_steps, model.n_channels),
+            torch.randn(2, n_controls),
+        ),
+        input_names=["channel_spend", "control_vars"],
+        output_names=["revenue"],
+        dynamic_shapes=({0: batch}, {0: batch}),
+    )
+
+
+def build_spec(model: nn.Module, **kwargs) -> ExportSpec:
+    if isinstance(model, TemporalBehavioralTransformer):
+        return tbt_spec(model, **kwargs)
+    if isinstance(model, DeepChurnModel):
+        return churn_spec(model)
+    if isinstance(model, MultiTaskPerformancePredictor):
+        return campaign_spec(model)
+    if isinstance(model, NeuralMMMModel):
+        return mmm_spec(model, **kwargs)
+    raise ValueError(f"No export spec for model type: {type(model).__name__}")
+
+
+def export_onnx(spec: ExportSpec, path: Path) -> Path:
+    torch.onnx.export(
+        spec.module,
+        spec.example_inputs,
+        str(path),
+        input_names=spec.input_names,
+        output_names=spec.output_names,
+        dynamic_shapes=spec.dynamic_shapes or None,
+        opset_version=ONNX_OPSET,
+        dynamo=True,
+        external_data=False,
+    )
+    return path
+
+
+def export_torchscript(spec: ExportSpec, path: Path) -> Path:
+    # check_trace compares against a re-trace, which trips over the encoder's nested-tensor
+    # fast path even though outputs match; parity is verified against eager instead.
+    with torch.inference_mode():
+        traced = torch.jit.trace(spec.module, spec.example_inputs, check_trace=False)
+    traced.save(str(path))
+    return path
+
+
+def verify_onnx(spec: ExportSpec, path: Path, atol: float = PARITY_ATOL) -> Optional[float]:
+    from modules.serving.runtime import load_onnx_model
+
+    runtime = load_onnx_model(path)
+    if runtime is None:
+        return None
+
+    with torch.inference_mode():
+        expected = spec.module(*spec.example_inputs)
+    if isinstance(expected, torch.Tensor):
+        expected = (expected,)
+
+    actual = runtime.run(*(t.numpy() for t in spec.example_inputs))
+    max_diff = max(
+        float(np.abs(actual[name] - ref.numpy()).max())
+        for name, ref in zip(spec.output_names, expected)
+    )
+    if max_diff > atol:
+        log.warning("ONNX export diverges from eager model", path=str(path), max_abs_diff=max_diff)
+    return max_diff
+
+
+def export_model(
+    model: nn.Module,
+    output_dir: str | Path,
+    formats: tuple[str, ...] = EXPORT_FORMATS,
+    name: Optional[str] = None,
+    **spec_kwargs,
+) -> dict[str, Path]:
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export formats: {sorted(unknown)}")
+
+    model = model.cpu().eval()
+    spec = build_spec(model, **spec_kwargs)
+    spec.module.eval()
+    name = name or spec.name
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    artifacts: dict[str, Path] = {}
+
+    if "torchscript" in formats:
+        artifacts["torchscript"] = export_torchscript(spec, output_dir / f"{name}.ts.pt")
+
+    if "onnx" in formats:
+        path = export_onnx(spec, output_dir / f"{name}.onnx")
+        artifacts["onnx"] = path
+        max_diff = verify_onnx(spec, path)
+        log.info("ONNX model exported", path=str(path), max_abs_diff=max_diff)
+
+    return artifacts
@@ -0,0 +1,159 @@
+"""
+Dynamic int8 quantization for CPU inference.
+
+Linear layers are swapped for int8 dynamically-quantized equivalents at load time.
+Every quantized model is checked against its float original on a held-out set, and
+the float model is kept whenever the error exceeds tolerance.
+"""
+
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+import torch
+import torch.nn as nn
+import structlog
+
+from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+from modules.clv_churn.models.churn_predictor import DeepChurnModel
+from modules.customer_intelligence.models.transformer import TemporalBehavioralTransformer
+
+log = structlog.get_logger()
+
+DEFAULT_TOLERANCE = 0.02
+
+# Torch releases whose TransformerEncoderLayer gates its fused fast path on the
+# activation_relu_or_gelu attribute; outside this range the public switch is used.
+FASTPATH_FLAG_TORCH_VERSIONS = ((2, 5), (2, 14))
+
+# Submodule prefixes to quantize per model type; None means every nn.Linear.
+QUANTIZE_TARGETS: dict[type, Optional[tuple[str, ...]]] = {
+    DeepChurnModel: None,
+    MultiTaskPerformancePredictor: (
+        "shared",
+        "open_rate_head",
+        "click_rate_head",
+        "conversion_head",
+        "revenue_head",
+        "roi_head",
+    ),
+    TemporalBehavioralTransformer: ("transformer_encoder", "output_head"),
+}
+
+
+@dataclass
+class QuantizationReport:
+    max_abs_diff: float
+    mean_abs_diff: float
+    relative_error: float
+    tolerance: float
+
+    @property
+    def accepted(self) -> bool:
+        return self.relative_error <= self.tolerance
+
+
+def quantizable_linear_names(model: nn.Module, prefixes: Optional[tuple[str, ...]] = None) -> set[str]:
+    # Exact type match skips MultiheadAttention.out_proj (NonDynamicallyQuantizableLinear),
+    # whose weight is read directly by the attention kernel.
+    return {
+        name
+        for name, module in model.named_modules()
+        if type(module) is nn.Linear and (prefixes is None or name.startswith(prefixes))
+    }
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    prefixes = QUANTIZE_TARGETS.get(type(model))
+    names = quantizable_linear_names(model, prefixes)
+    if not names:
+        raise ValueError(f"No quantizable Linear layers in {type(model).__name__}")
+
+    quantized = torch.ao.quantization.quantize_dynamic(
+        copy.deepcopy(model).cpu().eval(), names, dtype=torch.qint8
+    )
+
+    _disable_encoder_fastpath(quantized)
+    return quantized
+
+
+def _torch_version() -> tuple[int, int]:
+    major, minor = torch.__version__.split("+")[0].split(".")[:2]
+    return int(major), int(minor)
+
+
+def _disable_encoder_fastpath(model: nn.Module) -> None:
+    # The fused encoder fast path reads linear weights as tensors, which quantized
+    # Linear modules expose as methods; route those layers through the regular path.
+    layers = [m for m in model.modules() if isinstance(m, nn.TransformerEncoderLayer)]
+    if not layers:
+        return
+
+    low, high = FASTPATH_FLAG_TORCH_VERSIONS
+    if low <= _torch_version() <= high and all(hasattr(m, "activation_relu_or_gelu") for m in layers):
+        for module in layers:
+            module.activation_relu_or_gelu = False
+        return
+
+    log.warning(
+        "Disabling the transformer fast path process-wide for quantized encoder",
+        torch_version=torch.__version__,
+    )
+    torch.backends.mha.set_fastpath_enabled(False)
+
+
+def _flatten_outputs(outputs) -> list[torch.Tensor]:
+    if isinstance(outputs, torch.Tensor):
+        return [outputs]
+    if isinstance(outputs, dict):
+        return [outputs[k] for k in sorted(outputs)]
+    return list(outputs)
+
+
+def compare_outputs(
+    reference: nn.Module,
+    candidate: nn.Module,
+    inputs: tuple[torch.Tensor, ...],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> QuantizationReport:
+    with torch.inference_mode():
+        expected = np.concatenate([o.numpy().ravel() for o in _flatten_outputs(reference(*inputs))])
+        actual = np.concatenate([o.numpy().ravel() for o in _flatten_outputs(candidate(*inputs))])
+
+    diff = np.abs(expected - actual)
+    scale = max(float(np.abs(expected).mean()), 1e-8)
+    return QuantizationReport(
+        max_abs_diff=float(diff.max()),
+        mean_abs_diff=float(diff.mean()),
+        relative_error=float(diff.mean()) / scale,
+        tolerance=tolerance,
+    )
+
+
+def quantize_with_check(
+    model: nn.Module,
+    holdout_inputs: tuple[torch.Tensor, ...],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> tuple[nn.Module, QuantizationReport]:
+    model.cpu().eval()
+    quantized = quantize_model(model)
+    report = compare_outputs(model, quantized, holdout_inputs, tolerance)
+
+    if not report.accepted:
+        log.warning(
+            "Quantized model outside tolerance, keeping float weights",
+            model=type(model).__name__,
+            relative_error=round(report.relative_error, 5),
+            tolerance=tolerance,
+        )
+        return model, report
+
+    log.info(
+        "Model quantized to int8",
+        model=type(model).__name__,
+        relative_error=round(report.relative_error, 5),
+        max_abs_diff=round(report.max_abs_diff, 5),
+    )
+    return quantized, report
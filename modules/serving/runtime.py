@@ -0,0 +1,111 @@
+"""
+Lightweight inference runtime - runs exported ONNX artifacts with onnxruntime on CPU.
+
+Nothing here imports torch: the API and Celery workers load artifacts produced by
+modules.serving.export and score with numpy in, numpy out.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import structlog
+
+from modules.clv_churn.models.survival import ChurnPrediction, ChurnScores, summarize_hazard
+
+log = structlog.get_logger()
+
+_INPUT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(int64)": np.int64,
+    "tensor(bool)": np.bool_,
+}
+
+
+class OnnxModel:
+    def __init__(self, path: str | Path, intra_op_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads or min(os.cpu_count() or 1, 4)
+
+        self.path = Path(path)
+        self.session = ort.InferenceSession(
+            str(path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.inputs = [(i.name, _INPUT_DTYPES.get(i.type, np.float32)) for i in self.session.get_inputs()]
+        self.output_names = [o.name for o in self.session.get_outputs()]
+
+    def run(self, *args: np.ndarray, **kwargs: np.ndarray) -> dict[str, np.ndarray]:
+        feeds = dict(zip((name for name, _ in self.inputs), args))
+        feeds.update(kwargs)
+        feeds = {
+            name: np.ascontiguousarray(feeds[name], dtype=dtype)
+            for name, dtype in self.inputs
+        }
+        outputs = self.session.run(self.output_names, feeds)
+        return dict(zip(self.output_names, outputs))
+
+
+def load_onnx_model(path: str | Path, intra_op_threads: Optional[int] = None) -> Optional[OnnxModel]:
+    if not Path(path).exists():
+        return None
+    try:
+        return OnnxModel(path, intra_op_threads=intra_op_threads)
+    except ImportError:
+        log.warning("onnxruntime not installed, ONNX artifact ignored", path=str(path))
+        return None
+
+
+class OnnxChurnModel:
+    """Drop-in for DeepChurnModel.score_batch / predict_churn backed by an ONNX artifact."""
+
+    def __init__(self, model: OnnxModel):
+        self.model = model
+
+    def score_batch(
+        self,
+        features: np.ndarray,
+        days_per_bin: int = 30,
+        batch_size: int = 8192,
+    ) -> ChurnScores:
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        hazard = np.concatenate([
+            self.model.run(features[start : start + batch_size])["hazard"]
+            for start in range(0, len(features), batch_size)
+        ])
+        return summarize_hazard(hazard, days_per_bin=days_per_bin)
+
+    def predict_churn(
+        self,
+        feature_vector: np.ndarray,
+        customer_id: str,
+        days_per_bin: int = 30,
+    ) -> ChurnPrediction:
+        scores = self.score_batch(feature_vector.reshape(1, -1), days_per_bin=days_per_bin)
+        return scores.prediction(0, customer_id)
+
+
+class OnnxCampaignPredictor:
+    """Drop-in for MultiTaskPerformancePredictor.predict_batch backed by an ONNX artifact."""
+
+    def __init__(self, model: OnnxModel):
+        self.model = model
+
+    def predict_batch(
+        self,
+        text_embeddings: np.ndarray,
+        structured_features: np.ndarray,
+        batch_size: int = 1024,
+    ) -> dict[str, np.ndarray]:
+        chunks = [
+            self.model.run(
+                text_embeddings[start : start + batch_size],
+                structured_features[start : start + batch_size],
+            )
+            for start in range(0, len(text_embeddings), batch_size)
+        ]
+        return {name: np.concatenate([c[name] for c in chunks]) for name in self.model.output_names}
@@ -29,6 +29,16 @@ class Settings(BaseSettings):
     KAFKA_TOPIC_EVENTS: str = "aima.events"
     KAFKA_TOPIC_ALERTS: str = "aima.alerts"
 
+    MENTION_SOURCE: str = "kafka"
+    MENTION_SOURCE_FILE: str = "data/mentions/mentions.jsonl"
+    MENTION_CONSUMER_GROUP: str = "aima-brand-sentiment"
+    MENTION_BATCH_SIZE: int = 256
+    MENTION_DRAIN_SECONDS: float = 600.0
+    SENTIMENT_ALERT_Z_THRESHOLD: float = 3.0
+    SENTIMENT_ALERT_MIN_MENTIONS: int = 10
+    SENTIMENT_BASELINE_DAYS: int = 28
+    SEGMENT_DRIFT_LOOKBACK_DAYS: int = 1
+
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
@@ -40,6 +50,21 @@ class Settings(BaseSettings):
     MLFLOW_TRACKING_URI: str = "http://localhost:5000"
     MLFLOW_EXPERIMENT_NAME: str = "aima-experiments"
 
+    MODEL_DIR: str = "data/models"
+    INFERENCE_BACKEND: str = "onnx"
+    INFERENCE_QUANTIZE: bool = False
+    INFERENCE_QUANTIZE_TOLERANCE: float = 0.02
+    INFERENCE_THREADS: int = 2
+    INFERENCE_MAX_BATCH_SIZE: int = 256
+    INFERENCE_MAX_WAIT_MS: float = 5.0
+    ABSA_MODEL_PATH: str = ""
+
+    # Must match the encoder the campaign predictor was trained with; "hashing-bow"
+    # serves a model trained on hashed bag-of-words embeddings.
+    TEXT_ENCODER_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
+    EMBEDDING_CACHE_PATH: str = "data/cache/text_embeddings.npz"
+    EMBEDDING_CACHE_SIZE: int = 50_000
+
     OPENAI_API_KEY: str = ""
     HUGGINGFACE_TOKEN: str = ""
 
@@ -0,0 +1,265 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import structlog
+
+from platform.api.config import settings
+from modules.serving.batcher import MicroBatcher, split_outputs
+
+log = structlog.get_logger()
+
+CHURN_MODEL_FILE = "churn_predictor_best.pt"
+CHURN_ONNX_FILE = "churn_predictor.onnx"
+CHURN_HOLDOUT_FILE = "churn_predictor_holdout.npy"
+CHURN_DAYS_PER_BIN = 30
+TBT_MODEL_FILE = "tbt_model.pt"
+CAMPAIGN_HOLDOUT_FILE = "campaign_predictor_holdout.npz"
+CAMPAIGN_HOLDOUT_KEYS = ("text_emb", "structured")
+TBT_HOLDOUT_FILE = "tbt_model_holdout.npz"
+TBT_HOLDOUT_KEYS = ("event_types", "numerical_features", "padding_mask")
+
+_lock = threading.RLock()
+_campaign_scorer = None
+_campaign_scorer_loaded = False
+_variant_search_engine = None
+_batchers: dict[str, Optional[MicroBatcher]] = {}
+_executor = ThreadPoolExecutor(
+    max_workers=settings.INFERENCE_THREADS, thread_name_prefix="inference"
+)
+
+
+def get_campaign_scorer():
+    global _campaign_scorer, _campaign_scorer_loaded
+    if _campaign_scorer_loaded:
+        return _campaign_scorer
+    with _lock:
+        if not _campaign_scorer_loaded:
+            _campaign_scorer = _load_campaign_scorer()
+            _campaign_scorer_loaded = True
+    return _campaign_scorer
+
+
+def _load_campaign_scorer():
+    from modules.campaign_predictor.features.embeddings import EmbeddingCache, TextEmbedder
+    from modules.campaign_predictor.models.scorer import CampaignScorer, load_campaign_model
+
+    # int8 quantization is applied to the torch checkpoint, so opting in bypasses ONNX.
+    backend = "torch" if settings.INFERENCE_QUANTIZE else settings.INFERENCE_BACKEND
+    model = load_campaign_model(settings.MODEL_DIR, backend=backend)
+    if model is None:
+        log.warning("Campaign predictor checkpoint missing", model_dir=settings.MODEL_DIR)
+        return None
+    if settings.INFERENCE_QUANTIZE:
+        model = _quantize(model, CAMPAIGN_HOLDOUT_FILE, CAMPAIGN_HOLDOUT_KEYS)
+
+    cache = EmbeddingCache(
+        max_entries=settings.EMBEDDING_CACHE_SIZE,
+        path=settings.EMBEDDING_CACHE_PATH or None,
+    )
+    embedder = TextEmbedder(model_name=settings.TEXT_ENCODER_MODEL, cache=cache)
+    embedder.load()
+    # Hashed bag-of-words vectors are only meaningful to a model trained on them; a
+    # checkpoint trained with a sentence encoder is not served without that encoder.
+    if embedder.encoder_id != settings.TEXT_ENCODER_MODEL:
+        log.error(
+            "Campaign predictor text encoder unavailable",
+            encoder=settings.TEXT_ENCODER_MODEL,
+            fallback=embedder.encoder_id,
+        )
+        return None
+    return CampaignScorer(model, embedder)
+
+
+def get_variant_search_engine():
+    global _variant_search_engine
+    scorer = get_campaign_scorer()
+    if scorer is None:
+        return None
+    with _lock:
+        if _variant_search_engine is None:
+            from modules.content_studio.generators.variant_search import VariantSearchEngine
+            _variant_search_engine = VariantSearchEngine(scorer)
+    return _variant_search_engine
+
+
+def _quantize(model, holdout_file: str, keys: tuple[str, ...]):
+    holdout_path = Path(settings.MODEL_DIR) / holdout_file
+    if not holdout_path.exists():
+        log.warning(
+            "Holdout set missing, skipping quantization",
+            model=type(model).__name__,
+            path=str(holdout_path),
+        )
+        return model
+
+    import numpy as np
+    import torch
+    from modules.serving.quantize import quantize_with_check
+
+    with np.load(holdout_path) as arrays:
+        holdout = tuple(torch.from_numpy(arrays[key]) for key in keys)
+    model, _ = quantize_with_check(
+        model, holdout, tolerance=settings.INFERENCE_QUANTIZE_TOLERANCE
+    )
+    return model
+
+
+@lru_cache(maxsize=1)
+def load_churn_model():
+    model_dir = Path(settings.MODEL_DIR)
+    # int8 quantization is applied to the torch checkpoint, so opting in bypasses ONNX.
+    if settings.INFERENCE_BACKEND == "onnx" and not settings.INFERENCE_QUANTIZE:
+        from modules.serving.runtime import OnnxChurnModel, load_onnx_model
+
+        onnx_model = load_onnx_model(model_dir / CHURN_ONNX_FILE)
+        if onnx_model is not None:
+            log.info("Churn model loaded", backend="onnx", path=str(onnx_model.path))
+            return OnnxChurnModel(onnx_model)
+
+    path = model_dir / CHURN_MODEL_FILE
+    if not path.exists():
+        return None
+
+    import torch
+    from modules.clv_churn.models.churn_predictor import DeepChurnModel
+
+    model = DeepChurnModel()
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    model.eval()
+
+    if settings.INFERENCE_QUANTIZE:
+        holdout_path = model_dir / CHURN_HOLDOUT_FILE
+        if holdout_path.exists():
+            import numpy as np
+            from modules.serving.quantize import quantize_with_check
+
+            holdout = torch.from_numpy(np.load(holdout_path).astype(np.float32))
+            model, _ = quantize_with_check(
+                model, (holdout,), tolerance=settings.INFERENCE_QUANTIZE_TOLERANCE
+            )
+        else:
+            log.warning("Churn holdout set missing, skipping quantization", path=str(holdout_path))
+
+    log.info("Churn model loaded", backend="torch", path=str(path))
+    return model
+
+
+def churn_feature_query(org_id: Optional[str], customer_id: Optional[str] = None):
+    from sqlalchemy import text
+    from platform.api.models import CustomerFeatures
+    from modules.customer_intelligence.features.engineer import NUMERIC_FEATURE_FIELDS
+
+    available = set(CustomerFeatures.__table__.c.keys())
+    columns = ", ".join(
+        f if f in available else f"NULL AS {f}" for f in NUMERIC_FEATURE_FIELDS
+    )
+    filters = []
+    if org_id:
+        filters.append("org_id = :org_id")
+    if customer_id:
+        filters.append("customer_id = :customer_id")
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    return text(
+        f"""
+        SELECT DISTINCT ON (customer_id)
+               org_id, customer_id, {columns}
+        FROM customer_features
+        {where}
+        ORDER BY customer_id, computed_at DESC
+        """
+    )
+
+
+def _campaign_batch_fn():
+    scorer = get_campaign_scorer()
+    if scorer is None:
+        return None
+    return lambda variants: split_outputs(scorer.predict_outputs(variants))
+
+
+def _churn_batch_fn():
+    import numpy as np
+
+    model = load_churn_model()
+    if model is None:
+        return None
+
+    def score(items):
+        customer_ids, features = zip(*items)
+        scores = model.score_batch(np.stack(features), days_per_bin=CHURN_DAYS_PER_BIN)
+        return [scores.prediction(i, cid) for i, cid in enumerate(customer_ids)]
+
+    return score
+
+
+@lru_cache(maxsize=1)
+def load_absa_model():
+    from modules.brand_monitor.models.absa import ABSAModel
+
+    model = ABSAModel(model_path=settings.ABSA_MODEL_PATH or None)
+    # The base checkpoint has an untrained classification head, so the neural path is
+    # only taken for a trained model; otherwise the keyword scorer serves requests.
+    if settings.ABSA_MODEL_PATH:
+        model.load()
+    else:
+        log.info("ABSA_MODEL_PATH not set, using keyword sentiment", backend="keywords")
+    return model
+
+
+def _absa_batch_fn():
+    return load_absa_model().analyze_batch
+
+
+def _tbt_batch_fn():
+    path = Path(settings.MODEL_DIR) / TBT_MODEL_FILE
+    if not path.exists():
+        return None
+
+    import torch
+    from modules.customer_intelligence.models.transformer import TemporalBehavioralTransformer
+
+    model = TemporalBehavioralTransformer()
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    model.eval()
+    if settings.INFERENCE_QUANTIZE:
+        model = _quantize(model, TBT_HOLDOUT_FILE, TBT_HOLDOUT_KEYS)
+    log.info("TBT model loaded", backend="torch", path=str(path))
+    return lambda sequences: list(model.get_fingerprints(sequences))
+
+
+_BATCH_FNS = {
+    "campaign": _campaign_batch_fn,
+    "churn": _churn_batch_fn,
+    "absa": _absa_batch_fn,
+    "tbt": _tbt_batch_fn,
+}
+
+
+def get_batcher(name: str) -> Optional[MicroBatcher]:
+    if name in _batchers:
+        return _batchers[name]
+    with _lock:
+        if name not in _batchers:
+            fn = _BATCH_FNS[name]()
+            _batchers[name] = fn and MicroBatcher(
+                name,
+                fn,
+                max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+                max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+                executor=_executor,
+            )
+    return _batchers[name]
+
+
+async def stop_batchers() -> None:
+    for batcher in list(_batchers.values()):
+        if batcher is not None:
+            await batcher.stop()
+
+
+def persist_inference_caches() -> None:
+    if _campaign_scorer is not None:
+        _campaign_scorer.embedder.cache.save()
@@ -11,6 +11,7 @@ from prometheus_client import make_asgi_app
 
 from platform.api.config import settings
 from platform.api.database import get_engine, Base
+from platform.api.inference import persist_inference_caches, stop_batchers
 from platform.api.routers import (
     health,
     connectors,
@@ -63,11 +64,69 @@ CREATE TABLE IF NOT EXISTS brand_mentions (
     sentiment_pricing NUMERIC(5, 4),
     sentiment_brand_trust NUMERIC(5, 4),
     sentiment_innovation NUMERIC(5, 4),
+    sentiment_sustainability NUMERIC(5, 4),
+    sentiment_ux NUMERIC(5, 4),
+    sentiment_delivery NUMERIC(5, 4),
+    sentiment_brand_personality NUMERIC(5, 4),
+    sentiment_competitive_position NUMERIC(5, 4),
     is_competitor BOOLEAN DEFAULT false,
     mentioned_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     ingested_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS sentiment_sustainability NUMERIC(5, 4);
+ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS sentiment_ux NUMERIC(5, 4);
+ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS sentiment_delivery NUMERIC(5, 4);
+ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS sentiment_brand_personality NUMERIC(5, 4);
+ALTER TABLE brand_mentions ADD COLUMN IF NOT EXISTS sentiment_competitive_position NUMERIC(5, 4);
+
+CREATE TABLE IF NOT EXISTS brand_mention_sources (
+    org_id UUID NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    source_id VARCHAR(500) NOT NULL,
+    first_seen_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (org_id, source, source_id)
+);
+
+CREATE TABLE IF NOT EXISTS brand_sentiment_hourly (
+    org_id UUID NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    mentions INTEGER NOT NULL DEFAULT 0,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    scored INTEGER NOT NULL DEFAULT 0,
+    sentiment_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_product_quality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_customer_service_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_pricing_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_brand_trust_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_innovation_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_sustainability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_ux_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_delivery_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_brand_personality_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    sentiment_competitive_position_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (org_id, bucket, source)
+);
+
+CREATE TABLE IF NOT EXISTS segment_transition_models (
+    org_id UUID PRIMARY KEY,
+    counts BYTEA NOT NULL,
+    last_assigned_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS connector_sync_state (
+    connector_id UUID NOT NULL,
+    resource VARCHAR(50) NOT NULL,
+    high_water_mark TIMESTAMPTZ,
+    cursor JSONB,
+    run_started_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (connector_id, resource)
+);
+
 CREATE TABLE IF NOT EXISTS attribution_touchpoints (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     org_id UUID NOT NULL,
@@ -84,6 +143,65 @@ CREATE TABLE IF NOT EXISTS attribution_touchpoints (
     ingested_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+CREATE INDEX IF NOT EXISTS ix_attribution_touchpoints_org_customer_occurred
+    ON attribution_touchpoints (org_id, customer_id, occurred_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_attribution_touchpoints_org_occurred
+    ON attribution_touchpoints (org_id, occurred_at, id);
+
+CREATE TABLE IF NOT EXISTS churn_predictions (
+    id UUID DEFAULT gen_random_uuid(),
+    org_id UUID NOT NULL,
+    customer_id UUID NOT NULL,
+    churn_probability_30d NUMERIC(5, 4),
+    churn_probability_60d NUMERIC(5, 4),
+    churn_probability_90d NUMERIC(5, 4),
+    survival_curve REAL[],
+    predicted_days_to_churn REAL,
+    risk_level VARCHAR(20),
+    predicted_ltv NUMERIC(12, 2),
+    recommended_intervention VARCHAR(100),
+    intervention_expected_impact JSONB,
+    model_version VARCHAR(50),
+    predicted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS ix_churn_predictions_org_customer_predicted
+    ON churn_predictions (org_id, customer_id, predicted_at DESC);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS churn_predictions_latest AS
+SELECT DISTINCT ON (customer_id)
+    org_id, customer_id,
+    churn_probability_30d, churn_probability_60d, churn_probability_90d,
+    predicted_days_to_churn, risk_level, predicted_ltv,
+    recommended_intervention, model_version, predicted_at
+FROM churn_predictions
+ORDER BY customer_id, predicted_at DESC;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_predictions_latest_customer
+    ON churn_predictions_latest (customer_id);
+
+CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_risk
+    ON churn_predictions_latest (org_id, risk_level, churn_probability_30d DESC);
+
+CREATE INDEX IF NOT EXISTS ix_churn_predictions_latest_org_ltv
+    ON churn_predictions_latest (org_id, predicted_ltv DESC);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS churn_risk_summary AS
+SELECT
+    org_id,
+    CASE WHEN GROUPING(risk_level) = 1 THEN 'all' ELSE COALESCE(risk_level, 'unknown') END AS risk_bucket,
+    COUNT(*) AS customers,
+    SUM(predicted_ltv) AS total_ltv,
+    AVG(predicted_ltv) AS avg_ltv,
+    percentile_cont(0.5) WITHIN GROUP (ORDER BY predicted_ltv) AS median_ltv,
+    AVG(churn_probability_30d) AS avg_churn_probability_30d
+FROM churn_predictions_latest
+GROUP BY GROUPING SETS ((org_id, risk_level), (org_id));
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_churn_risk_summary_org_bucket
+    ON churn_risk_summary (org_id, risk_bucket);
+
 CREATE TABLE IF NOT EXISTS customer_events (
     id UUID DEFAULT gen_random_uuid(),
     org_id UUID NOT NULL,
@@ -94,6 +212,22 @@ CREATE TABLE IF NOT EXISTS customer_events (
     occurred_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     ingested_at TIMESTAMPTZ DEFAULT NOW()
 );
+
+-- The sink merges customer properties with ||, which json (the old ORM type) lacks.
+ALTER TABLE customers ALTER COLUMN properties TYPE jsonb USING properties::jsonb;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS connector_id UUID;
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS discount_total NUMERIC(12, 2) DEFAULT 0;
+ALTER TABLE customer_events ADD COLUMN IF NOT EXISTS connector_id UUID;
+ALTER TABLE customer_events ADD COLUMN IF NOT EXISTS external_id VARCHAR(255);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_customers_org_connector_external
+    ON customers (org_id, connector_id, external_id);
+
+CREATE INDEX IF NOT EXISTS ix_orders_org_connector_external
+    ON orders (org_id, connector_id, external_id);
+
+CREATE INDEX IF NOT EXISTS ix_customer_events_org_connector_external
+    ON customer_events (org_id, connector_id, external_id);
 """
 
 
@@ -135,6 +269,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     yield
     log.info("AIMA API shutting down")
+    await stop_batchers()
+    persist_inference_caches()
     await get_engine().dispose()
 
 
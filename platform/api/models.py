@@ -2,7 +2,7 @@ from sqlalchemy import (
     Boolean, Column, DateTime, Enum, Float, ForeignKey,
     Integer, JSON, Numeric, String, Text, ARRAY, func
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship, Mapped
 import uuid
 import enum
@@ -106,7 +106,7 @@ class Customer(Base, TimestampMixin):
     city = Column(String(100))
     timezone = Column(String(50))
     tags = Column(ARRAY(String))
-    properties = Column(JSON, default=dict)
+    properties = Column(JSONB, default=dict)
 
     organization: Mapped["Organization"] = relationship("Organization", back_populates="customers")
     features: Mapped[list["CustomerFeatures"]] = relationship("CustomerFeatures", back_populates="customer")
@@ -249,7 +249,7 @@ class Alert(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     org_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
     alert_type = Column(String(100), nullable=False)
-    severity = Column(Enum(AlertSeverity), default=AlertSeverity.medium)
+    severity = Column(Enum(AlertSeverity, name="alert_severity"), default=AlertSeverity.medium)
     title = Column(String(500), nullable=False)
     message = Column(Text)
     data = Column(JSON, default=dict)
@@ -1,84 +1,182 @@
+import base64
+import json
 import uuid
 
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from typing import Optional
+from sqlalchemy import TextClause, text
+from typing import AsyncIterator, Optional
 from datetime import datetime, timedelta
 
-from ..database import get_db
+from ..database import get_db, get_session_factory
 
 router = APIRouter(prefix="/attribution", tags=["attribution"])
 
 CHANNELS = ["email", "sms", "paid_search", "paid_social", "organic", "direct", "referral"]
 
+EXPORT_FETCH_SIZE = 1000
+
+_TOUCHPOINT_COLUMNS = """
+    id, customer_id, channel, campaign_id,
+    attribution_credit_aima,
+    touchpoint_data,
+    occurred_at
+"""
+
+
+def encode_cursor(occurred_at: datetime, row_id: uuid.UUID, since: Optional[datetime] = None) -> str:
+    # The window start travels with the cursor so later pages keep the first page's bounds.
+    values = [occurred_at.isoformat(), str(row_id)]
+    if since is not None:
+        values.append(since.isoformat())
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, Optional[datetime]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        occurred_at, row_id, *since = json.loads(base64.urlsafe_b64decode(padded))
+        if len(since) > 1:
+            raise ValueError("unexpected cursor fields")
+        return (
+            datetime.fromisoformat(occurred_at),
+            uuid.UUID(row_id),
+            datetime.fromisoformat(since[0]) if since else None,
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _serialize_touchpoint(row, customer_id: Optional[str] = None) -> dict:
+    touchpoint_data = row.touchpoint_data or {}
+    return {
+        "id": str(row.id),
+        "customer_id": str(row.customer_id) if row.customer_id else (customer_id or "all"),
+        "channel": row.channel or "unknown",
+        "campaign_id": str(row.campaign_id) if row.campaign_id else None,
+        "event_type": touchpoint_data.get("event_type", "interaction"),
+        "revenue_attributed": round(float(touchpoint_data.get("revenue") or 0), 2),
+        "attribution_weight": round(float(row.attribution_credit_aima or 0), 4),
+        "touched_at": row.occurred_at.isoformat() if row.occurred_at else None,
+    }
+
+
+def _touchpoint_query(
+    params: dict,
+    customer_id: Optional[uuid.UUID],
+    since: Optional[datetime],
+    cursor: Optional[str],
+    ascending: bool,
+    limit: Optional[int],
+) -> TextClause:
+    conditions = ["org_id = :org_id"]
+    if customer_id is not None:
+        conditions.append("customer_id = :customer_id")
+        params["customer_id"] = customer_id
+    if since is not None:
+        conditions.append("occurred_at >= :since")
+        params["since"] = since
+    if cursor:
+        params["cursor_at"], params["cursor_id"], _ = decode_cursor(cursor)
+        op = ">" if ascending else "<"
+        conditions.append(f"(occurred_at, id) {op} (:cursor_at, :cursor_id)")
+    direction = "ASC" if ascending else "DESC"
+    sql = f"""
+        SELECT {_TOUCHPOINT_COLUMNS}
+        FROM attribution_touchpoints
+        WHERE {" AND ".join(conditions)}
+        ORDER BY occurred_at {direction}, id {direction}
+    """
+    if limit is not None:
+        sql += "\nLIMIT :limit"
+        params["limit"] = limit
+    return text(sql)
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    org_uuid: uuid.UUID,
+    customer_uuid: Optional[uuid.UUID],
+    since: Optional[datetime],
+    cursor: Optional[str],
+    ascending: bool,
+    limit: int,
+) -> tuple[list, Optional[str]]:
+    if cursor:
+        since = decode_cursor(cursor)[2]
+    params: dict = {"org_id": org_uuid}
+    query = _touchpoint_query(params, customer_uuid, since, cursor, ascending, limit + 1)
+    rows = (await db.execute(query, params)).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id, since)
+    return rows, next_cursor
+
+
+async def _stream_ndjson(
+    org_uuid: uuid.UUID,
+    customer_uuid: Optional[uuid.UUID],
+    since: Optional[datetime],
+    ascending: bool,
+) -> AsyncIterator[bytes]:
+    params: dict = {"org_id": org_uuid}
+    query = _touchpoint_query(params, customer_uuid, since, None, ascending, None)
+    async with get_session_factory()() as session:
+        result = await session.stream(
+            query.execution_options(yield_per=EXPORT_FETCH_SIZE), params
+        )
+        async for partition in result.partitions(EXPORT_FETCH_SIZE):
+            yield "".join(
+                json.dumps(_serialize_touchpoint(row)) + "\n" for row in partition
+            ).encode()
+
 
 @router.get("/touchpoints")
 async def get_touchpoints(
     org_id: str = Query(...),
     customer_id: Optional[str] = Query(None),
     days: int = Query(30),
-    limit: int = Query(100),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
 ):
     try:
         org_uuid = uuid.UUID(org_id)
+        customer_uuid = uuid.UUID(customer_id) if customer_id else None
     except ValueError:
-        return {"touchpoints": [], "total": 0}
+        return {"touchpoints": [], "total": 0, "next_cursor": None}
     since = datetime.utcnow() - timedelta(days=days)
-    params: dict = {"org_id": org_uuid, "since": since, "limit": limit}
-    if customer_id:
-        try:
-            params["customer_id"] = uuid.UUID(customer_id)
-        except ValueError:
-            return {"touchpoints": [], "total": 0}
-        query = text(
-            """
-            SELECT id, customer_id, channel, campaign_id,
-                   attribution_credit_aima,
-                   touchpoint_data,
-                   occurred_at
-            FROM attribution_touchpoints
-            WHERE org_id = :org_id AND occurred_at >= :since AND customer_id = :customer_id
-            ORDER BY occurred_at DESC
-            LIMIT :limit
-            """
-        )
-    else:
-        query = text(
-            """
-            SELECT id, customer_id, channel, campaign_id,
-                   attribution_credit_aima,
-                   touchpoint_data,
-                   occurred_at
-            FROM attribution_touchpoints
-            WHERE org_id = :org_id AND occurred_at >= :since
-            ORDER BY occurred_at DESC
-            LIMIT :limit
-            """
-        )
-    result = await db.execute(query, params)
-    rows = result.fetchall()
+    rows, next_cursor = await _fetch_page(
+        db, org_uuid, customer_uuid, since, cursor, ascending=False, limit=limit
+    )
     return {
-        "touchpoints": [
-            {
-                "id": str(row.id),
-                "customer_id": str(row.customer_id) if row.customer_id else (customer_id or "all"),
-                "channel": row.channel or CHANNELS[hash(str(row.id)) % len(CHANNELS)],
-                "campaign_id": str(row.campaign_id) if row.campaign_id else None,
-                "event_type": "interaction",
-                "revenue_attributed": round(
-                    float((row.touchpoint_data or {}).get("revenue", 50 + hash(str(row.id)) % 200)), 2
-                ),
-                "attribution_weight": round(float(row.attribution_credit_aima or 0), 4),
-                "touched_at": row.occurred_at.isoformat() if row.occurred_at else None,
-            }
-            for row in rows
-        ],
+        "touchpoints": [_serialize_touchpoint(row, customer_id) for row in rows],
         "total": len(rows),
+        "next_cursor": next_cursor,
     }
 
 
+@router.get("/touchpoints/export")
+async def export_touchpoints(
+    org_id: str = Query(...),
+    customer_id: Optional[str] = Query(None),
+    days: int = Query(30),
+):
+    try:
+        org_uuid = uuid.UUID(org_id)
+        customer_uuid = uuid.UUID(customer_id) if customer_id else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid org_id or customer_id")
+    since = datetime.utcnow() - timedelta(days=days)
+    return StreamingResponse(
+        _stream_ndjson(org_uuid, customer_uuid, since, ascending=False),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/channel-performance")
 async def channel_performance(
     org_id: str = Query(...),
@@ -165,41 +263,41 @@ async def budget_optimizer(
 async def customer_journey(
     org_id: str = Query(...),
     customer_id: str = Query(...),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
 ):
     try:
         org_uuid = uuid.UUID(org_id)
         customer_uuid = uuid.UUID(customer_id)
     except ValueError:
-        return {"customer_id": customer_id, "journey_length": 0, "touchpoints": [], "total_revenue": 0}
-    query = text(
-        """
-        SELECT id, channel, campaign_id, attribution_credit_aima, touchpoint_data, occurred_at
-        FROM attribution_touchpoints
-        WHERE org_id = :org_id AND customer_id = :customer_id
-        ORDER BY occurred_at ASC
-        LIMIT 50
-        """
+        return {"customer_id": customer_id, "journey_length": 0, "touchpoints": [], "total_revenue": 0, "next_cursor": None}
+    rows, next_cursor = await _fetch_page(
+        db, org_uuid, customer_uuid, None, cursor, ascending=True, limit=limit
     )
-    result = await db.execute(query, {"org_id": org_uuid, "customer_id": customer_uuid})
-    rows = result.fetchall()
-
-    journey = [
-        {
-            "channel": row.channel or CHANNELS[idx % len(CHANNELS)],
-            "event_type": "interaction",
-            "revenue_attributed": round(
-                float((row.touchpoint_data or {}).get("revenue", 100 + hash(str(row.id)) % 300)), 2
-            ),
-            "attribution_weight": round(float(row.attribution_credit_aima or 0), 4),
-            "touched_at": row.occurred_at.isoformat() if row.occurred_at else None,
-        }
-        for idx, row in enumerate(rows)
-    ]
+
+    journey = [_serialize_touchpoint(row, customer_id) for row in rows]
 
     return {
         "customer_id": customer_id,
         "journey_length": len(journey),
         "touchpoints": journey,
-        "total_revenue": sum(t["revenue_attributed"] for t in journey),
+        "total_revenue": round(sum(t["revenue_attributed"] for t in journey), 2),
+        "next_cursor": next_cursor,
     }
+
+
+@router.get("/customer-journey/export")
+async def export_customer_journey(
+    org_id: str = Query(...),
+    customer_id: str = Query(...),
+):
+    try:
+        org_uuid = uuid.UUID(org_id)
+        customer_uuid = uuid.UUID(customer_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid org_id or customer_id")
+    return StreamingResponse(
+        _stream_ndjson(org_uuid, customer_uuid, None, ascending=True),
+        media_type="application/x-ndjson",
+    )
@@ -1,21 +1,20 @@
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text, func
 from typing import Optional
 from datetime import datetime, timedelta
 
 from ..database import get_db
+from ..inference import get_batcher
+from modules.brand_monitor.ingest import DIMENSION_COLUMNS
+from modules.brand_monitor.models.absa import BRAND_DIMENSIONS
+from modules.brand_monitor.models.keywords import KEYWORD_MATCHER
 
 router = APIRouter(prefix="/brand", tags=["brand_monitor"])
 
-BRAND_DIMENSIONS = [
-    "product_quality", "customer_service", "pricing", "delivery",
-    "user_experience", "brand_values", "innovation", "reliability",
-    "communication", "overall",
-]
-
 
 @router.get("/mentions")
 async def get_brand_mentions(
@@ -80,6 +79,44 @@ async def get_brand_mentions(
     return {"mentions": mentions, "total": len(mentions), "period_days": days}
 
 
+def _window_start(days: int) -> datetime:
+    return (datetime.utcnow() - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+
+
+def _percentages(row) -> dict:
+    total = max(int(row.mentions or 0), 1)
+    positive, negative = int(row.positive or 0), int(row.negative or 0)
+    return {
+        "positive": round(positive / total * 100, 1),
+        "neutral": round((total - positive - negative) / total * 100, 1),
+        "negative": round(negative / total * 100, 1),
+    }
+
+
+async def _sentiment_trend(db: AsyncSession, org_uuid: uuid.UUID, since: datetime, granularity: str) -> list:
+    result = await db.execute(
+        text(
+            f"""
+            SELECT date_trunc('{granularity}', bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' AS period,
+                   SUM(mentions) AS mentions, SUM(positive) AS positive, SUM(negative) AS negative
+            FROM brand_sentiment_hourly
+            WHERE org_id = :org_id AND bucket >= :since
+            GROUP BY period
+            ORDER BY period
+            """
+        ),
+        {"org_id": org_uuid, "since": since},
+    )
+    return [
+        {
+            "date": row.period.date().isoformat() if granularity == "day" else row.period.isoformat(),
+            "mentions": int(row.mentions or 0),
+            **_percentages(row),
+        }
+        for row in result.fetchall()
+    ]
+
+
 @router.get("/sentiment/summary")
 async def sentiment_summary(
     org_id: str = Query(...),
@@ -89,39 +126,61 @@ async def sentiment_summary(
     try:
         org_uuid = uuid.UUID(org_id)
     except ValueError:
-        return {"period_days": days, "total_mentions": 0, "sentiment_score": 0.0, "breakdown": {"positive": 0, "negative": 0, "neutral": 0}, "by_source": {}, "dimensions": {dim: 0.5 for dim in BRAND_DIMENSIONS}}
-    since = datetime.utcnow() - timedelta(days=days)
+        return {"period_days": days, "total_mentions": 0, "sentiment_score": 0.0, "breakdown": {"positive": 0, "negative": 0, "neutral": 0}, "by_source": {}, "dimensions": {dim: {"score": 0.5, "trend": "stable"} for dim in BRAND_DIMENSIONS}, "sentiment_trend": []}
+    since = _window_start(days)
+    previous_since = since - timedelta(days=days)
 
+    # Hourly rollups keep this exact for any window while reading at most 24 rows per
+    # source per day, however many mentions were ingested.
     query = text(
-        """
+        f"""
         SELECT
             source,
-            COUNT(*) AS total_mentions,
-            AVG(sentiment_overall) AS avg_sentiment
-        FROM brand_mentions
-        WHERE org_id = :org_id AND mentioned_at >= :since
-        GROUP BY source
+            bucket >= :since AS in_window,
+            SUM(mentions) AS mentions,
+            SUM(positive) AS positive,
+            SUM(negative) AS negative,
+            SUM(scored) AS scored,
+            SUM(sentiment_sum) AS sentiment_sum,
+            {", ".join(f"SUM({c}_sum) AS {c}_sum" for c in DIMENSION_COLUMNS.values())}
+        FROM brand_sentiment_hourly
+        WHERE org_id = :org_id AND bucket >= :previous_since
+        GROUP BY source, in_window
         """
     )
-    result = await db.execute(query, {"org_id": org_uuid, "since": since})
+    result = await db.execute(query, {"org_id": org_uuid, "since": since, "previous_since": previous_since})
     rows = result.fetchall()
 
     by_source: dict = {}
-    total_mentions = 0
-    total_positive = 0
-    total_negative = 0
+    total_mentions = total_positive = total_negative = 0
+    dim_sums = {True: dict.fromkeys(BRAND_DIMENSIONS, 0.0), False: dict.fromkeys(BRAND_DIMENSIONS, 0.0)}
+    scored = {True: 0, False: 0}
 
     for row in rows:
-        src = row.source or "unknown"
-        count = int(row.total_mentions or 0)
-        avg_sent = float(row.avg_sentiment or 0.0)
-        by_source[src] = {"count": count, "avg_sentiment": round(avg_sent, 4)}
+        for dim, column in DIMENSION_COLUMNS.items():
+            dim_sums[row.in_window][dim] += float(getattr(row, f"{column}_sum") or 0.0)
+        scored[row.in_window] += int(row.scored or 0)
+        if not row.in_window:
+            continue
+        count = int(row.mentions or 0)
+        by_source[row.source or "unknown"] = {
+            "count": count,
+            "avg_sentiment": round(float(row.sentiment_sum or 0.0) / max(int(row.scored or 0), 1), 4),
+        }
         total_mentions += count
-        total_positive += sum(1 for _ in range(count) if avg_sent > 0.1)
-        total_negative += sum(1 for _ in range(count) if avg_sent < -0.1)
+        total_positive += int(row.positive or 0)
+        total_negative += int(row.negative or 0)
+
+    dimensions = {}
+    for dim in BRAND_DIMENSIONS:
+        current = dim_sums[True][dim] / max(scored[True], 1)
+        previous = dim_sums[False][dim] / max(scored[False], 1)
+        delta = current - previous if scored[False] else 0.0
+        dimensions[dim] = {
+            "score": round((current + 1) / 2, 4),
+            "trend": "up" if delta > 0.02 else ("down" if delta < -0.02 else "stable"),
+        }
 
-    total_positive = min(total_positive, total_mentions)
-    total_negative = min(total_negative, total_mentions - total_positive)
     sentiment_score = (total_positive - total_negative) / max(total_mentions, 1) * 100
 
     return {
@@ -134,10 +193,28 @@ async def sentiment_summary(
             "neutral": total_mentions - total_positive - total_negative,
         },
         "by_source": by_source,
-        "dimensions": {dim: round(0.5 + (hash(dim) % 10) / 20, 2) for dim in BRAND_DIMENSIONS},
+        "dimensions": dimensions,
+        "sentiment_trend": await _sentiment_trend(db, org_uuid, since, "day"),
     }
 
 
+@router.get("/sentiment/trend")
+async def sentiment_trend(
+    org_id: str = Query(...),
+    days: int = Query(30),
+    granularity: str = Query("day"),
+    db: AsyncSession = Depends(get_db),
+):
+    if granularity not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    try:
+        org_uuid = uuid.UUID(org_id)
+    except ValueError:
+        return {"period_days": days, "granularity": granularity, "trend": []}
+    trend = await _sentiment_trend(db, org_uuid, _window_start(days), granularity)
+    return {"period_days": days, "granularity": granularity, "trend": trend}
+
+
 @router.get("/alerts")
 async def brand_alerts(
     org_id: str = Query(...),
@@ -174,18 +251,15 @@ async def analyze_text(payload: dict):
     if not text_content:
         raise HTTPException(status_code=400, detail="text is required")
 
-    words = text_content.lower().split()
-    positive_words = {"great", "excellent", "amazing", "love", "best", "good", "fantastic", "wonderful"}
-    negative_words = {"terrible", "awful", "hate", "worst", "bad", "horrible", "poor", "disappointing"}
-
-    pos_count = sum(1 for w in words if w in positive_words)
-    neg_count = sum(1 for w in words if w in negative_words)
-    score = (pos_count - neg_count) / max(len(words), 1)
+    batcher = await run_in_threadpool(get_batcher, "absa")
+    result = await batcher.submit(text_content)
+    score = 2 * result.overall - 1
     label = "positive" if score > 0.02 else ("negative" if score < -0.02 else "neutral")
 
     return {
         "sentiment_score": round(score, 4),
         "sentiment_label": label,
         "confidence": min(abs(score) * 10, 1.0),
-        "aspects": {dim: round(score + (hash(dim) % 100) / 1000, 4) for dim in BRAND_DIMENSIONS},
+        "aspects": {dim: round(2 * v - 1, 4) for dim, v in result.dimensions.items()},
+        "matched_keywords": [m._asdict() for m in KEYWORD_MATCHER.find(text_content)],
     }
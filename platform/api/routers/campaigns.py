@@ -1,15 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 from typing import Optional
 import uuid
 from datetime import datetime, timedelta
+import numpy as np
 
 from ..database import get_db
+from ..inference import get_batcher
 from ..models import Campaign
+from modules.campaign_predictor.features.variant import CampaignVariant
+from modules.campaign_predictor.models.prediction import PREDICTION_TARGETS, prediction_from_outputs
+from modules.serving.batcher import stack_outputs
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
+MAX_VARIANTS = 500
+
 
 @router.get("")
 async def list_campaigns(
@@ -172,3 +180,42 @@ async def create_campaign(
     await db.commit()
     await db.refresh(campaign)
     return {"id": str(campaign.id), "status": "created"}
+
+
+@router.post("/score-variants")
+async def score_variants(payload: dict):
+    variant_payloads = payload.get("variants") or []
+    if not variant_payloads:
+        raise HTTPException(status_code=400, detail="variants is required")
+    if len(variant_payloads) > MAX_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_VARIANTS} variants per request")
+    rank_by = payload.get("rank_by", "open_rate")
+    if rank_by not in PREDICTION_TARGETS:
+        raise HTTPException(status_code=400, detail=f"rank_by must be one of {PREDICTION_TARGETS}")
+
+    base = payload.get("base") or {}
+    if not isinstance(base, dict) or not all(isinstance(v, dict) for v in variant_payloads):
+        raise HTTPException(status_code=400, detail="base and each variant must be objects")
+    try:
+        variants = [CampaignVariant.from_dict({**base, **v}) for v in variant_payloads]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid variant: {e}")
+
+    batcher = await run_in_threadpool(get_batcher, "campaign")
+    if batcher is None:
+        return {"status": "requires_training", "rank_by": rank_by, "variants": []}
+
+    outputs = stack_outputs(await batcher.submit_many(variants))
+    ranked = np.argsort(-outputs[rank_by], kind="stable")
+    return {
+        "status": "scored",
+        "rank_by": rank_by,
+        "variants": [
+            {
+                "index": int(i),
+                **variants[i].to_dict(),
+                "prediction": prediction_from_outputs(outputs, i).to_dict(),
+            }
+            for i in ranked
+        ],
+    }
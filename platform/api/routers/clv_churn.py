@@ -1,76 +1,101 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text, and_
 from typing import Optional
 import uuid
 from datetime import datetime
+import numpy as np
 
 from ..database import get_db
+from ..inference import churn_feature_query, get_batcher
 from ..models import Customer
 
 router = APIRouter(prefix="/clv-churn", tags=["clv_churn"])
 
 
+_EMPTY_SUMMARY = {
+    "total_customers_scored": 0,
+    "at_risk_revenue": 0,
+    "risk_distribution": {"high": 0, "medium": 0, "low": 0},
+    "clv_stats": {"avg": 0, "median": 0, "total": 0},
+}
+
+
 @router.get("/predictions")
 async def get_churn_predictions(
     org_id: str = Query(...),
-    risk_level: Optional[str] = Query(None, description="high, medium, low"),
+    risk_level: Optional[str] = Query(None, description="high, medium, low", pattern="^(high|medium|low)$"),
     min_clv: Optional[float] = Query(None),
     limit: int = Query(50, le=200),
-    offset: int = Query(0),
+    offset: int = Query(0, ge=0),
     db: AsyncSession = Depends(get_db),
 ):
     try:
         org_uuid = uuid.UUID(org_id)
     except ValueError:
         return {"predictions": [], "total": 0, "limit": limit, "offset": offset}
-    stmt = select(Customer).where(Customer.org_id == org_uuid).limit(limit).offset(offset)
-    result = await db.execute(stmt)
-    customers = result.scalars().all()
-
-    predictions = []
-    for c in customers:
-        churn_prob = round((hash(str(c.id)) % 100) / 100, 4)
-        risk = "high" if churn_prob >= 0.7 else "medium" if churn_prob >= 0.4 else "low"
-        
-        if risk_level and risk != risk_level:
-            continue
-            
-        clv = 500 + (hash(str(c.id)) % 5000)
-        if min_clv and clv < min_clv:
-            continue
-
-        predictions.append({
-            "customer_id": str(c.id),
-            "email": c.email or "unknown",
-            "churn_probability_30d": churn_prob,
-            "churn_probability_60d": round(churn_prob * 0.8, 4),
-            "churn_probability_90d": round(churn_prob * 0.6, 4),
-            "predicted_clv": round(clv, 2),
-            "risk_level": risk,
-            "recommended_intervention": _get_intervention(churn_prob),
-        })
+
+    params: dict = {"org_id": org_uuid, "limit": limit, "offset": offset}
+    conditions = "WHERE p.org_id = :org_id"
+    if risk_level:
+        conditions += " AND p.risk_level = :risk_level"
+        params["risk_level"] = risk_level
+    if min_clv is not None:
+        conditions += " AND p.predicted_ltv >= :min_clv"
+        params["min_clv"] = min_clv
+
+    query = text(
+        f"""
+        SELECT p.customer_id, c.email,
+               p.churn_probability_30d, p.churn_probability_60d, p.churn_probability_90d,
+               p.predicted_days_to_churn, p.predicted_ltv, p.risk_level,
+               p.recommended_intervention, p.predicted_at
+        FROM churn_predictions_latest p
+        LEFT JOIN customers c ON c.id = p.customer_id
+        {conditions}
+        ORDER BY p.churn_probability_30d DESC, p.customer_id
+        LIMIT :limit OFFSET :offset
+        """
+    )
+    rows = (await db.execute(query, params)).fetchall()
+
+    if min_clv is None:
+        count_query = text(
+            """
+            SELECT COALESCE(SUM(customers), 0)
+            FROM churn_risk_summary
+            WHERE org_id = :org_id AND risk_bucket = COALESCE(:risk_level, 'all')
+            """
+        )
+        count_params = {"org_id": org_uuid, "risk_level": risk_level}
+    else:
+        count_query = text(f"SELECT COUNT(*) FROM churn_predictions_latest p {conditions}")
+        count_params = {k: v for k, v in params.items() if k not in ("limit", "offset")}
+    total = int((await db.execute(count_query, count_params)).scalar() or 0)
 
     return {
-        "predictions": predictions,
-        "total": len(predictions),
+        "predictions": [
+            {
+                "customer_id": str(row.customer_id),
+                "email": row.email or "unknown",
+                "churn_probability_30d": float(row.churn_probability_30d or 0),
+                "churn_probability_60d": float(row.churn_probability_60d or 0),
+                "churn_probability_90d": float(row.churn_probability_90d or 0),
+                "predicted_days_to_churn": row.predicted_days_to_churn,
+                "predicted_clv": round(float(row.predicted_ltv or 0), 2),
+                "risk_level": row.risk_level,
+                "recommended_intervention": row.recommended_intervention,
+                "predicted_at": row.predicted_at.isoformat() if row.predicted_at else None,
+            }
+            for row in rows
+        ],
+        "total": total,
         "limit": limit,
         "offset": offset,
     }
 
 
-def _get_intervention(churn_prob: float) -> str:
-    if churn_prob >= 0.8:
-        return "immediate_winback_offer"
-    elif churn_prob >= 0.6:
-        return "personalized_discount"
-    elif churn_prob >= 0.4:
-        return "engagement_campaign"
-    elif churn_prob >= 0.2:
-        return "loyalty_reward"
-    return "standard_nurture"
-
-
 @router.get("/summary")
 async def clv_churn_summary(
     org_id: str = Query(...),
@@ -79,47 +104,35 @@ async def clv_churn_summary(
     try:
         org_uuid = uuid.UUID(org_id)
     except ValueError:
-        return {"total_customers_scored": 0, "at_risk_revenue": 0, "avg_clv": 0, "risk_distribution": {"high": 0, "medium": 0, "low": 0}}
-    stmt = select(Customer).where(Customer.org_id == org_uuid)
-    result = await db.execute(stmt)
-    customers = result.scalars().all()
-
-    if not customers:
-        return {
-            "total_customers_scored": 0,
-            "at_risk_revenue": 0,
-            "avg_clv": 0,
-            "risk_distribution": {"high": 0, "medium": 0, "low": 0},
-        }
-
-    high_risk = 0
-    medium_risk = 0
-    low_risk = 0
-    total_clv = 0
-
-    for c in customers:
-        churn_prob = round((hash(str(c.id)) % 100) / 100, 4)
-        clv = 500 + (hash(str(c.id)) % 5000)
-        total_clv += clv
-
-        if churn_prob >= 0.7:
-            high_risk += 1
-        elif churn_prob >= 0.4:
-            medium_risk += 1
-        else:
-            low_risk += 1
+        return _EMPTY_SUMMARY
+    query = text(
+        """
+        SELECT risk_bucket, customers, total_ltv, avg_ltv, median_ltv
+        FROM churn_risk_summary
+        WHERE org_id = :org_id
+        """
+    )
+    rows = {row.risk_bucket: row for row in (await db.execute(query, {"org_id": org_uuid})).fetchall()}
+    overall = rows.get("all")
+    if overall is None:
+        return _EMPTY_SUMMARY
+
+    risk_distribution = {
+        level: int(rows[level].customers) if level in rows else 0
+        for level in ("high", "medium", "low")
+    }
+    at_risk_revenue = sum(
+        float(rows[level].total_ltv or 0) for level in ("high", "medium") if level in rows
+    )
 
     return {
-        "total_customers_scored": len(customers),
-        "risk_distribution": {
-            "high": high_risk,
-            "medium": medium_risk,
-            "low": low_risk,
-        },
+        "total_customers_scored": int(overall.customers),
+        "at_risk_revenue": round(at_risk_revenue, 2),
+        "risk_distribution": risk_distribution,
         "clv_stats": {
-            "avg": round(total_clv / max(len(customers), 1), 2),
-            "median": round(total_clv / 2, 2),
-            "total": round(total_clv, 2),
+            "avg": round(float(overall.avg_ltv or 0), 2),
+            "median": round(float(overall.median_ltv or 0), 2),
+            "total": round(float(overall.total_ltv or 0), 2),
         },
     }
 
@@ -127,7 +140,6 @@ async def clv_churn_summary(
 @router.post("/score")
 async def score_customer(
     payload: dict,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     customer_id = payload.get("customer_id")
@@ -143,10 +155,28 @@ async def score_customer(
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
 
+    batcher = await run_in_threadpool(get_batcher, "churn")
+    if batcher is None:
+        return {"customer_id": customer_id, "status": "requires_training"}
+
+    row = (await db.execute(
+        churn_feature_query(org_id, customer_id),
+        {"org_id": org_id, "customer_id": customer_id},
+    )).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Features not yet computed for this customer")
+
+    features = np.nan_to_num(np.array(row[2:], dtype=np.float64)).astype(np.float32)
+    prediction = await batcher.submit((customer_id, features))
     return {
         "customer_id": customer_id,
-        "status": "queued",
-        "message": "Churn scoring task queued for background processing",
+        "status": "scored",
+        "churn_probability_30d": prediction.churn_probability_30d,
+        "churn_probability_60d": prediction.churn_probability_60d,
+        "churn_probability_90d": prediction.churn_probability_90d,
+        "predicted_days_to_churn": prediction.predicted_days_to_churn,
+        "risk_level": prediction.risk_level,
+        "recommended_intervention": prediction.recommended_intervention,
     }
 
 
@@ -161,9 +191,16 @@ async def at_risk_segments(
         return {"at_risk_segments": []}
     query = text(
         """
-        SELECT id, name
-        FROM customer_segments
-        WHERE org_id = :org_id
+        SELECT s.id, s.name,
+               COUNT(*) AS customer_count,
+               AVG(p.churn_probability_30d) AS avg_churn_probability,
+               COALESCE(SUM(p.predicted_ltv) FILTER (WHERE p.risk_level IN ('high', 'medium')), 0) AS at_risk_clv
+        FROM customer_segments s
+        JOIN customer_segment_memberships m ON m.segment_id = s.id
+        JOIN churn_predictions_latest p ON p.customer_id = m.customer_id
+        WHERE s.org_id = :org_id AND p.org_id = :org_id
+        GROUP BY s.id, s.name
+        ORDER BY avg_churn_probability DESC
         LIMIT 10
         """
     )
@@ -176,9 +213,9 @@ async def at_risk_segments(
                 "segment_id": str(row.id),
                 "segment_name": row.name,
                 "segment_type": "behavioral",
-                "customer_count": 50 + hash(row.name) % 500,
-                "avg_churn_probability": round((hash(row.name) % 100) / 100, 4),
-                "at_risk_clv": round(5000 + hash(row.name) % 50000, 2),
+                "customer_count": int(row.customer_count),
+                "avg_churn_probability": round(float(row.avg_churn_probability or 0), 4),
+                "at_risk_clv": round(float(row.at_risk_clv or 0), 2),
             }
             for row in rows
         ]
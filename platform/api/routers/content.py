@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from ..database import get_db
+from ..inference import get_variant_search_engine
+from modules.campaign_predictor.features.variant import CHANNELS as VARIANT_CHANNELS, CampaignVariant
+from modules.campaign_predictor.models.prediction import PREDICTION_TARGETS
 
 router = APIRouter(prefix="/content", tags=["content_studio"])
 
@@ -89,6 +93,68 @@ def _generate_html(template: dict, brand_name: str) -> str:
 </html>"""
 
 
+@router.post("/optimize/email")
+async def optimize_email(payload: dict):
+    brief = payload.get("brief", "")
+    if not brief or not isinstance(brief, str):
+        raise HTTPException(status_code=400, detail="brief is required and must be a string")
+    body = payload.get("body", brief)
+    offer_type = payload.get("offer_type")
+    if not isinstance(body, str) or not isinstance(offer_type, (str, type(None))):
+        raise HTTPException(status_code=400, detail="body and offer_type must be strings")
+    channel = payload.get("channel", "email")
+    if channel not in VARIANT_CHANNELS:
+        raise HTTPException(status_code=400, detail=f"channel must be one of {VARIANT_CHANNELS}")
+    objective = payload.get("objective", "revenue")
+    if objective not in PREDICTION_TARGETS:
+        raise HTTPException(status_code=400, detail=f"objective must be one of {PREDICTION_TARGETS}")
+    try:
+        top_k = min(int(payload.get("top_k", 5)), 50)
+        latency_budget_ms = min(float(payload.get("latency_budget_ms", 250)), 5000.0)
+        segment_size = int(payload.get("segment_size", 1000))
+        budget = float(payload.get("budget", 0))
+        offer_value = float(payload["offer_value"]) if payload.get("offer_value") is not None else None
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(
+            status_code=400,
+            detail="top_k, latency_budget_ms, segment_size, budget and offer_value must be numbers",
+        )
+    if top_k < 1 or not latency_budget_ms > 0:
+        raise HTTPException(status_code=400, detail="top_k and latency_budget_ms must be positive")
+
+    engine = await run_in_threadpool(get_variant_search_engine)
+    if engine is None:
+        return {"status": "requires_training", "objective": objective, "top_variants": []}
+
+    space = engine.expand(
+        brief=brief,
+        body=body,
+        offer_type=offer_type,
+        offer_value=offer_value,
+        channel=channel,
+        segment_size=segment_size,
+        budget=budget,
+    )
+    baseline = None
+    if payload.get("baseline"):
+        if not isinstance(payload["baseline"], dict):
+            raise HTTPException(status_code=400, detail="baseline must be an object")
+        try:
+            baseline = CampaignVariant.from_dict({"body": space.body, **payload["baseline"]})
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid baseline: {e}")
+
+    result = await run_in_threadpool(
+        engine.search,
+        space,
+        objective=objective,
+        top_k=top_k,
+        latency_budget_ms=latency_budget_ms,
+        baseline=baseline,
+    )
+    return {"status": "ranked", **result.to_dict()}
+
+
 @router.post("/generate/sms")
 async def generate_sms(payload: dict):
     segment_type = payload.get("segment_type", "general")
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from pydantic import BaseModel, EmailStr
@@ -6,10 +7,13 @@ from typing import Optional
 import uuid
 
 from platform.api.database import get_db
+from platform.api.inference import get_batcher
 from platform.api.models import Customer, CustomerFeatures
 
 router = APIRouter(prefix="/customers")
 
+MAX_FINGERPRINT_SEQUENCES = 500
+
 
 class CustomerResponse(BaseModel):
     id: uuid.UUID
@@ -42,6 +46,26 @@ async def list_customers(
     return result.scalars().all()
 
 
+@router.post("/fingerprints")
+async def compute_fingerprints(payload: dict):
+    sequences = payload.get("sequences") or []
+    if not sequences:
+        raise HTTPException(status_code=400, detail="sequences is required")
+    if len(sequences) > MAX_FINGERPRINT_SEQUENCES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_FINGERPRINT_SEQUENCES} sequences per request"
+        )
+    if any(not s.get("event_types") for s in sequences):
+        raise HTTPException(status_code=400, detail="Each sequence needs event_types")
+
+    batcher = await run_in_threadpool(get_batcher, "tbt")
+    if batcher is None:
+        return {"status": "requires_training", "fingerprints": []}
+
+    fingerprints = await batcher.submit_many(sequences)
+    return {"status": "computed", "fingerprints": [f.round(6).tolist() for f in fingerprints]}
+
+
 @router.get("/{customer_id}", response_model=CustomerResponse)
 async def get_customer(
     customer_id: uuid.UUID,
@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+from typing import Optional
+
 import structlog
 from platform.workers.celery_app import celery_app
 
@@ -23,22 +26,220 @@ def recompute_all_features() -> dict:
     return {"status": "scheduled"}
 
 
+CHURN_SCORING_CHUNK = 50_000
+
+_CHURN_INSERT_SQL = """
+    INSERT INTO churn_predictions (
+        org_id, customer_id,
+        churn_probability_30d, churn_probability_60d, churn_probability_90d,
+        survival_curve, predicted_days_to_churn, risk_level, predicted_ltv,
+        recommended_intervention, model_version, predicted_at
+    ) VALUES %s
+"""
+
+_CHURN_REFRESH_SQL = (
+    "REFRESH MATERIALIZED VIEW CONCURRENTLY churn_predictions_latest",
+    "REFRESH MATERIALIZED VIEW CONCURRENTLY churn_risk_summary",
+)
+
+
 @celery_app.task
-def update_churn_predictions() -> dict:
-    log.info("Updating churn predictions for all customers")
-    return {"status": "scheduled"}
+def update_churn_predictions(org_id: Optional[str] = None) -> dict:
+    log.info("Updating churn predictions for all customers", org_id=org_id)
+    import numpy as np
+    from psycopg2.extras import execute_values
+    from sqlalchemy import create_engine
+    from platform.api.config import settings
+    from platform.api.inference import CHURN_DAYS_PER_BIN, churn_feature_query, load_churn_model
+    from modules.customer_intelligence.features.engineer import NUMERIC_FEATURE_FIELDS
+
+    model = load_churn_model()
+    if model is None:
+        log.warning("Churn model checkpoint missing, skipping scoring", model_dir=settings.MODEL_DIR)
+        return {"status": "model_not_trained", "scored": 0}
+
+    monetary_idx = NUMERIC_FEATURE_FIELDS.index("monetary_value")
+    tenure_idx = NUMERIC_FEATURE_FIELDS.index("purchase_tenure_days")
+    predicted_at = datetime.now(timezone.utc)
+    model_version = f"deep-churn-{predicted_at:%Y%m%d}"
+    scored = 0
+
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    writer = engine.raw_connection()
+    try:
+        with engine.connect() as reader:
+            result = reader.execution_options(
+                stream_results=True, yield_per=CHURN_SCORING_CHUNK
+            ).execute(churn_feature_query(org_id), {"org_id": org_id} if org_id else {})
+
+            for rows in result.partitions():
+                features = np.nan_to_num(
+                    np.array([row[2:] for row in rows], dtype=np.float64)
+                ).astype(np.float32)
+                scores = model.score_batch(features, days_per_bin=CHURN_DAYS_PER_BIN)
+
+                daily_value = features[:, monetary_idx] / np.maximum(
+                    features[:, tenure_idx], CHURN_DAYS_PER_BIN
+                )
+                predicted_ltv = daily_value * scores.expected_lifetime_days
+
+                values = [
+                    (
+                        row.org_id,
+                        row.customer_id,
+                        round(float(scores.churn_probability_30d[i]), 4),
+                        round(float(scores.churn_probability_60d[i]), 4),
+                        round(float(scores.churn_probability_90d[i]), 4),
+                        scores.survival[i].round(4).tolist(),
+                        None if np.isnan(scores.predicted_days_to_churn[i])
+                        else float(scores.predicted_days_to_churn[i]),
+                        str(scores.risk_level[i]),
+                        round(float(predicted_ltv[i]), 2),
+                        str(scores.recommended_intervention[i]),
+                        model_version,
+                        predicted_at,
+                    )
+                    for i, row in enumerate(rows)
+                ]
+                with writer.cursor() as cur:
+                    execute_values(cur, _CHURN_INSERT_SQL, values, page_size=5000)
+                writer.commit()
+                scored += len(values)
+                log.info("Churn predictions written", batch=len(values), total=scored)
+
+        with writer.cursor() as cur:
+            for stmt in _CHURN_REFRESH_SQL:
+                cur.execute(stmt)
+        writer.commit()
+    finally:
+        writer.close()
+        engine.dispose()
+
+    return {"status": "completed", "scored": scored, "model_version": model_version}
 
 
 @celery_app.task
 def update_brand_sentiment() -> dict:
-    log.info("Updating brand sentiment from all sources")
-    return {"status": "scheduled"}
+    from sqlalchemy import create_engine
+    from platform.api.config import settings
+    from platform.api.inference import load_absa_model
+    from modules.brand_monitor.anomaly import SentimentAnomalyDetector, load_history
+    from modules.brand_monitor.ingest import MentionPipeline, PostgresMentionWriter, open_mention_source
+
+    log.info("Draining brand mentions", source=settings.MENTION_SOURCE)
+    source = open_mention_source(
+        settings.MENTION_SOURCE,
+        path=settings.MENTION_SOURCE_FILE,
+        topic=settings.KAFKA_TOPIC_EVENTS,
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        group_id=settings.MENTION_CONSUMER_GROUP,
+    )
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    connection = engine.raw_connection()
+    try:
+        detector = SentimentAnomalyDetector(
+            z_threshold=settings.SENTIMENT_ALERT_Z_THRESHOLD,
+            min_mentions=settings.SENTIMENT_ALERT_MIN_MENTIONS,
+        )
+        load_history(connection, detector, days=settings.SENTIMENT_BASELINE_DAYS)
+        writer = PostgresMentionWriter(connection, detector=detector)
+        pipeline = MentionPipeline(
+            source,
+            writer,
+            load_absa_model(),
+            batch_size=settings.MENTION_BATCH_SIZE,
+        )
+        # Bounded below the 15-minute beat interval so consecutive drains do not overlap.
+        stats = pipeline.run(max_seconds=settings.MENTION_DRAIN_SECONDS, idle_timeout_seconds=10)
+    finally:
+        source.close()
+        connection.close()
+        engine.dispose()
+
+    return {"status": "completed", **stats.to_dict(), "alerts": writer.alerts}
+
+
+_SEGMENT_TRANSITIONS_SQL = """
+    SELECT DISTINCT ON (m.customer_id)
+           m.customer_id::text, prev.name, cur.name,
+           prev.avg_health_score, cur.avg_health_score, m.assigned_at
+    FROM customer_segment_memberships m
+    JOIN customer_segments cur ON cur.id = m.segment_id
+    JOIN customer_segments prev ON prev.id = m.previous_segment_id
+    WHERE m.org_id = %(org_id)s AND m.assigned_at >= %(since)s
+    ORDER BY m.customer_id, m.assigned_at DESC
+"""
+
+# Per-org transition models survive between runs in a long-lived worker process.
+_transition_models = None
 
 
 @celery_app.task
-def check_segment_drift() -> dict:
-    log.info("Checking segment drift for all customers")
-    return {"status": "scheduled"}
+def check_segment_drift(org_id: Optional[str] = None) -> dict:
+    global _transition_models
+    log.info("Checking segment drift for all customers", org_id=org_id)
+    from datetime import timedelta
+
+    import numpy as np
+    from sqlalchemy import create_engine
+    from platform.api.config import settings
+    from modules.customer_intelligence.clustering.drift_detector import (
+        CRITICAL,
+        SegmentDriftDetector,
+        encode_segments,
+        write_drift_alerts,
+    )
+    from modules.customer_intelligence.clustering.transitions import TransitionModelStore
+
+    if _transition_models is None:
+        _transition_models = TransitionModelStore()
+    since = datetime.now(timezone.utc) - timedelta(days=settings.SEGMENT_DRIFT_LOOKBACK_DAYS)
+    summary = {"orgs": 0, "scored": 0, "drifting": 0, "critical": 0, "alerts": 0}
+
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cur:
+            if org_id:
+                org_ids = [org_id]
+            else:
+                cur.execute("SELECT DISTINCT org_id::text FROM customer_segment_memberships")
+                org_ids = [row[0] for row in cur.fetchall()]
+
+        for org in org_ids:
+            detector = SegmentDriftDetector(transition_model=_transition_models.get(connection, org))
+            with connection.cursor() as cur:
+                cur.execute(_SEGMENT_TRANSITIONS_SQL, {"org_id": org, "since": since})
+                rows = cur.fetchall()
+            if not rows:
+                continue
+            customer_ids, from_names, to_names, health_before, health_after, assigned_at = zip(*rows)
+            batch = detector.score_transitions(
+                np.array(customer_ids, dtype=object),
+                encode_segments(from_names),
+                encode_segments(to_names),
+                np.array([float(h or 0) for h in health_before]),
+                np.array([float(h or 0) for h in health_after]),
+                list(assigned_at),
+            )
+            with connection.cursor() as cur:
+                alerts = write_drift_alerts(cur, org, batch)
+            critical = int((batch.directions == CRITICAL).sum())
+            log.info(
+                "Segment drift scored",
+                org_id=org, scored=len(rows), drifting=len(batch), critical=critical, alerts=alerts,
+            )
+            summary["orgs"] += 1
+            summary["scored"] += len(rows)
+            summary["drifting"] += len(batch)
+            summary["critical"] += critical
+            summary["alerts"] += alerts
+        connection.commit()
+    finally:
+        connection.close()
+        engine.dispose()
+
+    return {"status": "completed", **summary}
 
 
 @celery_app.task(bind=True, max_retries=2)
@@ -1,21 +1,73 @@
+import importlib
+import json
+
 import structlog
 from platform.workers.celery_app import celery_app
 
 log = structlog.get_logger()
 
 
+def _load_connector(connection, connector_id: str):
+    from data.connectors.base import ConnectorRegistry
+
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT org_id::text, type::text, config, credentials_encrypted FROM connectors WHERE id = %s",
+            (connector_id,),
+        )
+        row = cur.fetchone()
+    connection.commit()
+    if row is None:
+        raise ValueError(f"Connector not found: {connector_id}")
+    org_id, connector_type, config, credentials = row
+    try:
+        importlib.import_module(f"data.connectors.{connector_type}.connector")
+    except ModuleNotFoundError:
+        pass  # get_class reports the unsupported type
+    connector_class = ConnectorRegistry.get_class(connector_type)
+    if isinstance(config, str):
+        config = json.loads(config)
+    return connector_class(org_id, connector_id, config or {}, json.loads(credentials) if credentials else {})
+
+
 @celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
 def sync_connector(self, connector_id: str, org_id: str) -> dict:
     log.info("Syncing connector", connector_id=connector_id)
+    from sqlalchemy import create_engine
+    from platform.api.config import settings
+    from data.connectors.sink import PostgresSink
+    from data.connectors.state import PostgresSyncStateStore
+
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    connection = engine.raw_connection()
     try:
-        from data.connectors.base import ConnectorRegistry
-        connector = ConnectorRegistry.get(connector_id)
-        result = connector.sync()
-        log.info("Connector sync complete", connector_id=connector_id, records=result.get("records"))
-        return result
+        connector = _load_connector(connection, connector_id)
+        sink = PostgresSink(connection, connector.org_id, connector_id)
+        result = connector.sync(sink=sink, state=PostgresSyncStateStore(connection))
     except Exception as exc:
         log.error("Connector sync failed", connector_id=connector_id, error=str(exc))
         raise self.retry(exc=exc)
+    finally:
+        connection.close()
+        engine.dispose()
+
+    throughput = sink.throughput()
+    log.info(
+        "Connector sync complete",
+        connector_id=connector_id,
+        records=result.records_synced,
+        success=result.success,
+        throughput=throughput,
+    )
+    if not result.success:
+        # Checkpoints hold the last written page, so the retry resumes rather than restarts.
+        raise self.retry(exc=RuntimeError("; ".join(result.errors)))
+    return {
+        "status": "completed",
+        "records": result.records_synced,
+        "resources": result.metadata,
+        "throughput": throughput,
+    }
 
 
 @celery_app.task
@@ -0,0 +1,128 @@
+"""
+Inference benchmark: float32 vs dynamic int8 on CPU.
+
+Each (model, variant) pair runs in a fresh process so peak RSS is not shared between
+runs. Reports per-batch latency percentiles, resident memory growth from loading the
+model, and the accuracy delta of the int8 model against float on the same inputs.
+
+Run: python scripts/benchmark_inference.py --models churn tbt --iterations 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+import time
+from pathlib import Path
+
+MODELS = ("churn", "campaign", "tbt")
+CHECKPOINTS = {
+    "churn": "churn_predictor_best.pt",
+    "campaign": "campaign_predictor_best.pt",
+    "tbt": "tbt_model.pt",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark float vs int8 CPU inference")
+    parser.add_argument("--models", nargs="+", default=list(MODELS), choices=MODELS, help="Models to benchmark")
+    parser.add_argument("--batch-size", type=int, default=256, help="Rows per inference call")
+    parser.add_argument("--seq-len", type=int, default=128, help="Event sequence length for the transformer")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed iterations per variant")
+    parser.add_argument("--threads", type=int, default=1, help="torch intra-op threads")
+    parser.add_argument("--model-dir", default="data/models", help="Checkpoint directory (random weights if missing)")
+    return parser.parse_args()
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 1024**2
+
+
+def _build(name: str, model_dir: str, batch_size: int, seq_len: int):
+    import torch
+
+    torch.manual_seed(0)
+    if name == "churn":
+        from modules.clv_churn.models.churn_predictor import DeepChurnModel
+        model = DeepChurnModel()
+        inputs = (torch.randn(batch_size, 33),)
+    elif name == "campaign":
+        from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+        model = MultiTaskPerformancePredictor()
+        inputs = (torch.randn(batch_size, 768), torch.randn(batch_size, 50))
+    else:
+        from modules.customer_intelligence.models.transformer import TemporalBehavioralTransformer
+        model = TemporalBehavioralTransformer()
+        config = model.config
+        inputs = (
+            torch.randint(0, config.n_event_types, (batch_size, seq_len)),
+            torch.randn(batch_size, seq_len, config.n_numerical_features),
+        )
+
+    checkpoint = Path(model_dir) / CHECKPOINTS[name]
+    if checkpoint.exists():
+        model.load_state_dict(torch.load(checkpoint, map_location="cpu"))
+    return model.eval(), inputs
+
+
+def _run_variant(name: str, variant: str, args: argparse.Namespace, queue: mp.Queue) -> None:
+    import numpy as np
+    import torch
+
+    torch.set_num_threads(args.threads)
+    baseline_rss = _rss_mb()
+    model, inputs = _build(name, args.model_dir, args.batch_size, args.seq_len)
+
+    relative_error = None
+    if variant == "int8":
+        from modules.serving.quantize import compare_outputs, quantize_model
+        quantized = quantize_model(model)
+        relative_error = compare_outputs(model, quantized, inputs).relative_error
+        del model
+        model = quantized
+
+    loaded_rss = _rss_mb()
+    timings = []
+    with torch.inference_mode():
+        for _ in range(3):
+            model(*inputs)
+        for _ in range(args.iterations):
+            start = time.perf_counter()
+            model(*inputs)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    queue.put({
+        "model": name,
+        "variant": variant,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "model_rss_mb": loaded_rss - baseline_rss,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "relative_error": relative_error,
+    })
+
+
+def main(args: argparse.Namespace) -> None:
+    ctx = mp.get_context("spawn")
+    results = []
+    for name in args.models:
+        for variant in ("float32", "int8"):
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run_variant, args=(name, variant, args, queue))
+            proc.start()
+            results.append(queue.get())
+            proc.join()
+
+    print(f"\n{'model':<10}{'variant':<10}{'p50 ms':>10}{'p95 ms':>10}{'model MB':>10}{'peak MB':>10}{'rel err':>10}")
+    for r in results:
+        err = "-" if r["relative_error"] is None else f"{r['relative_error']:.4f}"
+        print(
+            f"{r['model']:<10}{r['variant']:<10}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+            f"{r['model_rss_mb']:>10.1f}{r['peak_rss_mb']:>10.1f}{err:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main(parse_args())
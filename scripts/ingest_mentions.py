@@ -0,0 +1,86 @@
+"""
+Continuous brand-mention ingestion.
+
+Runs the Module 4 mention pipeline against the events topic (or a JSONL file) until
+interrupted, keeping brand_mentions.sentiment_* fresh between scheduled drains.
+
+Run: python scripts/ingest_mentions.py --source file --path data/mentions/mentions.jsonl
+     python scripts/ingest_mentions.py --rebuild-rollups-since 2024-01-01
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+
+
+def parse_args() -> argparse.Namespace:
+    from platform.api.config import settings
+
+    parser = argparse.ArgumentParser(description="Stream brand mentions through ABSA into Postgres")
+    parser.add_argument("--source", default=settings.MENTION_SOURCE, choices=["kafka", "file"], help="Where mentions are read from")
+    parser.add_argument("--path", default=settings.MENTION_SOURCE_FILE, help="JSONL file for --source file")
+    parser.add_argument("--batch-size", type=int, default=settings.MENTION_BATCH_SIZE, help="Mentions per scoring batch")
+    parser.add_argument("--max-wait", type=float, default=2.0, help="Seconds before a partial batch is flushed")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="Exit after this many seconds without new records")
+    parser.add_argument("--rebuild-rollups-since", type=datetime.fromisoformat, default=None, help="Recompute hourly sentiment rollups from this time and exit")
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace) -> None:
+    from sqlalchemy import create_engine
+    from platform.api.config import settings
+    from platform.api.inference import load_absa_model
+    from modules.brand_monitor.anomaly import SentimentAnomalyDetector, load_history
+    from modules.brand_monitor.ingest import (
+        MentionPipeline,
+        PostgresMentionWriter,
+        open_mention_source,
+        rebuild_sentiment_rollups,
+    )
+
+    if args.rebuild_rollups_since is not None:
+        engine = create_engine(settings.DATABASE_URL_SYNC)
+        connection = engine.raw_connection()
+        try:
+            rebuild_sentiment_rollups(connection, args.rebuild_rollups_since)
+        finally:
+            connection.close()
+            engine.dispose()
+        return
+
+    source = open_mention_source(
+        args.source,
+        path=args.path,
+        topic=settings.KAFKA_TOPIC_EVENTS,
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        group_id=settings.MENTION_CONSUMER_GROUP,
+    )
+    engine = create_engine(settings.DATABASE_URL_SYNC)
+    connection = engine.raw_connection()
+    # Baselines stay in memory for the life of the process; history only seeds them.
+    detector = SentimentAnomalyDetector(
+        z_threshold=settings.SENTIMENT_ALERT_Z_THRESHOLD,
+        min_mentions=settings.SENTIMENT_ALERT_MIN_MENTIONS,
+    )
+    load_history(connection, detector, days=settings.SENTIMENT_BASELINE_DAYS)
+    pipeline = MentionPipeline(
+        source,
+        PostgresMentionWriter(connection, detector=detector),
+        load_absa_model(),
+        batch_size=args.batch_size,
+        max_wait_seconds=args.max_wait,
+    )
+    try:
+        stats = pipeline.run(idle_timeout_seconds=args.idle_timeout)
+        print(stats.to_dict())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+        connection.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(parse_args())
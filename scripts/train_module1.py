@@ -16,6 +16,8 @@ import mlflow
 
 log = structlog.get_logger()
 
+HOLDOUT_SIZE = 512
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Train Module 1: Customer Intelligence Engine")
@@ -28,6 +30,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--lr", type=float, default=1e-4, help="Learning rate")
     parser.add_argument("--data-dir", default="data/processed", help="Processed data directory")
     parser.add_argument("--output-dir", default="data/models", help="Model output directory")
+    parser.add_argument("--export-formats", nargs="+", default=["onnx", "torchscript"], choices=["onnx", "torchscript"], help="Inference artifacts to export after training")
+    parser.add_argument("--skip-export", action="store_true", help="Skip exporting inference artifacts")
     parser.add_argument("--mlflow-uri", default="http://localhost:5000", help="MLflow tracking URI")
     return parser.parse_args()
 
@@ -95,6 +99,19 @@ def train(args: argparse.Namespace) -> None:
         torch.save(model.state_dict(), model_path)
         mlflow.log_artifact(str(model_path))
 
+        import numpy as np
+        holdout = model._prepare_batch((val_sequences or train_sequences)[:HOLDOUT_SIZE])
+        np.savez(
+            output_dir / "tbt_model_holdout.npz",
+            **{key: tensor.numpy() for key, tensor in zip(("event_types", "numerical_features", "padding_mask"), holdout)},
+        )
+
+        if not args.skip_export:
+            from modules.serving.export import export_model
+            artifacts = export_model(model, output_dir, formats=tuple(args.export_formats))
+            for artifact in artifacts.values():
+                mlflow.log_artifact(str(artifact))
+
         final_loss = metrics["train_loss"][-1] if metrics["train_loss"] else 0
         mlflow.log_metric("final_train_loss", final_loss)
 
@@ -11,6 +11,7 @@ from __future__ import annotations
 import argparse
 import random
 from pathlib import Path
+import numpy as np
 import structlog
 import mlflow
 import torch
@@ -19,6 +20,8 @@ from torch.utils.data import Dataset, DataLoader
 
 log = structlog.get_logger()
 
+HOLDOUT_SIZE = 2048
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Train Module 6: CLV and Churn Predictor")
@@ -28,6 +31,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--lr", type=float, default=5e-4, help="Learning rate")
     parser.add_argument("--time-bins", type=int, default=12, help="Number of survival time bins")
     parser.add_argument("--output-dir", default="data/models", help="Model output directory")
+    parser.add_argument("--export-formats", nargs="+", default=["onnx", "torchscript"], choices=["onnx", "torchscript"], help="Inference artifacts to export after training")
+    parser.add_argument("--skip-export", action="store_true", help="Skip exporting inference artifacts")
     parser.add_argument("--mlflow-uri", default="http://localhost:5000", help="MLflow tracking URI")
     return parser.parse_args()
 
@@ -191,6 +196,16 @@ def train(args: argparse.Namespace) -> None:
         mlflow.log_metric("best_val_loss", best_val_loss)
         mlflow.log_artifact(str(output_dir / "churn_predictor_best.pt"))
 
+        holdout = torch.stack([val_ds[i][0] for i in range(min(len(val_ds), HOLDOUT_SIZE))])
+        np.save(output_dir / "churn_predictor_holdout.npy", holdout.numpy())
+
+        if not args.skip_export:
+            from modules.serving.export import export_model
+            model.load_state_dict(torch.load(output_dir / "churn_predictor_best.pt", map_location=device))
+            artifacts = export_model(model, output_dir, formats=tuple(args.export_formats))
+            for artifact in artifacts.values():
+                mlflow.log_artifact(str(artifact))
+
         log.info("Training complete", run_id=run.info.run_id, best_val_loss=round(best_val_loss, 4))
         print(f"\nBest validation loss: {best_val_loss:.4f}")
         print(f"MLflow run ID: {run.info.run_id}")
@@ -0,0 +1,139 @@
+"""
+Unit tests for the async connector engine, driven through httpx.MockTransport.
+"""
+
+import asyncio
+
+import httpx
+
+from data.connectors.shopify.connector import ShopifyConnector
+
+BASE = "https://shop.example.com/admin/api/2024-04"
+
+
+def shopify_handler(pages: int, log: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        log.append(request.url.path + "?" + request.url.query.decode())
+        resource = request.url.path.rsplit("/", 1)[-1].removesuffix(".json")
+        if resource == "shop":
+            return httpx.Response(200, json={"shop": {"id": 1}})
+        page = int(request.url.params.get("page_info", "0"))
+        headers = {}
+        if page + 1 < pages:
+            headers["Link"] = f'<{BASE}/{resource}.json?limit=250&page_info={page + 1}>; rel="next"'
+        rows = [{"id": page * 10 + i, "total_price": "5.0"} for i in range(3)]
+        return httpx.Response(200, json={resource: rows}, headers=headers)
+
+    return handler
+
+
+def make_connector(handler, **config):
+    connector = ShopifyConnector(
+        "org-1", "conn-1", {"shop_domain": "shop.example.com", **config}, {"access_token": "t"}
+    )
+    connector.transport = httpx.MockTransport(handler)
+    return connector
+
+
+def test_paginates_through_link_headers():
+    log = []
+    connector = make_connector(shopify_handler(3, log))
+    customers = connector.fetch_customers()
+    assert [c.external_id for c in customers] == [str(p * 10 + i) for p in range(3) for i in range(3)]
+    assert "updated_at_min" not in log[-1]
+    assert connector.validate_credentials() is True
+
+
+def test_sync_fetches_resources_concurrently_on_one_client():
+    handle = shopify_handler(2, [])
+    in_flight = [0, 0]
+
+    async def slow_handler(request):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.005)
+        in_flight[0] -= 1
+        return handle(request)
+
+    connector = make_connector(slow_handler)
+    clients = set()
+    original = connector.request
+
+    async def tracking_request(method, url, **kwargs):
+        clients.add(id(connector._client))
+        return await original(method, url, **kwargs)
+
+    connector.request = tracking_request
+    result = connector.sync()
+    assert result.success
+    assert result.metadata == {"customers": 6, "orders": 6, "events": 0}
+    assert len(clients) == 1
+    assert in_flight[1] >= 2
+
+
+def test_prefetch_runs_ahead_of_the_consumer():
+    log = []
+    connector = make_connector(shopify_handler(5, log), prefetch_depth=2)
+
+    async def consume_first_page():
+        async with connector.session():
+            pages = connector.customer_pages()
+            await pages.__anext__()
+            await asyncio.sleep(0.01)
+            fetched = len(log)
+            await pages.aclose()
+            return fetched
+
+    assert asyncio.run(consume_first_page()) >= 3
+
+
+def test_failed_resource_is_reported_without_losing_the_others():
+    def handler(request):
+        if request.url.path.endswith("orders.json"):
+            return httpx.Response(500)
+        return shopify_handler(1, [])(request)
+
+    result = make_connector(handler, max_retries=0).sync()
+    assert result.success is False
+    assert result.metadata == {"customers": 3, "orders": 0, "events": 0}
+    assert result.errors[0].startswith("orders:")
+
+
+class ListSink:
+    def __init__(self):
+        self.batches = []
+
+    def write(self, resource, records):
+        self.batches.append((resource, [r.external_id for r in records]))
+        return len(records)
+
+
+def test_sync_writes_each_page_to_the_sink_as_it_arrives():
+    sink = ListSink()
+    result = make_connector(shopify_handler(3, [])).sync(sink=sink)
+    assert result.success
+    assert result.records_synced == 18
+    customers = [ids for resource, ids in sink.batches if resource == "customers"]
+    assert customers == [[str(p * 10 + i) for i in range(3)] for p in range(3)]
+
+
+
+def test_sink_failure_is_recorded_on_the_result():
+    class FailingSink(ListSink):
+        def write(self, resource, records):
+            if resource == "orders":
+                raise RuntimeError("sink unavailable")
+            return super().write(resource, records)
+
+    result = make_connector(shopify_handler(3, [])).sync(sink=FailingSink())
+    assert not result.success
+    assert result.errors == ["sink unavailable"]
+
+def test_iter_customers_yields_page_batches_and_stops_early():
+    log = []
+    connector = make_connector(shopify_handler(50, log), prefetch_depth=1)
+    pages = connector.iter_customers()
+    first = next(pages)
+    pages.close()
+    assert [c.external_id for c in first] == ["0", "1", "2"]
+    assert len(log) < 10
@@ -0,0 +1,125 @@
+"""
+Unit tests for GA4 report paging, date chunking and the closed-day report cache.
+"""
+
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import httpx
+
+from data.connectors.cache import DiskReportCache, date_chunks
+from data.connectors.ga4.connector import GA4Connector
+
+
+class FakeGA4:
+    """Serves one row per (day, source) with 7 sources, paged by limit/offset."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        start = date.fromisoformat(body["dateRanges"][0]["startDate"])
+        end = date.fromisoformat(body["dateRanges"][0]["endDate"])
+        dimensions = [d["name"] for d in body["dimensions"]]
+        rows = []
+        day = start
+        while day <= end:
+            for source in range(7):
+                values = {"date": day.strftime("%Y%m%d"), "sessionSource": f"s{source}", "pagePath": f"/p{source}"}
+                rows.append({
+                    "dimensionValues": [{"value": values.get(name, "x")} for name in dimensions],
+                    "metricValues": [{"value": "1"} for _ in body["metrics"]],
+                })
+            day += timedelta(days=1)
+        page = rows[body["offset"]: body["offset"] + body["limit"]]
+        return httpx.Response(200, json={
+            "dimensionHeaders": [{"name": name} for name in dimensions],
+            "metricHeaders": [{"name": m["name"]} for m in body["metrics"]],
+            "rows": page,
+            "rowCount": len(rows),
+        })
+
+
+def make_connector(fake, tmp_path, **config):
+    connector = GA4Connector(
+        "org-1", "conn-1",
+        {"property_id": "123", "report_cache": str(tmp_path), "report_page_size": 10, **config},
+        {"access_token": "t"},
+    )
+    connector.transport = httpx.MockTransport(fake.handler)
+    return connector
+
+
+def test_date_chunks_are_calendar_aligned():
+    chunks = date_chunks(date(2024, 1, 3), date(2024, 1, 20), 7)
+    assert chunks[0][0] == date(2024, 1, 3)
+    assert all(b[0] - a[1] == timedelta(days=1) for a, b in zip(chunks, chunks[1:]))
+    assert chunks[-1][1] == date(2024, 1, 20)
+    assert [c for c in date_chunks(date(2024, 1, 1), date(2024, 1, 20), 7) if c[0] >= chunks[1][0]] == chunks[1:]
+
+
+def test_reports_page_past_the_limit_and_cache_closed_chunks(tmp_path):
+    fake = FakeGA4()
+    until = datetime.utcnow()
+    since = until - timedelta(days=20)
+
+    first = make_connector(fake, tmp_path).fetch_engagement_metrics(since, until)
+    assert first["row_count"] == 21 * 7
+    days = {row["date"] for row in first["rows"]}
+    assert len(days) == 21
+    assert all(len(body["dateRanges"]) == 1 for body in fake.requests)
+    assert max(body["offset"] for body in fake.requests) > 0
+
+    fake.requests.clear()
+    second = make_connector(fake, tmp_path).fetch_engagement_metrics(since, until)
+    assert sorted(map(str, second["rows"])) == sorted(map(str, first["rows"]))
+    refetched_from = min(date.fromisoformat(body["dateRanges"][0]["startDate"]) for body in fake.requests)
+    assert refetched_from >= until.date() - timedelta(days=3 + 7)
+    assert len(list(tmp_path.iterdir())) >= 1
+
+
+def test_page_performance_is_not_capped(tmp_path):
+    fake = FakeGA4()
+    until = datetime.utcnow()
+    pages = make_connector(fake, tmp_path, report_cache="off").fetch_page_performance(until - timedelta(days=4), until)
+    assert len(pages) == 5 * 7
+    assert DiskReportCache(str(tmp_path)).get("missing") is None
+
+
+class ThrottledGA4(FakeGA4):
+    """Holds each request open briefly and records the peak number in flight."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def async_handler(self, request: httpx.Request) -> httpx.Response:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.handler(request)
+
+
+def test_report_requests_are_capped_and_ordered_by_dimension(tmp_path):
+    fake = ThrottledGA4()
+    connector = make_connector(fake, tmp_path, report_cache="off", max_concurrent_reports=2)
+    connector.transport = httpx.MockTransport(fake.async_handler)
+    until = datetime.utcnow()
+
+    result = connector.fetch_engagement_metrics(until - timedelta(days=20), until)
+    assert result["row_count"] == 21 * 7
+    assert fake.peak == 2
+
+    pages = connector.fetch_page_performance(until - timedelta(days=4), until)
+    assert len(pages) == 5 * 7
+    engagement, page_perf = fake.requests[0], fake.requests[-1]
+    assert [o["dimension"]["dimensionName"] for o in engagement["orderBys"]] == [
+        d["name"] for d in engagement["dimensions"]
+    ]
+    assert page_perf["orderBys"][0] == {"metric": {"metricName": "screenPageViews"}, "desc": True}
+    assert [o["dimension"]["dimensionName"] for o in page_perf["orderBys"][1:]] == ["pagePath", "pageTitle"]
@@ -0,0 +1,99 @@
+"""
+Unit tests for HubSpot's partitioned CRM search sync and batch deal associations.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import httpx
+
+from data.connectors.hubspot.connector import HubSpotConnector
+
+SINCE = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+class FakeHubSpot:
+    def __init__(self, contacts: int = 1000, deals: int = 250):
+        epoch = int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+        step = int((SINCE.timestamp() * 1000 - epoch) * 2 / contacts)
+        # Sparse IDs with modification times spread around SINCE.
+        self.objects = {
+            "contacts": [{"id": str(3 * i + 7), "modified": epoch + i * step} for i in range(contacts)],
+            "deals": [{"id": str(5 * i + 1), "modified": epoch + 2 * i * step} for i in range(deals)],
+        }
+        self.searches = []
+        self.association_calls = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        if "/associations/" in request.url.path:
+            self.association_calls.append(len(body["inputs"]))
+            results = [
+                {"from": {"id": item["id"]}, "to": [{"toObjectId": int(item["id"]) * 3 + 7}]}
+                for item in body["inputs"]
+            ]
+            return httpx.Response(207, json={"status": "COMPLETE", "results": results})
+
+        object_type = request.url.path.split("/")[-2]
+        self.searches.append((object_type, body))
+        rows = self.objects[object_type]
+        for f in body["filterGroups"][0]["filters"]:
+            value = int(f["value"])
+            if f["propertyName"] == "hs_object_id":
+                rows = [r for r in rows if (int(r["id"]) > value if f["operator"] == "GT" else int(r["id"]) <= value)]
+            else:
+                rows = [r for r in rows if r["modified"] >= value]
+        rows = sorted(rows, key=lambda r: int(r["id"]), reverse=body["sorts"][0]["direction"] == "DESCENDING")
+        page = [
+            {"id": r["id"], "properties": {"email": f"{r['id']}@example.com", "amount": "10"}}
+            for r in rows[: body["limit"]]
+        ]
+        return httpx.Response(200, json={"total": len(rows), "results": page})
+
+
+def make_connector(fake, **config):
+    connector = HubSpotConnector("org-1", "conn-1", config, {"access_token": "t"})
+    connector.transport = httpx.MockTransport(fake.handler)
+    return connector
+
+
+def test_contacts_are_scanned_in_parallel_id_partitions():
+    fake = FakeHubSpot()
+    customers = make_connector(fake, search_partitions=3).fetch_customers(since=SINCE)
+
+    expected = sorted(r["id"] for r in fake.objects["contacts"] if r["modified"] >= SINCE.timestamp() * 1000)
+    assert sorted(c.external_id for c in customers) == expected
+    scans = [body for _, body in fake.searches if body["limit"] > 1]
+    upper_bounds = {f["value"] for body in scans for f in body["filterGroups"][0]["filters"]
+                    if f["propertyName"] == "hs_object_id" and f["operator"] == "LTE"}
+    assert len(upper_bounds) == 3
+    assert all(
+        any(f["propertyName"] == "lastmodifieddate" and f["operator"] == "GTE" for f in body["filterGroups"][0]["filters"])
+        for body in scans
+    )
+
+
+def test_deals_link_to_contacts_with_one_association_call_per_page():
+    fake = FakeHubSpot(deals=450)
+    orders = make_connector(fake, search_partitions=1).fetch_orders()
+
+    assert len(orders) == 450
+    assert all(o.customer_external_id == str(int(o.external_id) * 3 + 7) for o in orders)
+    assert fake.association_calls == [200, 200, 50]
+
+
+def test_search_cursor_resumes_remaining_partitions():
+    fake = FakeHubSpot(contacts=900)
+    connector = make_connector(fake, search_partitions=2, prefetch_depth=1)
+    pages = connector.iter_customers()
+    first = next(pages)
+    pages.close()
+
+    async def resume(cursor):
+        async with connector.session():
+            return [c async for page in connector.customer_pages(cursor=cursor) for c in page]
+
+    rest = asyncio.run(resume(first.cursor))
+    ids = [c.external_id for c in first] + [c.external_id for c in rest]
+    assert sorted(ids, key=int) == [r["id"] for r in fake.objects["contacts"]]
@@ -0,0 +1,108 @@
+"""
+Unit tests for Klaviyo metric resolution, sparse event pages and concurrent metric filters.
+"""
+
+import asyncio
+import re
+
+import httpx
+
+from data.connectors.klaviyo.connector import KlaviyoConnector
+
+METRICS = {"m1": "Opened Email", "m2": "Clicked Email", "m3": "Custom Thing"}
+
+
+class FakeKlaviyo:
+    """Serves 5 events per metric, 2 per page, and a metrics list split over 2 pages."""
+
+    PAGE_SIZE = 2
+
+    def __init__(self):
+        self.metrics = dict(METRICS)
+        self.metric_calls = 0
+        self.event_requests = []
+        self.events = [
+            {
+                "type": "event",
+                "id": f"{metric_id}-{i}",
+                "attributes": {"datetime": f"2024-03-0{i + 1}T10:00:00+00:00", "event_properties": {"n": i}},
+                "relationships": {
+                    "profile": {"data": {"type": "profile", "id": f"p{i}"}},
+                    "metric": {"data": {"type": "metric", "id": metric_id}},
+                },
+            }
+            for metric_id in METRICS
+            for i in range(5)
+        ]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        offset = int(params.get("page[cursor]", 0))
+        if request.url.path.endswith("/metrics/"):
+            self.metric_calls += offset == 0
+            rows = [{"type": "metric", "id": k, "attributes": {"name": v}} for k, v in self.metrics.items()]
+        else:
+            self.event_requests.append(params)
+            metric = re.search(r'equals\(metric_id,"(\w+)"\)', params.get("filter", ""))
+            rows = [
+                e for e in self.events
+                if metric is None or e["relationships"]["metric"]["data"]["id"] == metric.group(1)
+            ]
+        body = {"data": rows[offset: offset + self.PAGE_SIZE], "links": {}}
+        if offset + self.PAGE_SIZE < len(rows):
+            body["links"]["next"] = str(request.url.copy_merge_params({"page[cursor]": offset + self.PAGE_SIZE}))
+        return httpx.Response(200, json=body)
+
+
+def make_connector(fake, **config):
+    connector = KlaviyoConnector("org-1", "conn-1", config, {"api_key": "k"})
+    connector.transport = httpx.MockTransport(fake.handler)
+    return connector
+
+
+def test_events_resolve_metric_ids_to_canonical_types():
+    fake = FakeKlaviyo()
+    connector = make_connector(fake)
+    events = connector.fetch_events()
+
+    assert len(events) == 15
+    types = {e.external_id.split("-")[0]: e.event_type for e in events}
+    assert types == {"m1": "email_opened", "m2": "email_clicked", "m3": "custom_thing"}
+    assert all(r["page[size]"] == "200" and r["fields[event]"] == "datetime,event_properties" for r in fake.event_requests)
+    assert events[0].event_data == {"n": 0}
+
+    connector.fetch_events()
+    assert fake.metric_calls == 1
+
+
+def test_unknown_metric_reloads_the_lookup_once():
+    fake = FakeKlaviyo()
+    connector = make_connector(fake)
+    connector.fetch_events()
+    fake.metrics["m4"] = "Viewed Product"
+    fake.events[0]["relationships"]["metric"]["data"]["id"] = "m4"
+
+    events = connector.fetch_events()
+    assert events[0].event_type == "product_viewed"
+    assert fake.metric_calls == 2
+
+
+def test_metric_filters_are_paged_concurrently_and_resume():
+    fake = FakeKlaviyo()
+    connector = make_connector(fake, event_metrics=["email_opened", "Custom Thing"], prefetch_depth=1)
+    events = connector.fetch_events()
+    assert sorted({e.event_type for e in events}) == ["custom_thing", "email_opened"]
+    assert len(events) == 10
+    assert {r["filter"] for r in fake.event_requests} == {'equals(metric_id,"m1")', 'equals(metric_id,"m3")'}
+
+    pages = connector.iter_events()
+    first = next(pages)
+    pages.close()
+    assert set(first.cursor["metrics"]) == {"m1", "m3"}
+
+    async def resume(cursor):
+        async with connector.session():
+            return [e async for page in connector.event_pages(cursor=cursor) for e in page]
+
+    rest = asyncio.run(resume(first.cursor))
+    assert sorted(e.external_id for e in [*first, *rest]) == sorted(e.external_id for e in events)
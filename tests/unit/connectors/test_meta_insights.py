@@ -0,0 +1,100 @@
+"""
+Unit tests for Meta Ads async insights report runs, daily slices and the report cache.
+"""
+
+import json
+from datetime import date, datetime, timedelta
+
+import httpx
+import pytest
+
+from data.connectors.meta_ads.connector import MetaAdsConnector
+
+
+class FakeGraphAPI:
+    """Runs async insights jobs that report one row per (day, campaign) for 2 campaigns."""
+
+    PAGE_SIZE = 3
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.runs = {}
+        self.polls = {}
+        self.submitted = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/", 2)[-1]
+        params = dict(request.url.params)
+        if request.method == "POST" and path == "act_1/insights":
+            time_range = json.loads(params["time_range"])
+            assert params["time_increment"] == "1"
+            run_id = f"run-{len(self.runs)}"
+            self.runs[run_id] = (date.fromisoformat(time_range["since"]), date.fromisoformat(time_range["until"]))
+            self.submitted.append(self.runs[run_id])
+            return httpx.Response(200, json={"report_run_id": run_id})
+        if path in self.runs:
+            self.polls[path] = self.polls.get(path, 0) + 1
+            if self.fail:
+                return httpx.Response(200, json={"id": path, "async_status": "Job Failed"})
+            if self.polls[path] == 1:
+                return httpx.Response(200, json={"id": path, "async_status": "Job Running", "async_percent_completion": 40})
+            return httpx.Response(200, json={"id": path, "async_status": "Job Completed", "async_percent_completion": 100})
+        run_id = path.split("/")[0]
+        start, end = self.runs[run_id]
+        rows = []
+        day = start
+        while day <= end:
+            for campaign in ("c1", "c2"):
+                rows.append({
+                    "date_start": day.isoformat(),
+                    "date_stop": day.isoformat(),
+                    "campaign_id": campaign,
+                    "impressions": "100",
+                    "spend": "2.5",
+                    "actions": [{"action_type": "purchase", "value": "1"}],
+                })
+            day += timedelta(days=1)
+        offset = int(params.get("offset", 0))
+        body = {"data": rows[offset: offset + self.PAGE_SIZE]}
+        if offset + self.PAGE_SIZE < len(rows):
+            body["paging"] = {"next": str(request.url.copy_merge_params({"offset": offset + self.PAGE_SIZE}))}
+        return httpx.Response(200, json=body)
+
+
+def make_connector(fake, tmp_path, **config):
+    connector = MetaAdsConnector(
+        "org-1", "conn-1",
+        {"ad_account_id": "1", "report_cache": str(tmp_path), "report_poll_seconds": 0, **config},
+        {"access_token": "t"},
+    )
+    connector.transport = httpx.MockTransport(fake.handler)
+    return connector
+
+
+def test_async_reports_return_daily_rows_and_cache_closed_chunks(tmp_path):
+    fake = FakeGraphAPI()
+    until = datetime.utcnow()
+    since = until - timedelta(days=20)
+
+    first = make_connector(fake, tmp_path).fetch_campaign_insights(since, until)
+    assert len(first) == 21 * 2
+    assert len({row["date"] for row in first}) == 21
+    assert all(row["conversions"] == 1 for row in first)
+    assert all(count == 2 for count in fake.polls.values())
+
+    fake.submitted.clear()
+    second = make_connector(fake, tmp_path).fetch_campaign_insights(since, until)
+    assert sorted(map(str, second)) == sorted(map(str, first))
+    assert min(start for start, _ in fake.submitted) >= until.date() - timedelta(days=7 + 7)
+
+
+def test_failed_report_run_raises(tmp_path):
+    connector = make_connector(FakeGraphAPI(fail=True), tmp_path, report_cache="off")
+    with pytest.raises(RuntimeError, match="Job Failed"):
+        connector.fetch_campaign_insights(datetime.utcnow() - timedelta(days=2))
+
+
+def test_report_poll_gives_up_after_max_wait(tmp_path):
+    connector = make_connector(FakeGraphAPI(), tmp_path, report_cache="off", report_max_wait_seconds=0)
+    with pytest.raises(TimeoutError, match="Job Running"):
+        connector.fetch_campaign_insights(datetime.utcnow() - timedelta(days=2))
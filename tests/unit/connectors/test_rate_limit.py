@@ -0,0 +1,117 @@
+"""
+Unit tests for connector rate limiting and page-level retries.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from data.connectors.base import RateLimiter, RateLimitState
+from data.connectors.hubspot.connector import HubSpotConnector
+from data.connectors.meta_ads.connector import MetaAdsConnector
+from data.connectors.shopify.connector import ShopifyConnector
+
+
+def shopify(handler, **config):
+    connector = ShopifyConnector(
+        "org-1", "conn-1",
+        {"shop_domain": "shop.example.com", "backoff_base_seconds": 0.001, **config},
+        {"access_token": "t"},
+    )
+    connector.transport = httpx.MockTransport(handler)
+    return connector
+
+
+def test_retries_429_honouring_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json={"customers": [{"id": 1}]})
+
+    customers = shopify(handler).fetch_customers()
+    assert [c.external_id for c in customers] == ["1"]
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.05
+
+
+def test_gives_up_after_max_retries():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        shopify(handler, max_retries=2).fetch_customers()
+    assert len(calls) == 3
+
+
+def test_posts_retry_only_when_the_request_was_not_acted_on():
+    def run(failures, **kwargs):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) <= len(failures):
+                failure = failures[len(calls) - 1]
+                if isinstance(failure, Exception):
+                    raise failure
+                return httpx.Response(failure)
+            return httpx.Response(200, json={})
+
+        connector = shopify(handler)
+
+        async def post():
+            async with connector.session():
+                return await connector.request("POST", "https://shop.example.com/x", json={}, **kwargs)
+
+        try:
+            asyncio.run(post())
+        except httpx.HTTPError:
+            pass
+        return len(calls)
+
+    assert run([503]) == 1
+    assert run([httpx.ReadTimeout("slow")]) == 1
+    assert run([429]) == 2
+    assert run([httpx.ConnectError("refused")]) == 2
+    assert run([503], idempotent=True) == 2
+
+
+def test_limiter_waits_for_refill_when_quota_is_spent():
+    limiter = RateLimiter(rate=100.0, burst=5)
+    limiter.observe(RateLimitState(limit=5, remaining=0, refill_per_second=50.0))
+
+    async def take(n):
+        start = time.monotonic()
+        for _ in range(n):
+            await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(3)) >= 0.05
+
+
+def test_vendor_headers_are_parsed():
+    shop = shopify(lambda r: httpx.Response(200))
+    state = shop.rate_limit_state(httpx.Response(200, headers={"X-Shopify-Shop-Api-Call-Limit": "39/40"}))
+    assert (state.limit, state.remaining, state.refill_per_second) == (40, 1, 2)
+
+    hubspot = HubSpotConnector("org-1", "conn-1", {}, {})
+    state = hubspot.rate_limit_state(httpx.Response(200, headers={
+        "X-HubSpot-RateLimit-Max": "190",
+        "X-HubSpot-RateLimit-Remaining": "20",
+        "X-HubSpot-RateLimit-Interval-Milliseconds": "10000",
+    }))
+    assert (state.remaining, state.refill_per_second) == (20, 19)
+
+    meta = MetaAdsConnector("org-1", "conn-1", {}, {})
+    usage = {"123": [{"call_count": 90, "total_cputime": 40, "estimated_time_to_regain_access": 2}]}
+    state = meta.rate_limit_state(httpx.Response(200, headers={"X-Business-Use-Case-Usage": json.dumps(usage)}))
+    assert state.remaining == pytest.approx(1.0)
+    assert state.retry_after == 120
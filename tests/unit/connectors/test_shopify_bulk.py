@@ -0,0 +1,165 @@
+"""
+Unit tests for the Shopify GraphQL bulk export mode, against a fake Shopify server.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from data.connectors.shopify.connector import ShopifyConnector
+
+STORAGE = "https://storage.example.com"
+
+
+class FakeShopify:
+    """Fake Admin API: runs bulk operations after a few polls and serves their JSONL exports."""
+
+    def __init__(self, customers: int = 3, orders: int = 4, polls: int = 2):
+        self.exports = {
+            "customers": [
+                {"id": f"gid://shopify/Customer/{i}", "email": f"c{i}@example.com", "tags": ["vip"],
+                 "numberOfOrders": "2", "amountSpent": {"amount": "10.0", "currencyCode": "EUR"},
+                 "createdAt": "2024-01-01T00:00:00Z"}
+                for i in range(1, customers + 1)
+            ],
+            "orders": [],
+        }
+        for i in range(1, orders + 1):
+            order_id = f"gid://shopify/Order/{100 + i}"
+            self.exports["orders"].append({
+                "id": order_id, "legacyResourceId": str(100 + i), "name": f"#{1000 + i}",
+                "createdAt": "2024-02-01T10:00:00Z", "displayFinancialStatus": "PAID",
+                "currencyCode": "EUR", "totalPriceSet": {"shopMoney": {"amount": "25.50"}},
+                "customer": {"legacyResourceId": str(i % customers + 1)},
+            })
+            for j in range(2):
+                self.exports["orders"].append({
+                    "id": f"gid://shopify/LineItem/{i}{j}", "title": f"Item {j}", "quantity": 1,
+                    "originalUnitPriceSet": {"shopMoney": {"amount": "12.75"}},
+                    "product": {"legacyResourceId": str(j)}, "__parentId": order_id,
+                })
+        self.polls = polls
+        self.operations = {}
+        self.running = None
+        self.queries = []
+        self.downloads = []
+        self.expired = set()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host == "storage.example.com":
+            assert "X-Shopify-Access-Token" not in request.headers
+            self.downloads.append(request.url.path)
+            if request.url.path in self.expired:
+                return httpx.Response(403)
+            resource = request.url.path.split("/")[2]
+            body = "\n".join(json.dumps(line) for line in self.exports[resource]) + "\n"
+            return httpx.Response(200, content=body.encode())
+
+        assert request.url.path.endswith("/graphql.json")
+        payload = json.loads(request.content)
+        if "bulkOperationRunQuery" in payload["query"]:
+            if self.running is not None:
+                errors = [{"field": None, "message": "A bulk query operation for this app and shop is already in progress"}]
+                return httpx.Response(200, json={"data": {"bulkOperationRunQuery": {"bulkOperation": None, "userErrors": errors}}})
+            query = payload["variables"]["query"]
+            self.queries.append(query)
+            resource = "orders" if "orders" in query else "customers"
+            op_id = f"gid://shopify/BulkOperation/{len(self.operations) + 1}"
+            self.operations[op_id] = {"resource": resource, "polls": 0}
+            self.running = op_id
+            bulk = {"id": op_id, "status": "CREATED"}
+            return httpx.Response(200, json={"data": {"bulkOperationRunQuery": {"bulkOperation": bulk, "userErrors": []}}})
+
+        op_id = payload["variables"]["id"]
+        operation = self.operations[op_id]
+        operation["polls"] += 1
+        node = {"id": op_id, "status": "RUNNING", "errorCode": None, "objectCount": "0", "url": None}
+        if operation["polls"] > self.polls:
+            self.running = None
+            rows = self.exports[operation["resource"]]
+            node.update(status="COMPLETED", objectCount=str(len(rows)))
+            if rows:
+                node["url"] = f"{STORAGE}/bulk/{operation['resource']}/{op_id.rsplit('/', 1)[-1]}.jsonl"
+        return httpx.Response(200, json={"data": {"node": node}})
+
+
+@pytest.fixture
+def shopify():
+    return FakeShopify()
+
+
+def make_connector(fake, **config):
+    connector = ShopifyConnector(
+        "org-1", "conn-1",
+        {"shop_domain": "shop.example.com", "bulk_mode": "backfill", "bulk_poll_seconds": 0, **config},
+        {"access_token": "t"},
+    )
+    connector.transport = httpx.MockTransport(fake.handler)
+    return connector
+
+
+def test_bulk_backfill_streams_orders_with_their_line_items(shopify):
+    result = make_connector(shopify).sync()
+
+    assert result.success, result.errors
+    assert result.metadata == {"customers": 3, "orders": 4, "events": 0}
+    assert len(shopify.operations) == 2
+
+    orders = make_connector(shopify).fetch_orders()
+    first = orders[0]
+    assert first.external_id == "101"
+    assert first.customer_external_id == "2"
+    assert first.total == 25.5 and first.currency == "EUR" and first.status == "paid"
+    assert [item["price"] for item in first.items] == [12.75, 12.75]
+    assert first.properties["order_number"] == 1001
+    assert first.ordered_at == datetime(2024, 2, 1, 10, tzinfo=timezone.utc)
+
+    customers = make_connector(shopify).fetch_customers()
+    assert [c.external_id for c in customers] == ["1", "2", "3"]
+    assert customers[0].properties["orders_count"] == 2
+
+
+def test_bulk_pages_resume_and_reexport_expired_files(shopify):
+    connector = make_connector(shopify)
+    connector.batch_size = 3
+
+    async def pages(cursor=None):
+        async with connector.session():
+            return [page async for page in connector.bulk_pages("orders", cursor=cursor)]
+
+    first = asyncio.run(pages())
+    assert [len(page) for page in first] == [3, 1]
+    cursor = first[0].cursor
+    assert cursor["skip"] == 3
+
+    resumed = asyncio.run(pages(cursor))
+    assert [o.external_id for page in resumed for o in page] == ["104"]
+    assert len(shopify.operations) == 1
+
+    shopify.expired.add(httpx.URL(cursor["bulk_url"]).path)
+    reexported = asyncio.run(pages(cursor))
+    assert [len(page) for page in reexported] == [3, 1]
+    assert len(shopify.operations) == 2
+
+
+def test_incremental_syncs_stay_on_rest_in_backfill_mode(shopify):
+    rest_calls = []
+
+    def handler(request):
+        if request.url.path.endswith(".json") and not request.url.path.endswith("graphql.json"):
+            rest_calls.append(request.url.path)
+            return httpx.Response(200, json={request.url.path.rsplit("/", 1)[-1][:-5]: []})
+        return shopify.handler(request)
+
+    connector = make_connector(shopify)
+    connector.transport = httpx.MockTransport(handler)
+    connector.sync(since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert not shopify.operations
+    assert len(rest_calls) == 2
+
+    always = make_connector(shopify, bulk_mode="always")
+    always.fetch_orders(since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert "updated_at:>='2024-01-01T00:00:00+00:00'" in shopify.queries[-1]
@@ -0,0 +1,175 @@
+"""
+Unit tests for the connector Postgres sink, against a recording fake connection.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from data.connectors.base import CustomerRecord, EventRecord, OrderRecord
+from data.connectors.sink import PostgresSink, _dedupe
+
+
+class FakeCursor:
+    """Records statements and answers the customer lookups and upserts the sink issues."""
+
+    connection = SimpleNamespace(encoding="UTF8")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._values = []
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mogrify(self, template, args):
+        # execute_values renders each row through mogrify; keep the raw row instead.
+        self._values.append(tuple(args))
+        return b"(?)"
+
+    def execute(self, sql, params=None):
+        sql = sql.decode() if isinstance(sql, bytes) else sql
+        rows, self._values = self._values, []
+        self._result = []
+        if "pg_advisory_xact_lock" in sql:
+            kind = "lock"
+        elif sql.lstrip().startswith("SELECT external_id, id FROM customers"):
+            kind = "lookup"
+            self._result = [(e, self.conn.customer_id(e)) for e in params[2] if self.conn.customer_id(e)]
+        elif "INSERT INTO customers" in sql:
+            kind = "placeholders" if "(org_id, connector_id, external_id)\n" in sql else "customers"
+            self._result = [(row[2], self.conn.stage_customer(row[2])) for row in rows]
+        elif "UPDATE orders" in sql:
+            kind = "orders"
+        elif "UPDATE customer_events" in sql:
+            kind = "events"
+        else:
+            raise AssertionError(f"unexpected statement: {sql}")
+        if kind in self.conn.fail_on:
+            raise RuntimeError(f"{kind} write failed")
+        self.conn.statements.append((kind, rows or params))
+
+    def fetchall(self):
+        return self._result
+
+
+class FakeConnection:
+    def __init__(self, customers=None, fail_on=()):
+        self.customers = dict(customers or {})
+        self.staged = {}
+        self.fail_on = set(fail_on)
+        self.statements = []
+        self.commits = self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def customer_id(self, external_id):
+        return self.staged.get(external_id) or self.customers.get(external_id)
+
+    def stage_customer(self, external_id):
+        if self.customer_id(external_id) is None:
+            self.staged[external_id] = str(uuid.uuid4())
+        return self.customer_id(external_id)
+
+    def commit(self):
+        self.customers.update(self.staged)
+        self.staged.clear()
+        self.commits += 1
+
+    def rollback(self):
+        self.staged.clear()
+        self.rollbacks += 1
+
+    def kinds(self):
+        return [kind for kind, _ in self.statements if kind != "lock"]
+
+
+def make_sink(conn):
+    return PostgresSink(conn, org_id="org-1", connector_id="conn-1")
+
+
+def test_dedupe_keeps_the_last_copy_and_all_unkeyed_records():
+    orders = [
+        OrderRecord("o1", None, 10.0),
+        OrderRecord("o2", None, 20.0),
+        OrderRecord("o1", None, 15.0),
+    ]
+    assert [(o.external_id, o.total) for o in _dedupe(orders, lambda o: o.external_id)] == [
+        ("o1", 15.0), ("o2", 20.0),
+    ]
+
+    events = [EventRecord("c1", "open"), EventRecord("c1", "click", external_id="e1"), EventRecord("c2", "open")]
+    assert [e.event_type for e in _dedupe(events, lambda e: e.external_id)] == ["click", "open", "open"]
+
+
+def test_empty_batches_skip_the_database():
+    sink = PostgresSink(connection=None, org_id="org-1", connector_id="conn-1")
+    assert sink.write("orders", []) == 0
+    assert sink.throughput() == {}
+
+
+def test_orders_create_placeholders_only_for_unknown_customers():
+    conn = FakeConnection(customers={"c1": "uuid-c1"})
+    sink = make_sink(conn)
+    assert sink.write("orders", [OrderRecord("o1", "c1", 10.0), OrderRecord("o2", "c2", 20.0)]) == 2
+
+    assert conn.kinds() == ["lookup", "placeholders", "orders"]
+    placeholders = dict(conn.statements)["placeholders"]
+    assert [row[2] for row in placeholders] == ["c2"]
+    orders = {row[2]: row[3] for row in dict(conn.statements)["orders"]}
+    assert orders == {"o1": "uuid-c1", "o2": conn.customers["c2"]}
+
+    conn.statements.clear()
+    sink.write("orders", [OrderRecord("o3", "c1", 5.0), OrderRecord("o4", "c2", 5.0)])
+    assert conn.kinds() == ["orders"]
+
+
+def test_customer_upserts_feed_the_id_cache():
+    conn = FakeConnection()
+    sink = make_sink(conn)
+    sink.write("customers", [CustomerRecord("c1", email="a@example.com"), CustomerRecord("c1", email="b@example.com")])
+    customers = dict(conn.statements)["customers"]
+    assert [(row[2], row[3]) for row in customers] == [("c1", "b@example.com")]
+
+    conn.statements.clear()
+    sink.write("events", [EventRecord("c1", "email_opened", external_id="e1")])
+    assert conn.kinds() == ["events"]
+
+
+def test_rollback_leaves_the_customer_cache_unchanged():
+    conn = FakeConnection(fail_on={"orders"})
+    sink = make_sink(conn)
+    with pytest.raises(RuntimeError):
+        sink.write("orders", [OrderRecord("o1", "c1", 10.0)])
+    assert conn.rollbacks == 1
+    assert sink._customer_ids == {}
+    assert sink.throughput() == {}
+
+    conn.fail_on.clear()
+    conn.statements.clear()
+    sink.write("orders", [OrderRecord("o1", "c1", 10.0)])
+    assert conn.kinds() == ["lookup", "placeholders", "orders"]
+    assert sink._customer_ids == {"c1": conn.customers["c1"]}
+
+
+def test_events_without_a_customer_are_skipped():
+    conn = FakeConnection(customers={"c1": "uuid-c1"})
+    sink = make_sink(conn)
+    written = sink.write("events", [
+        EventRecord("c1", "email_opened", external_id="e1"),
+        EventRecord("", "email_opened", external_id="e2"),
+    ])
+    assert written == 1
+    events = dict(conn.statements)["events"]
+    assert [(row[2], row[3]) for row in events] == [("e1", "uuid-c1")]
+
+    conn.statements.clear()
+    assert sink.write("events", [EventRecord("", "email_opened")]) == 0
+    assert conn.kinds() == []
+    assert conn.commits == 2
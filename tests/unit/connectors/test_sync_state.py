@@ -0,0 +1,59 @@
+"""
+Unit tests for checkpointed, resumable connector syncs.
+"""
+
+import httpx
+
+from tests.unit.connectors.test_async_base import make_connector, shopify_handler
+
+
+class MemoryStateStore:
+    def __init__(self):
+        self.checkpoints = {}
+        self.saves = []
+        self.synced_at = None
+
+    def load(self, connector_id):
+        return dict(self.checkpoints)
+
+    def save(self, connector_id, checkpoint):
+        self.saves.append((checkpoint.resource, checkpoint.cursor))
+        self.checkpoints[checkpoint.resource] = checkpoint
+
+    def mark_synced(self, connector_id, synced_at):
+        self.synced_at = synced_at
+
+
+def test_failed_sync_resumes_from_the_last_written_page():
+    log, fail = [], {"page": 2}
+    handle = shopify_handler(4, log)
+
+    def handler(request):
+        if request.url.path.endswith("customers.json") and request.url.params.get("page_info") == str(fail["page"]):
+            return httpx.Response(503)
+        return handle(request)
+
+    store = MemoryStateStore()
+    connector = make_connector(handler, max_retries=0, prefetch_depth=0)
+    first = connector.sync(state=store)
+    assert first.success is False
+    assert first.metadata["customers"] == 6
+    assert store.checkpoints["customers"].cursor["url"].endswith("page_info=2")
+    assert store.checkpoints["orders"].high_water_mark is not None
+    assert store.synced_at is None
+
+    fail["page"] = None
+    log.clear()
+    second = connector.sync(state=store)
+    assert second.success
+    assert second.metadata["customers"] == 6
+    customer_requests = [entry for entry in log if "customers.json" in entry]
+    assert "page_info=2" in customer_requests[0]
+    assert store.checkpoints["customers"].cursor is None
+    assert store.checkpoints["customers"].high_water_mark == store.checkpoints["customers"].run_started_at
+    assert store.synced_at is not None
+
+    log.clear()
+    connector.sync(state=store)
+    assert "updated_at_min=" in [entry for entry in log if "customers.json" in entry][0]
+
@@ -0,0 +1,106 @@
+"""
+Unit tests for batched, length-sorted ABSA inference.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+from torch import nn
+
+from modules.brand_monitor.models.absa import BRAND_DIMENSIONS, ABSAModel
+
+
+class WordTokenizer:
+    def __init__(self):
+        self.padded_widths: list[int] = []
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        return {"input_ids": [[hash(w) % 997 + 1 for w in t.split()][:max_length] for t in texts]}
+
+    def pad(self, encoded, padding="longest", return_tensors="pt"):
+        ids = encoded["input_ids"]
+        width = max(len(x) for x in ids)
+        self.padded_widths.append(width)
+        input_ids = torch.zeros(len(ids), width, dtype=torch.long)
+        attention_mask = torch.zeros(len(ids), width, dtype=torch.long)
+        for i, x in enumerate(ids):
+            input_ids[i, : len(x)] = torch.tensor(x)
+            attention_mask[i, : len(x)] = 1
+        return Batch(input_ids=input_ids, attention_mask=attention_mask)
+
+
+class Batch(dict):
+    def to(self, device):
+        return self
+
+
+class MeanPoolClassifier(nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.embedding = nn.Embedding(1000, 16)
+        self.head = nn.Linear(16, len(BRAND_DIMENSIONS))
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embedding(input_ids) * mask).sum(1) / mask.sum(1).clamp(min=1)
+        return SimpleNamespace(logits=self.head(pooled))
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    absa = ABSAModel(batch_size=4, window_batches=2)
+    absa._tokenizer = WordTokenizer()
+    absa._model = MeanPoolClassifier().eval()
+    return absa
+
+
+def make_texts(n: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    return [" ".join(f"w{rng.integers(50)}" for _ in range(rng.integers(1, 40))) for _ in range(n)]
+
+
+def test_batch_matches_single_and_keeps_order(model):
+    texts = make_texts(21)
+    batched = model.analyze_batch(texts, [f"s{i}" for i in range(len(texts))])
+    assert [r.text for r in batched] == texts
+    assert [r.source for r in batched] == [f"s{i}" for i in range(len(texts))]
+    for text, result in zip(texts, batched):
+        single = model.analyze(text)
+        assert result.overall == pytest.approx(single.overall, abs=1e-5)
+
+
+def test_buckets_pad_to_their_own_longest(model):
+    texts = make_texts(8)
+    model._tokenizer.padded_widths.clear()
+    model.analyze_batch(texts)
+    lengths = sorted(len(t.split()) for t in texts)
+    assert model._tokenizer.padded_widths == [lengths[3], lengths[7]]
+
+
+def test_stream_is_lazy(model):
+    consumed = []
+
+    def texts():
+        for i, text in enumerate(make_texts(100)):
+            consumed.append(i)
+            yield text
+
+    first = next(model.stream_analyze(texts()))
+    assert first.text
+    assert len(consumed) == model.batch_size * model.window_batches
+
+
+def test_api_model_keeps_keyword_path_without_trained_checkpoint(monkeypatch):
+    from platform.api import inference
+
+    monkeypatch.setattr(inference.settings, "ABSA_MODEL_PATH", "")
+    inference.load_absa_model.cache_clear()
+    try:
+        model = inference.load_absa_model()
+        assert model._model is None
+        assert model.analyze_batch(["Terrible support"])[0].overall < 0.5
+    finally:
+        inference.load_absa_model.cache_clear()
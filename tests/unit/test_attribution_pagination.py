@@ -0,0 +1,103 @@
+"""
+Unit tests for keyset pagination helpers in the attribution router.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from platform.api.routers.attribution import (
+    _fetch_page,
+    _serialize_touchpoint,
+    _touchpoint_query,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+class TestCursor:
+    def test_round_trip(self):
+        occurred_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        row_id = uuid.uuid4()
+        assert decode_cursor(encode_cursor(occurred_at, row_id)) == (occurred_at, row_id, None)
+
+    def test_window_start_is_carried_by_the_cursor(self):
+        occurred_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+        since = datetime(2024, 4, 1, 9, 15, 7, 123456)
+        assert decode_cursor(encode_cursor(occurred_at, uuid.uuid4(), since))[2] == since
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), uuid.uuid4())
+        assert "=" not in cursor
+        assert "+" not in cursor and "/" not in cursor
+
+    def test_garbage_cursor_rejected(self):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor("not-a-cursor")
+        assert exc.value.status_code == 400
+
+
+class TestTouchpointQuery:
+    def test_descending_page_uses_row_comparison(self):
+        params: dict = {"org_id": uuid.uuid4()}
+        cursor = encode_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), uuid.uuid4())
+        sql = str(_touchpoint_query(params, None, None, cursor, ascending=False, limit=11))
+        assert "(occurred_at, id) < (:cursor_at, :cursor_id)" in sql
+        assert "ORDER BY occurred_at DESC, id DESC" in sql
+        assert params["limit"] == 11
+
+    def test_ascending_journey_filters_customer(self):
+        customer_id = uuid.uuid4()
+        params: dict = {"org_id": uuid.uuid4()}
+        cursor = encode_cursor(datetime(2024, 5, 1, tzinfo=timezone.utc), uuid.uuid4())
+        sql = str(_touchpoint_query(params, customer_id, None, cursor, ascending=True, limit=51))
+        assert "customer_id = :customer_id" in sql
+        assert "(occurred_at, id) > (:cursor_at, :cursor_id)" in sql
+        assert params["customer_id"] == customer_id
+
+    def test_export_query_is_unbounded(self):
+        params: dict = {"org_id": uuid.uuid4()}
+        sql = str(_touchpoint_query(params, None, None, None, ascending=True, limit=None))
+        assert "LIMIT" not in sql
+        assert "limit" not in params
+
+
+class RecordingSession:
+    """Returns a full page of touchpoints for every query and records the bound params."""
+
+    def __init__(self, rows: int):
+        start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        self.rows = [
+            SimpleNamespace(id=uuid.uuid4(), occurred_at=start - timedelta(minutes=i)) for i in range(rows)
+        ]
+        self.params = []
+
+    async def execute(self, query, params):
+        self.params.append(dict(params))
+        return SimpleNamespace(fetchall=lambda: self.rows)
+
+
+class TestFetchPage:
+    def test_later_pages_keep_the_first_page_window(self):
+        session = RecordingSession(rows=3)
+        org = uuid.uuid4()
+        first_since = datetime(2024, 4, 1, 8, 0, 0, 1)
+
+        _, cursor = asyncio.run(_fetch_page(session, org, None, first_since, None, ascending=False, limit=2))
+        later = first_since + timedelta(minutes=5)
+        _, next_cursor = asyncio.run(_fetch_page(session, org, None, later, cursor, ascending=False, limit=2))
+
+        assert [p["since"] for p in session.params] == [first_since, first_since]
+        assert decode_cursor(next_cursor)[2] == first_since
+
+    def test_missing_customer_falls_back_to_all(self):
+        row = SimpleNamespace(
+            id=uuid.uuid4(), customer_id=None, channel="email", campaign_id=None,
+            touchpoint_data={}, attribution_credit_aima=0.5, occurred_at=None,
+        )
+        assert _serialize_touchpoint(row)["customer_id"] == "all"
+        assert _serialize_touchpoint(row, "c-1")["customer_id"] == "c-1"
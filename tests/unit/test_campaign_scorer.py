@@ -0,0 +1,109 @@
+"""
+Unit tests for batched campaign variant scoring and the text-embedding cache.
+"""
+
+import numpy as np
+import pytest
+import torch
+
+from modules.campaign_predictor.features.embeddings import EmbeddingCache, TextEmbedder
+from modules.campaign_predictor.features.variant import N_STRUCTURED_FEATURES, CampaignVariant
+from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+from modules.campaign_predictor.models.scorer import CampaignScorer
+
+
+class CountingEmbedder(TextEmbedder):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.encoded: list[str] = []
+
+    def _encode(self, texts):
+        self.encoded.extend(texts)
+        return super()._encode(texts)
+
+
+@pytest.fixture
+def scorer():
+    torch.manual_seed(0)
+    return CampaignScorer(MultiTaskPerformancePredictor().eval(), CountingEmbedder())
+
+
+def test_structured_vector_width():
+    variant = CampaignVariant("Hi {{first_name}}, 20% off ends today!", body="Shop now.", offer_type="percentage_discount")
+    features = variant.to_structured()
+    assert features.shape == (N_STRUCTURED_FEATURES,)
+    assert np.isfinite(features).all()
+
+
+def test_from_dict_coerces_and_validates_fields():
+    variant = CampaignVariant.from_dict({"subject_line": "Hi", "send_hour": "9", "offer_value": 10})
+    assert (variant.send_hour, variant.offer_value) == (9, 10.0)
+    for bad, field in [
+        ({"subject_line": "Hi", "send_hour": "9am"}, "send_hour"),
+        ({"subject_line": "Hi", "offer_value": "10%"}, "offer_value"),
+        ({"subject_line": "Hi", "budget": float("nan")}, "budget"),
+        ({"subject_line": 5}, "subject_line"),
+        ({"body": "No subject"}, "subject_line"),
+        (["Hi"], "object"),
+    ]:
+        with pytest.raises(ValueError, match=field):
+            CampaignVariant.from_dict(bad)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put_many({"a": np.ones(3), "b": np.ones(3)})
+    cache.get_many(["a"])
+    cache.put_many({"c": np.ones(3)})
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_cache_persists_to_disk(tmp_path):
+    path = tmp_path / "emb.npz"
+    cache = EmbeddingCache(path=path)
+    cache.put_many({"k": np.arange(768, dtype=np.float32)})
+    cache.save()
+    reloaded = EmbeddingCache(path=path)
+    np.testing.assert_array_equal(reloaded.get_many(["k"])["k"], np.arange(768, dtype=np.float32))
+
+
+def test_shared_text_is_embedded_once(scorer):
+    body = "Our spring collection just landed. Shop the new arrivals today."
+    variants = [CampaignVariant(f"Subject option {i}", body=body) for i in range(50)]
+    scorer.score(variants)
+    assert scorer.embedder.encoded.count(body) == 1
+
+    scorer.embedder.encoded.clear()
+    scorer.score(variants)
+    assert scorer.embedder.encoded == []
+
+
+def test_batch_matches_single_predict(scorer):
+    variants = [
+        CampaignVariant("Last chance: 30% off", body="Ends tonight.", send_hour=18),
+        CampaignVariant("New arrivals are here", preview_text="Fresh picks", channel="sms"),
+    ]
+    batch = scorer.score(variants)
+    text = scorer.text_embeddings(variants)
+    for i, variant in enumerate(variants):
+        single = scorer.model.predict(text[i], variant.to_structured())
+        assert batch[i].open_rate == pytest.approx(single.open_rate, abs=1e-5)
+        assert batch[i].predicted_revenue == pytest.approx(single.predicted_revenue, abs=1e-4)
+
+
+def test_api_scorer_is_not_served_with_a_fallback_encoder(monkeypatch, tmp_path):
+    from modules.campaign_predictor.features.embeddings import HASHING_ENCODER
+    from modules.campaign_predictor.models.scorer import CAMPAIGN_MODEL_FILE
+    from platform.api import inference
+
+    torch.save(MultiTaskPerformancePredictor().state_dict(), tmp_path / CAMPAIGN_MODEL_FILE)
+    monkeypatch.setattr(inference.settings, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(inference.settings, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(inference.settings, "EMBEDDING_CACHE_PATH", "")
+    # Simulates an encoder that cannot be loaded, which leaves the hashed fallback in place.
+    monkeypatch.setattr(TextEmbedder, "load", lambda self: None)
+    assert inference._load_campaign_scorer() is None
+
+    monkeypatch.setattr(inference.settings, "TEXT_ENCODER_MODEL", HASHING_ENCODER)
+    scorer = inference._load_campaign_scorer()
+    assert scorer is not None and scorer.embedder.encoder_id == HASHING_ENCODER
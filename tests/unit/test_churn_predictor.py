@@ -0,0 +1,66 @@
+"""
+Unit tests for the DeepChurnModel batch scoring path.
+"""
+
+import numpy as np
+import pytest
+import torch
+
+from modules.clv_churn.models.churn_predictor import DeepChurnModel, summarize_hazard
+
+
+@pytest.fixture
+def model():
+    torch.manual_seed(0)
+    return DeepChurnModel()
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(7)
+    return rng.normal(size=(257, 33)).astype(np.float32)
+
+
+class TestScoreBatch:
+    def test_shapes(self, model, features):
+        scores = model.score_batch(features, batch_size=64)
+        assert len(scores) == 257
+        assert scores.survival.shape == (257, model.n_time_bins)
+        assert scores.churn_probability_30d.shape == (257,)
+
+    def test_chunking_does_not_change_results(self, model, features):
+        small = model.score_batch(features, batch_size=10)
+        large = model.score_batch(features, batch_size=1000)
+        np.testing.assert_allclose(small.survival, large.survival, atol=1e-6)
+
+    def test_matches_single_row_prediction(self, model, features):
+        scores = model.score_batch(features)
+        for i in (0, 100, 256):
+            single = model.predict_churn(features[i], customer_id=f"C{i}")
+            batched = scores.prediction(i, customer_id=f"C{i}")
+            assert single.risk_level == batched.risk_level
+            assert single.churn_probability_30d == pytest.approx(batched.churn_probability_30d, abs=1e-4)
+            np.testing.assert_allclose(single.survival_curve, batched.survival_curve, atol=1e-5)
+
+    def test_survival_is_non_increasing(self, model, features):
+        scores = model.score_batch(features)
+        assert np.all(np.diff(scores.survival, axis=1) <= 1e-7)
+
+
+class TestSummarizeHazard:
+    def test_median_time_to_churn(self):
+        hazard = np.array([[0.2, 0.5, 0.1], [0.0, 0.0, 0.0]], dtype=np.float32)
+        scores = summarize_hazard(hazard, days_per_bin=30)
+        assert scores.predicted_days_to_churn[0] == 30.0
+        assert np.isnan(scores.predicted_days_to_churn[1])
+
+    def test_risk_levels(self):
+        hazard = np.array([[0.7, 0.1], [0.4, 0.1], [0.1, 0.1]], dtype=np.float32)
+        scores = summarize_hazard(hazard)
+        assert scores.risk_level.tolist() == ["high", "medium", "low"]
+        assert scores.recommended_intervention[0] == "immediate_personal_outreach"
+
+    def test_expected_lifetime_is_area_under_survival(self):
+        hazard = np.zeros((1, 4), dtype=np.float32)
+        scores = summarize_hazard(hazard, days_per_bin=30)
+        assert scores.expected_lifetime_days[0] == pytest.approx(120.0)
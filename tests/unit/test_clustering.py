@@ -120,3 +120,154 @@ class TestSegmentDriftDetector:
         events = detector.batch_detect(all_histories)
         assert len(events) == 1
         assert events[0].customer_id == "C1"
+
+
+class TestColumnarDrift:
+    def test_matches_per_customer_detection(self):
+        from datetime import datetime, timedelta, timezone
+        from modules.customer_intelligence.clustering.drift_detector import (
+            CRITICAL_TRANSITIONS,
+            DOWNWARD_TRANSITIONS,
+            SEGMENT_NAMES,
+        )
+
+        rng = np.random.default_rng(7)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        histories = {
+            f"C{c}": [
+                {
+                    "customer_id": f"C{c}",
+                    "segment_name": SEGMENT_NAMES[rng.integers(len(SEGMENT_NAMES))],
+                    "health_score": float(rng.integers(100)),
+                    "assigned_at": start + timedelta(days=int(d)),
+                }
+                for d in rng.permutation(30)[: rng.integers(1, 8)]
+            ]
+            for c in range(200)
+        }
+        expected = []
+        for history in histories.values():
+            history = sorted(history, key=lambda r: r["assigned_at"])
+            for prev, curr in zip(history, history[1:]):
+                pair = (prev["segment_name"], curr["segment_name"])
+                direction = "critical" if pair in CRITICAL_TRANSITIONS else "downward" if pair in DOWNWARD_TRANSITIONS else None
+                if direction:
+                    expected.append((curr["customer_id"], *pair, direction, curr["health_score"]))
+
+        batched = [
+            (e.customer_id, e.from_segment, e.to_segment, e.drift_direction, e.health_score_after)
+            for e in SegmentDriftDetector().batch_detect(histories)
+        ]
+        expected.sort()
+        batched.sort()
+        assert batched == expected
+        assert len(expected) > 0
+
+    def test_columnar_arrays(self):
+        from modules.customer_intelligence.clustering.drift_detector import SEGMENT_INDEX
+
+        codes = [SEGMENT_INDEX[s] for s in ("Champions", "At Risk", "Lost", "Loyal Customers", "Need Attention")]
+        batch = SegmentDriftDetector().detect_columnar(
+            customer_ids=np.array([1, 1, 1, 2, 2]),
+            assigned_at=np.array(["2024-03-01", "2024-01-01", "2024-02-01", "2024-01-01", "2024-02-01"], dtype="datetime64[D]"),
+            segment_codes=np.array(codes),
+            health=np.array([10.0, 90.0, 5.0, 70.0, 50.0]),
+        )
+        events = batch.to_events()
+        assert [(e.customer_id, e.from_segment, e.to_segment, e.drift_direction) for e in events] == [
+            (1, "At Risk", "Lost", "critical"),
+            (2, "Loyal Customers", "Need Attention", "downward"),
+        ]
+        assert (events[0].health_score_before, events[0].health_score_after) == (90.0, 5.0)
+
+
+class TestSegmentTransitionModel:
+    def make_model(self):
+        from modules.customer_intelligence.clustering.transitions import SegmentTransitionModel
+
+        model = SegmentTransitionModel()
+        model.update_names(
+            ["Promising"] * 50 + ["About to Sleep"] * 50 + ["Promising"] * 50,
+            ["About to Sleep"] * 50 + ["Lost"] * 50 + ["Loyal Customers"] * 50,
+        )
+        return model
+
+    def test_probabilities_and_absorbing_churn_risk(self):
+        from modules.customer_intelligence.clustering.drift_detector import SEGMENT_INDEX
+
+        model = self.make_model()
+        np.testing.assert_allclose(model.probabilities.sum(axis=1), 1.0)
+        risk = model.churn_risk
+        assert risk[SEGMENT_INDEX["Lost"]] == pytest.approx(1.0)
+        assert risk[SEGMENT_INDEX["About to Sleep"]] > risk[SEGMENT_INDEX["Promising"]]
+        assert model.table()["About to Sleep"]["Lost"] > 0.5
+
+    def test_bytes_round_trip(self):
+        from modules.customer_intelligence.clustering.transitions import SegmentTransitionModel
+
+        model = self.make_model()
+        restored = SegmentTransitionModel.from_bytes(model.to_bytes())
+        np.testing.assert_array_equal(restored.counts, model.counts)
+        assert restored.n_transitions == 150
+
+    def test_learned_risk_escalates_unlisted_transitions(self):
+        from modules.customer_intelligence.clustering.drift_detector import encode_segments
+
+        codes = encode_segments(["Promising", "About to Sleep", "Promising", "Loyal Customers"])
+        args = (np.array(["C1", "C2"]), codes[[0, 2]], codes[[1, 3]], np.zeros(2), np.zeros(2), ["2024-01-01"] * 2)
+
+        assert len(SegmentDriftDetector().score_transitions(*args)) == 0
+        batch = SegmentDriftDetector(transition_model=self.make_model()).score_transitions(*args)
+        events = batch.to_events()
+        assert [(e.customer_id, e.to_segment) for e in events] == [("C1", "About to Sleep")]
+        assert events[0].churn_risk_delta > 0.1
+        assert events[0].surprise > 0
+
+
+class TestDriftAlerts:
+    class RecordingCursor:
+        def __init__(self, existing=()):
+            from types import SimpleNamespace
+
+            self.connection = SimpleNamespace(encoding="UTF8")
+            self.existing = list(existing)
+            self.statements = []
+
+        def mogrify(self, sql, args):
+            from psycopg2.extensions import adapt
+
+            sql = sql.decode() if isinstance(sql, bytes) else sql
+            return (sql % tuple(adapt(a).getquoted().decode() for a in args)).encode()
+
+        def execute(self, sql, args=None):
+            self.statements.append(sql.decode() if isinstance(sql, bytes) else sql)
+
+        def fetchall(self):
+            return self.existing
+
+    def test_critical_and_downward_moves_become_alerts_once(self):
+        from modules.customer_intelligence.clustering.drift_detector import encode_segments, write_drift_alerts
+        from modules.customer_intelligence.clustering.transitions import SegmentTransitionModel
+
+        model = SegmentTransitionModel()
+        model.update_names(["Champions"] * 20 + ["Loyal Customers"] * 20, ["At Risk"] * 20 + ["Need Attention"] * 20)
+        batch = SegmentDriftDetector(transition_model=model).score_transitions(
+            np.array(["C1", "C2", "C3"], dtype=object),
+            encode_segments(["Champions", "Loyal Customers", "Champions"]),
+            encode_segments(["At Risk", "Need Attention", "Champions"]),
+            np.array([90.0, 70.0, 80.0]),
+            np.array([30.0, 50.0, 82.0]),
+            np.array(["2024-03-01T06:00", "2024-03-01T07:00", "2024-03-01T08:00"], dtype="datetime64[us]"),
+        )
+
+        cursor = self.RecordingCursor()
+        assert write_drift_alerts(cursor, "org-1", batch) == 2
+        insert = cursor.statements[-1]
+        assert insert.startswith("INSERT INTO alerts") and "'segment_drift'" in insert
+        assert "'high'" in insert and "'medium'" in insert and "C3" not in insert
+        assert '"drift_direction": "critical"' in insert
+        assert '"surprise": null' not in insert and '"churn_risk_delta": null' not in insert
+
+        cursor = self.RecordingCursor(existing=[("C1", "2024-03-01T06:00:00.000000")])
+        assert write_drift_alerts(cursor, "org-1", batch) == 1
+        assert "C1" not in cursor.statements[-1]
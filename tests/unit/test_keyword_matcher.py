@@ -0,0 +1,59 @@
+"""
+Unit tests for the Aho-Corasick brand keyword matcher.
+"""
+
+import numpy as np
+import pytest
+
+from modules.brand_monitor.models.absa import ABSAModel
+from modules.brand_monitor.models.keywords import (
+    NEGATIVE_KEYWORDS,
+    POSITIVE_KEYWORDS,
+    KeywordMatcher,
+)
+
+
+@pytest.fixture(params=["native", "python"])
+def backend(request):
+    if request.param == "native":
+        pytest.importorskip("ahocorasick")
+        return lambda matcher: matcher
+    def pure_python(matcher):
+        matcher._native = None
+        return matcher
+    return pure_python
+
+
+def substring_scores(text: str, dimensions: list[str]) -> list[float]:
+    text = text.lower()
+    scores = []
+    for dim in dimensions:
+        pos = sum(kw in text for kw in POSITIVE_KEYWORDS[dim])
+        neg = sum(kw in text for kw in NEGATIVE_KEYWORDS[dim])
+        scores.append(0.5 if pos + neg == 0 else pos / (pos + neg))
+    return scores
+
+
+def test_matches_substring_scan_without_boundaries(backend):
+    matcher = backend(KeywordMatcher(POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS, word_boundaries=False))
+    texts = [
+        "Amazing quality but overpriced, and the delivery was late and damaged.",
+        "Refund took weeks. Rude, unhelpful support; not worth it.",
+        "Love the brand! Eco-friendly, intuitive and easy to use.",
+        "",
+    ]
+    expected = np.array([substring_scores(t, matcher.dimensions) for t in texts])
+    np.testing.assert_allclose(matcher.score_batch(texts), expected, atol=1e-6)
+
+
+def test_word_boundaries_skip_partial_words(backend):
+    matcher = backend(KeywordMatcher(POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS))
+    found = {m.keyword for m in matcher.find("Refund arrived for the chocolate; love the brand, so fun!")}
+    assert found == {"love", "love the brand", "fun"}
+
+
+def test_keyword_fallback_uses_matcher():
+    result = ABSAModel().analyze("Helpful team, but way too expensive.")
+    assert result.dimensions["customer_service"] == 1.0
+    assert result.dimensions["pricing_value"] == 0.0
+    assert result.dimensions["innovation"] == 0.5
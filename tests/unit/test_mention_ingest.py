@@ -0,0 +1,164 @@
+"""
+Unit tests for streaming brand-mention ingestion.
+"""
+
+import json
+
+import pytest
+
+from modules.brand_monitor.ingest import (
+    ROLLUP_COLUMNS,
+    FileMentionSource,
+    Mention,
+    MentionPipeline,
+    hourly_rollups,
+)
+from modules.brand_monitor.models.absa import ABSAModel
+
+ORG_ID = "00000000-0000-0000-0000-000000000001"
+
+
+class RecordingWriter:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.rows: dict[tuple, tuple] = {}
+
+    def write(self, mentions, results):
+        if self.fail:
+            raise ConnectionError("database unavailable")
+        new = [(m, r) for m, r in zip(mentions, results) if m.key not in self.rows]
+        self.rows.update({m.key: (m, r) for m, r in new})
+        return len(new)
+
+
+def mention(source_id: str, content: str) -> dict:
+    return {
+        "event_type": "brand_mention",
+        "org_id": ORG_ID,
+        "data": {"source": "twitter", "source_id": source_id, "content": content},
+    }
+
+
+@pytest.fixture
+def events_file(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = [
+        mention("t1", "Love the brand, fast delivery!"),
+        {"event_type": "page_view", "org_id": ORG_ID, "data": {}},
+        mention("t2", "Rude support and overpriced."),
+        mention("t1", "Love the brand, fast delivery!"),
+        mention("t3", "Arrived late and damaged."),
+    ]
+    path.write_text("".join(json.dumps(e) + "\n" for e in events))
+    return path
+
+
+def run(path, writer, batch_size=2):
+    pipeline = MentionPipeline(
+        FileMentionSource(path), writer, ABSAModel(), batch_size=batch_size, poll_timeout_ms=1
+    )
+    return pipeline.run(idle_timeout_seconds=0.05)
+
+
+def test_dedupes_by_source_id_and_skips_other_events(events_file):
+    writer = RecordingWriter()
+    stats = run(events_file, writer)
+    assert stats.polled == 5
+    assert stats.mentions == 4
+    assert stats.duplicates == 1
+    assert sorted(k[2] for k in writer.rows) == ["t1", "t2", "t3"]
+
+    _, result = writer.rows[(ORG_ID, "twitter", "t3")]
+    assert result.dimensions["delivery_logistics"] == 0.0
+
+
+def test_offsets_commit_only_after_write(events_file):
+    with pytest.raises(ConnectionError):
+        run(events_file, RecordingWriter(fail=True))
+    assert FileMentionSource(events_file).committed == 0
+
+    writer = RecordingWriter()
+    run(events_file, writer)
+    assert len(writer.rows) == 3
+    assert FileMentionSource(events_file).committed == events_file.stat().st_size
+
+    replay = RecordingWriter()
+    assert run(events_file, replay).polled == 0
+
+
+def test_malformed_records_are_rejected_and_the_batch_still_lands(tmp_path):
+    path = tmp_path / "events.jsonl"
+    lines = [
+        json.dumps(mention("t1", "Love the brand!")),
+        "{not json",
+        json.dumps(dict(mention("t2", "Overpriced."), occurred_at="2024/01/01")),
+        json.dumps(dict(mention("t3", "Arrived late."), occurred_at=1714550400)),
+        json.dumps(mention("t4", "Great support.")),
+    ]
+    path.write_text("".join(line + "\n" for line in lines))
+
+    writer = RecordingWriter()
+    stats = run(path, writer)
+    assert stats.rejected == 3
+    assert sorted(k[2] for k in writer.rows) == ["t1", "t4"]
+    assert FileMentionSource(path).committed == path.stat().st_size
+
+
+def test_non_string_and_over_length_fields_are_rejected(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = [
+        mention("t1", "Love the brand!"),
+        mention("t2", 12345),
+        mention("x" * 501, "Too long an id."),
+        {**mention("t3", "Long author."), "data": {**mention("t3", "")["data"], "content": "Hi", "author": "a" * 256}},
+        {**mention("t4", "Bad url."), "data": {**mention("t4", "Bad url.")["data"], "url": ["https://x"]}},
+        mention("t5", "Great support."),
+    ]
+    path.write_text("".join(json.dumps(e) + "\n" for e in events))
+
+    writer = RecordingWriter()
+    stats = run(path, writer)
+    assert stats.rejected == 4
+    assert sorted(k[2] for k in writer.rows) == ["t1", "t5"]
+    assert FileMentionSource(path).committed == path.stat().st_size
+
+
+def test_naive_and_aware_timestamps_flush_together(tmp_path):
+    path = tmp_path / "events.jsonl"
+    events = [
+        dict(mention("t1", "Love it"), occurred_at="2024-05-01T10:05:00"),
+        dict(mention("t2", "Hate it"), occurred_at="2024-05-01T10:55:00+00:00"),
+    ]
+    path.write_text("".join(json.dumps(e) + "\n" for e in events))
+
+    writer = RecordingWriter()
+    stats = run(path, writer)
+    assert stats.written == 2
+    assert all(m.mentioned_at.tzinfo is not None for m, _ in writer.rows.values())
+    assert FileMentionSource(path).committed == path.stat().st_size
+
+
+def test_hourly_rollups_group_by_hour_and_source():
+    model = ABSAModel()
+    events = [
+        dict(mention("t1", "Love it, excellent and fast delivery"), occurred_at="2024-05-01T10:05:00"),
+        dict(mention("t2", "Rude, overpriced, defective, a scam, buggy and late"), occurred_at="2024-05-01T10:55:00+00:00"),
+        dict(mention("t3", "Just arrived"), occurred_at="2024-05-01T11:00:00+00:00"),
+    ]
+    mentions = [Mention.from_event(e) for e in events]
+    rollups = hourly_rollups(list(zip(mentions, model.analyze_batch([m.content for m in mentions]))))
+
+    by_hour = {row[1].hour: dict(zip(ROLLUP_COLUMNS, row[3:])) for row in rollups}
+    assert len(rollups) == 2
+    assert by_hour[10]["mentions"] == 2
+    assert (by_hour[10]["positive"], by_hour[10]["negative"]) == (1, 1)
+    assert by_hour[11]["mentions"] == 1
+    assert by_hour[11]["positive"] + by_hour[11]["negative"] == 0
+
+
+def test_offset_timestamps_bucket_by_utc_hour():
+    event = dict(mention("t1", "Love it"), occurred_at="2024-05-01T16:10:00+05:30")
+    m = Mention.from_event(event)
+    rollups = hourly_rollups([(m, ABSAModel().analyze_batch([m.content])[0])])
+    bucket = rollups[0][1]
+    assert (bucket.hour, bucket.minute, bucket.utcoffset().total_seconds()) == (10, 0, 0)
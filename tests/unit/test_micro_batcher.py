@@ -0,0 +1,118 @@
+"""
+Unit tests for the async inference micro-batcher.
+"""
+
+import asyncio
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from modules.serving.batcher import MicroBatcher, split_outputs, stack_outputs
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submits_share_a_batch():
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return [x * 2 for x in items]
+
+    async def main():
+        batcher = MicroBatcher("test_share", double, max_batch_size=64, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(main()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+
+
+def test_flushes_at_max_batch_size():
+    sizes = []
+
+    def identity(items):
+        sizes.append(len(items))
+        return items
+
+    async def main():
+        batcher = MicroBatcher("test_max_size", identity, max_batch_size=4, max_wait_ms=50)
+        results = await batcher.submit_many(list(range(10)))
+        await batcher.stop()
+        return results
+
+    assert run(main()) == list(range(10))
+    assert sizes == [4, 4, 2]
+    assert REGISTRY.get_sample_value("aima_inference_batch_size_sum", {"model": "test_max_size"}) == 10
+
+
+def test_batch_failure_reaches_every_caller():
+    def fail(items):
+        raise ValueError("bad batch")
+
+    async def main():
+        batcher = MicroBatcher("test_fail", fail, max_wait_ms=10)
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    results = run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_split_and_stack_round_trip():
+    outputs = {"a": np.arange(3.0), "b": np.arange(6.0).reshape(3, 2)}
+    rows = split_outputs(outputs)
+    assert len(rows) == 3
+    restacked = stack_outputs(rows)
+    for name, values in outputs.items():
+        np.testing.assert_array_equal(restacked[name], values)
+
+
+def test_short_result_list_fails_callers_instead_of_hanging():
+    async def main():
+        batcher = MicroBatcher("test_short", lambda items: items[:1], max_wait_ms=10)
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), timeout=2
+        )
+        await batcher.stop()
+        return results
+
+    results = run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_stop_fails_items_being_collected():
+    async def main():
+        batcher = MicroBatcher("test_stop_collecting", lambda items: items, max_wait_ms=5000)
+        pending = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(pending, return_exceptions=True), timeout=2)
+
+    (result,) = run(main())
+    assert isinstance(result, RuntimeError)
+
+
+def test_non_iterable_results_fail_the_batch_and_keep_serving():
+    calls = []
+
+    def flaky(items):
+        calls.append(len(items))
+        return None if len(calls) == 1 else items
+
+    async def main():
+        batcher = MicroBatcher("test_none", flaky, max_wait_ms=10)
+        first = await asyncio.wait_for(asyncio.gather(batcher.submit(1), return_exceptions=True), timeout=2)
+        second = await asyncio.wait_for(batcher.submit(2), timeout=2)
+        await batcher.stop()
+        return first, second
+
+    (error,), second = run(main())
+    assert isinstance(error, TypeError)
+    assert second == 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for the streaming brand sentiment anomaly detector.
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from psycopg2.extensions import adapt
+
+from modules.brand_monitor.anomaly import OVERALL, SentimentAlert, SentimentAnomalyDetector, write_alerts
+from modules.brand_monitor.ingest import DIMENSION_COLUMNS
+
+ORG_ID = "00000000-0000-0000-0000-000000000001"
+START = datetime(2024, 5, 6, tzinfo=timezone.utc)
+
+
+def rollup(bucket, mentions, negative, source="twitter"):
+    # One rollup row: every scored mention is either negative (-0.8) or mildly positive (0.3).
+    polarity_sum = -0.8 * negative + 0.3 * (mentions - negative)
+    return (
+        ORG_ID, bucket, source, mentions, mentions - negative, negative, mentions,
+        polarity_sum, *([polarity_sum] * len(DIMENSION_COLUMNS)),
+    )
+
+
+def warmed_detector(hours=72):
+    detector = SentimentAnomalyDetector(min_history_hours=24, min_mentions=10)
+    for h in range(hours):
+        negative = 2 + h % 3
+        assert detector.observe([rollup(START + timedelta(hours=h), 20, negative)]) == []
+    return detector
+
+
+def test_spike_alerts_once_within_the_open_hour():
+    detector = warmed_detector()
+    spike_hour = START + timedelta(hours=72)
+
+    alerts = detector.observe([rollup(spike_hour, 20, 14)])
+    overall = [a for a in alerts if a.dimension == OVERALL]
+    assert len(overall) == 1
+    assert overall[0].severity in ("high", "critical")
+    assert overall[0].value == 0.7
+
+    assert detector.observe([rollup(spike_hour, 20, 14)]) == []
+    assert len(detector) == 1 + len(DIMENSION_COLUMNS)
+
+
+def test_normal_hours_and_thin_samples_stay_quiet():
+    detector = warmed_detector()
+    next_hour = START + timedelta(hours=72)
+    assert detector.observe([rollup(next_hour, 20, 3)]) == []
+    # Too few mentions to judge, even though all are negative.
+    assert detector.observe([rollup(next_hour + timedelta(hours=1), 5, 5)]) == []
+
+
+class RecordingCursor:
+    connection = SimpleNamespace(encoding="UTF8")
+
+    def __init__(self, known_orgs):
+        self.known_orgs = known_orgs
+        self.statements = []
+
+    def mogrify(self, sql, args):
+        sql = sql.decode() if isinstance(sql, bytes) else sql
+        return (sql % tuple(adapt(a).getquoted().decode() for a in args)).encode()
+
+    def execute(self, sql, args=None):
+        self.statements.append(sql.decode() if isinstance(sql, bytes) else sql)
+
+    def fetchall(self):
+        return [(org,) for org in self.known_orgs]
+
+
+def test_alerts_skip_unknown_orgs_without_casting_severity():
+    bucket = START + timedelta(hours=72)
+    alerts = [
+        SentimentAlert(org, "twitter", OVERALL, bucket, "high", 0.7, 0.15, 5.0, 20)
+        for org in (ORG_ID, "00000000-0000-0000-0000-000000000002")
+    ]
+    cursor = RecordingCursor([ORG_ID])
+    write_alerts(cursor, alerts)
+
+    insert = cursor.statements[-1]
+    assert insert.startswith("INSERT INTO alerts")
+    assert ORG_ID in insert and "-000000000002" not in insert
+    assert "'high'" in insert and "::alert_severity" not in insert
@@ -0,0 +1,60 @@
+"""
+Unit tests for ONNX / TorchScript export and the onnxruntime inference path.
+"""
+
+import numpy as np
+import pytest
+import torch
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("onnxscript")
+
+from modules.campaign_predictor.models.prediction import PREDICTION_TARGETS
+from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+from modules.clv_churn.models.churn_predictor import DeepChurnModel
+from modules.serving.export import export_model
+from modules.serving.runtime import OnnxChurnModel, load_onnx_model
+
+
+@pytest.fixture
+def churn_model():
+    torch.manual_seed(0)
+    return DeepChurnModel().eval()
+
+
+def test_churn_onnx_matches_eager_scoring(churn_model, tmp_path):
+    artifacts = export_model(churn_model, tmp_path)
+    assert set(artifacts) == {"onnx", "torchscript"}
+
+    features = np.random.default_rng(3).normal(size=(300, 33)).astype(np.float32)
+    onnx_scores = OnnxChurnModel(load_onnx_model(artifacts["onnx"])).score_batch(features, batch_size=128)
+    eager_scores = churn_model.score_batch(features)
+
+    np.testing.assert_allclose(onnx_scores.survival, eager_scores.survival, atol=1e-5)
+    assert (onnx_scores.risk_level == eager_scores.risk_level).all()
+
+
+def test_torchscript_artifact_loads(churn_model, tmp_path):
+    artifacts = export_model(churn_model, tmp_path, formats=("torchscript",))
+    scripted = torch.jit.load(str(artifacts["torchscript"]))
+    x = torch.randn(5, 33)
+    with torch.inference_mode():
+        torch.testing.assert_close(scripted(x), churn_model(x))
+
+
+def test_campaign_predictor_outputs_are_named(tmp_path):
+    artifacts = export_model(MultiTaskPerformancePredictor(), tmp_path, formats=("onnx",))
+    outputs = load_onnx_model(artifacts["onnx"]).run(
+        np.zeros((4, 768), dtype=np.float32), np.zeros((4, 50), dtype=np.float32)
+    )
+    assert list(outputs) == PREDICTION_TARGETS
+    assert all(v.shape == (4,) for v in outputs.values())
+
+
+def test_missing_artifact_returns_none(tmp_path):
+    assert load_onnx_model(tmp_path / "missing.onnx") is None
+
+
+def test_unknown_format_rejected(churn_model, tmp_path):
+    with pytest.raises(ValueError):
+        export_model(churn_model, tmp_path, formats=("tflite",))
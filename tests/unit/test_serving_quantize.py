@@ -0,0 +1,85 @@
+"""
+Unit tests for dynamic int8 quantization with the float accuracy check.
+"""
+
+import pytest
+import torch
+
+from modules.clv_churn.models.churn_predictor import DeepChurnModel
+from modules.customer_intelligence.models.transformer import TBTConfig, TemporalBehavioralTransformer
+from modules.serving.quantize import quantizable_linear_names, quantize_model, quantize_with_check
+
+pytestmark = pytest.mark.filterwarnings("ignore::DeprecationWarning")
+
+
+@pytest.fixture
+def churn_model():
+    torch.manual_seed(0)
+    return DeepChurnModel().eval()
+
+
+def test_churn_quantized_within_tolerance(churn_model):
+    holdout = torch.randn(512, 33)
+    model, report = quantize_with_check(churn_model, (holdout,))
+    assert report.accepted
+    assert model is not churn_model
+    assert model.score_batch(holdout.numpy()).survival.shape == (512, churn_model.n_time_bins)
+
+
+def test_falls_back_to_float_when_outside_tolerance(churn_model):
+    model, report = quantize_with_check(churn_model, (torch.randn(64, 33),), tolerance=0.0)
+    assert not report.accepted
+    assert model is churn_model
+
+
+def test_transformer_skips_attention_projection_and_runs_with_mask():
+    torch.manual_seed(0)
+    model = TemporalBehavioralTransformer(TBTConfig(n_layers=2)).eval()
+    names = quantizable_linear_names(model, ("transformer_encoder", "output_head"))
+    assert not any("self_attn" in n for n in names)
+
+    quantized = quantize_model(model)
+    event_types = torch.randint(0, 64, (4, 16))
+    numerical = torch.randn(4, 16, 8)
+    mask = torch.zeros(4, 16, dtype=torch.bool)
+    mask[0, 10:] = True
+    with torch.inference_mode():
+        assert quantized(event_types, numerical, mask).shape == (4, model.config.output_dim)
+
+
+
+def test_tbt_loader_quantizes_against_saved_holdout(monkeypatch, tmp_path):
+    import numpy as np
+    from modules.serving import quantize
+    from platform.api import inference
+
+    torch.manual_seed(0)
+    model = TemporalBehavioralTransformer().eval()
+    torch.save(model.state_dict(), tmp_path / inference.TBT_MODEL_FILE)
+    sequences = [
+        {"event_types": list(range(1, n + 2)), "numerical_features": np.random.rand(n + 1, 8)}
+        for n in range(4)
+    ]
+    holdout = model._prepare_batch(sequences)
+    np.savez(
+        tmp_path / inference.TBT_HOLDOUT_FILE,
+        **{key: tensor.numpy() for key, tensor in zip(inference.TBT_HOLDOUT_KEYS, holdout)},
+    )
+
+    monkeypatch.setattr(inference.settings, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(inference.settings, "INFERENCE_QUANTIZE", True)
+    monkeypatch.setattr(inference.settings, "INFERENCE_QUANTIZE_TOLERANCE", 1.0)
+    reports = []
+
+    def recording_check(*args, **kwargs):
+        quantized, report = quantize_with_check(*args, **kwargs)
+        reports.append((quantized, report))
+        return quantized, report
+
+    monkeypatch.setattr(quantize, "quantize_with_check", recording_check)
+
+    fingerprints = inference._tbt_batch_fn()(sequences)
+    assert len(fingerprints) == 4
+    quantized, report = reports[0]
+    assert report.accepted and report.tolerance == 1.0
+    assert any(type(m) is not torch.nn.Linear and "Linear" in type(m).__name__ for m in quantized.modules())
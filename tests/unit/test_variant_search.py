@@ -0,0 +1,76 @@
+"""
+Unit tests for the generate-then-rank variant search engine.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import torch
+
+from modules.campaign_predictor.features.embeddings import TextEmbedder
+from modules.campaign_predictor.models.predictor import MultiTaskPerformancePredictor
+from modules.campaign_predictor.models.scorer import CampaignScorer
+from modules.content_studio.generators.variant_search import SearchSpace, VariantSearchEngine
+
+
+@pytest.fixture
+def engine():
+    torch.manual_seed(0)
+    scorer = CampaignScorer(MultiTaskPerformancePredictor().eval(), TextEmbedder())
+    return VariantSearchEngine(scorer, beam_width=4, exhaustive_limit=64)
+
+
+def test_beam_search_prunes_large_space(engine):
+    space = engine.expand("Spring sale on running shoes", offer_type="percentage_discount", offer_value=15)
+    assert space.size > engine.exhaustive_limit
+
+    result = engine.search(space, objective="open_rate", top_k=3, latency_budget_ms=10_000)
+    assert not result.exhaustive
+    assert result.n_scored < space.size
+    assert len(result.top) == 3
+    lifts = [r.lift["open_rate"] for r in result.top]
+    assert lifts == sorted(lifts, reverse=True)
+
+
+def test_small_space_is_exhaustive(engine):
+    space = SearchSpace(
+        subject_lines=["New arrivals", "Just landed"],
+        body="Shop now.",
+        send_slots=[(1, 9), (3, 18)],
+    )
+    result = engine.search(space, objective="revenue", top_k=50, latency_budget_ms=10_000)
+    assert result.exhaustive
+    assert result.n_scored == space.size
+
+
+def test_repeat_search_hits_memo(engine):
+    space = engine.expand("Weekend flash sale")
+    first = engine.search(space, latency_budget_ms=10_000)
+    second = engine.search(space, latency_budget_ms=10_000)
+    assert second.memo_hits >= first.n_scored
+    assert [r.variant for r in second.top] == [r.variant for r in first.top]
+
+
+def test_zero_budget_returns_baseline_only(engine):
+    space = engine.expand("Back in stock")
+    result = engine.search(space, latency_budget_ms=0)
+    assert result.budget_exhausted
+    assert result.top == []
+    assert result.baseline.prediction.top_suggestions == []
+
+
+def test_suggestions_carry_positive_lift(engine):
+    space = engine.expand("Holiday gift guide")
+    result = engine.search(space, objective="click_rate", latency_budget_ms=10_000)
+    for suggestion in result.baseline.prediction.top_suggestions:
+        assert suggestion["expected_click_rate_lift"] > 0
+        assert suggestion["change"]
+
+
+def test_concurrent_searches_share_a_bounded_memo(engine):
+    engine.memo_size = 16
+    spaces = [engine.expand(brief) for brief in ("Spring sale", "Back in stock", "Weekend flash sale", "New arrivals")]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda space: engine.search(space, latency_budget_ms=10_000), spaces * 2))
+    assert all(result.top for result in results)
+    assert len(engine._memo) <= engine.memo_size